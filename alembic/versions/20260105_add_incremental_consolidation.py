@@ -0,0 +1,47 @@
+"""Add created_at to canonical_events and pipeline_watermarks table
+
+Revision ID: 20260105_incremental
+Revises: 20251229_llm_validated
+Create Date: 2026-01-05
+
+This migration supports incremental Stage 2A consolidation
+(consolidate_all_events.py --incremental):
+- canonical_events.created_at identifies events created since the last run
+- pipeline_watermarks stores the per-(stage, country) high-water mark
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '20260105_incremental'
+down_revision = '20251229_llm_validated'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Existing rows get the migration time; the first full run sets the watermark past them
+    op.add_column('canonical_events',
+                  sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('now()')))
+    op.create_index('ix_canonical_event_country_created', 'canonical_events',
+                    ['initiating_country', 'created_at'])
+
+    op.create_table(
+        'pipeline_watermarks',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False, server_default=sa.text('gen_random_uuid()')),
+        sa.Column('stage', sa.Text(), nullable=False),
+        sa.Column('scope', sa.Text(), nullable=False),
+        sa.Column('watermark', sa.DateTime(), nullable=False),
+        sa.Column('run_stats', postgresql.JSONB(), server_default='{}'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('now()')),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('stage', 'scope', name='uq_pipeline_watermark')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('pipeline_watermarks')
+
+    op.drop_index('ix_canonical_event_country_created', table_name='canonical_events')
+    op.drop_column('canonical_events', 'created_at')
@@ -0,0 +1,41 @@
+"""Add clustering_jobs table for resumable parallel clustering
+
+Revision ID: 20260112_clustering_jobs
+Revises: 20260105_incremental
+Create Date: 2026-01-12
+
+Tracks each (country, date) work unit of batch_cluster_events.py --workers
+so interrupted backfills can resume and failures are recorded.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '20260112_clustering_jobs'
+down_revision = '20260105_incremental'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'clustering_jobs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False, server_default=sa.text('gen_random_uuid()')),
+        sa.Column('initiating_country', sa.Text(), nullable=False),
+        sa.Column('cluster_date', sa.Date(), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False, server_default='pending'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('stats', postgresql.JSONB(), server_default='{}'),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('initiating_country', 'cluster_date', name='uq_clustering_job')
+    )
+    op.create_index('ix_clustering_job_status', 'clustering_jobs', ['status'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_clustering_job_status', table_name='clustering_jobs')
+    op.drop_table('clustering_jobs')
@@ -0,0 +1,43 @@
+"""Add pipeline_task_runs table for the resumable event pipeline DAG
+
+Revision ID: 20260119_pipeline_task_runs
+Revises: 20260112_clustering_jobs
+Create Date: 2026-01-19
+
+Records completion, wall time and row counts of each task run by
+services/pipeline/events/run_event_dag.py so re-runs skip finished work.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '20260119_pipeline_task_runs'
+down_revision = '20260112_clustering_jobs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'pipeline_task_runs',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False, server_default=sa.text('gen_random_uuid()')),
+        sa.Column('task_key', sa.Text(), nullable=False),
+        sa.Column('stage', sa.Text(), nullable=False),
+        sa.Column('partition', sa.Text(), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False, server_default='pending'),
+        sa.Column('rows', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('seconds', sa.Float(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('stats', postgresql.JSONB(), server_default='{}'),
+        sa.Column('started_at', sa.DateTime(), nullable=True),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('task_key', name='uq_pipeline_task_run')
+    )
+    op.create_index('ix_pipeline_task_run_stage_status', 'pipeline_task_runs', ['stage', 'status'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_pipeline_task_run_stage_status', table_name='pipeline_task_runs')
+    op.drop_table('pipeline_task_runs')
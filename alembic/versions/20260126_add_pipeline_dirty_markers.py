@@ -0,0 +1,51 @@
+"""Add pipeline_dirty_markers queue for change-driven event processing
+
+Revision ID: 20260126_dirty_markers
+Revises: 20260119_pipeline_task_runs
+Create Date: 2026-01-26
+
+DSR ingestion records each (initiating_country, date) it loads documents
+for; services/pipeline/events/process_dirty_markers.py claims pending
+markers and re-runs only the affected pipeline steps.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '20260126_dirty_markers'
+down_revision = '20260119_pipeline_task_runs'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'pipeline_dirty_markers',
+        sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False, server_default=sa.text('gen_random_uuid()')),
+        sa.Column('initiating_country', sa.Text(), nullable=False),
+        sa.Column('marker_date', sa.Date(), nullable=False),
+        sa.Column('doc_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('version', sa.Integer(), nullable=False, server_default='1'),
+        sa.Column('processed_version', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('claimed_version', sa.Integer(), nullable=True),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('last_marked_at', sa.DateTime(), nullable=False, server_default=sa.text('NOW()')),
+        sa.Column('claimed_at', sa.DateTime(), nullable=True),
+        sa.Column('next_attempt_at', sa.DateTime(), nullable=True),
+        sa.Column('processed_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('initiating_country', 'marker_date', name='uq_pipeline_dirty_marker')
+    )
+    op.create_index(
+        'ix_pipeline_dirty_marker_pending',
+        'pipeline_dirty_markers',
+        ['marker_date'],
+        postgresql_where=sa.text('version > processed_version')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_pipeline_dirty_marker_pending', table_name='pipeline_dirty_markers')
+    op.drop_table('pipeline_dirty_markers')
@@ -0,0 +1,55 @@
+"""Store canonical_events.embedding_vector as pgvector vector(384) with an HNSW index
+
+Revision ID: 20260202_event_vector_hnsw
+Revises: 20260126_dirty_markers
+Create Date: 2026-02-02
+
+embedding_vector was a float[] column, so every similarity computation pulled
+vectors into Python. As vector(384) (all-MiniLM-L6-v2) with an HNSW cosine
+index, neighbour queries run inside Postgres (see
+services/pipeline/events/canonical_event_index.py).
+
+Requires the pgvector extension, version 0.5.0 or later for HNSW.
+Vectors whose length is not 384 cannot be converted and are set to NULL.
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '20260202_event_vector_hnsw'
+down_revision = '20260126_dirty_markers'
+branch_labels = None
+depends_on = None
+
+EMBEDDING_DIM = 384
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS vector')
+
+    op.execute(f'''
+        UPDATE canonical_events
+        SET embedding_vector = NULL
+        WHERE embedding_vector IS NOT NULL
+          AND COALESCE(array_length(embedding_vector, 1), 0) <> {EMBEDDING_DIM}
+    ''')
+    op.execute(f'''
+        ALTER TABLE canonical_events
+        ALTER COLUMN embedding_vector TYPE vector({EMBEDDING_DIM})
+        USING embedding_vector::real[]::vector({EMBEDDING_DIM})
+    ''')
+
+    op.execute('''
+        CREATE INDEX ix_canonical_event_embedding_hnsw
+        ON canonical_events
+        USING hnsw (embedding_vector vector_cosine_ops)
+        WITH (m = 16, ef_construction = 64)
+    ''')
+
+
+def downgrade() -> None:
+    op.execute('DROP INDEX IF EXISTS ix_canonical_event_embedding_hnsw')
+    op.execute('''
+        ALTER TABLE canonical_events
+        ALTER COLUMN embedding_vector TYPE double precision[]
+        USING embedding_vector::real[]::double precision[]
+    ''')
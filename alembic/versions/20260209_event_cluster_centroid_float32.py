@@ -0,0 +1,40 @@
+"""Store event_clusters.centroid_embedding as a float32 bytea blob
+
+Revision ID: 20260209_centroid_float32
+Revises: 20260202_event_vector_hnsw
+Create Date: 2026-02-09
+
+Centroids were written as float[] (one Python float per element). They are
+now big-endian float32 blobs written with encode_float32 and read with
+np.frombuffer (shared/utils/vector_codec.py). Existing rows are converted
+with float4send(), which produces the same byte layout.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '20260209_centroid_float32'
+down_revision = '20260202_event_vector_hnsw'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('event_clusters', sa.Column('centroid_blob', sa.LargeBinary(), nullable=True))
+    op.execute('''
+        UPDATE event_clusters
+        SET centroid_blob = (
+            SELECT string_agg(float4send(x::real), ''::bytea ORDER BY ord)
+            FROM unnest(centroid_embedding) WITH ORDINALITY AS t(x, ord)
+        )
+        WHERE centroid_embedding IS NOT NULL
+    ''')
+    op.drop_column('event_clusters', 'centroid_embedding')
+    op.alter_column('event_clusters', 'centroid_blob', new_column_name='centroid_embedding')
+
+
+def downgrade() -> None:
+    # Postgres has no bytea -> float4 conversion; centroids are analysis-only
+    # metadata and are restored as NULL (re-run Stage 1A to regenerate them)
+    op.drop_column('event_clusters', 'centroid_embedding')
+    op.add_column('event_clusters', sa.Column('centroid_embedding', sa.ARRAY(sa.Float()), nullable=True))
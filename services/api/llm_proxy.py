@@ -0,0 +1,197 @@
+"""
+Async LLM proxy behind the /material_query endpoint.
+
+- One shared async client per process (AsyncAzureOpenAI in production,
+  AsyncOpenAI in development), built on first use
+- A concurrency cap on upstream calls (LLM_PROXY_MAX_CONCURRENCY, default 16);
+  requests beyond it wait in an asyncio queue instead of blocking threads
+- Request coalescing: identical in-flight requests (same mode, model and
+  prompts) share one upstream call, so duplicate prompts from parallel
+  pipeline workers are only paid for once
+- Metrics (queue depth, in-flight, coalesced, errors, latency histogram)
+  served at /metrics
+
+Environment Variables:
+    ENV: 'production' routes to Azure OpenAI, anything else to OpenAI directly
+    OPENAI_PROJ_API: OpenAI API key (development)
+    LLM_PROXY_MAX_CONCURRENCY: Max concurrent upstream calls (default: 16)
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from typing import Any, Dict, Optional
+
+from shared.utils.llm_clients import LatencyHistogram
+
+
+class ProxyConfigurationError(RuntimeError):
+    """Raised when the proxy backend is not configured."""
+
+
+def _parse_content(content: Any) -> Any:
+    """Parse an LLM response as JSON when possible (same rules as gai())."""
+    if not isinstance(content, str):
+        return content
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        match = re.search(r'(\[.*\]|\{.*\})', content, re.DOTALL)
+        if match:
+            try:
+                return json.loads(match.group(1))
+            except json.JSONDecodeError:
+                pass
+        return content
+
+
+class AsyncLLMProxy:
+    """Shared async client, concurrency cap, request coalescing and metrics."""
+
+    def __init__(self, max_concurrency: int = 16):
+        self.max_concurrency = max(1, max_concurrency)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._clients: Dict[str, Any] = {}
+        self._deployment: Optional[str] = None
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._latency = LatencyHistogram()
+
+        self.waiting = 0
+        self.active = 0
+        self.requests = 0
+        self.coalesced = 0
+        self.upstream_calls = 0
+        self.errors = 0
+
+    @property
+    def production(self) -> bool:
+        return os.getenv('ENV', 'development').lower() == 'production'
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so it binds to the server's running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def _get_client(self):
+        """Build the async client for the current mode once per process."""
+        mode = 'azure' if self.production else 'openai'
+        if mode in self._clients:
+            return self._clients[mode]
+
+        if mode == 'azure':
+            from openai import AsyncAzureOpenAI
+            from shared.utils.utils import cfg, get_client_registry
+
+            # Secrets Manager lookups are blocking; keep them off the event loop
+            registry = get_client_registry()
+            credentials = await asyncio.to_thread(registry.get_secret, cfg.aws['secret_name'])
+            try:
+                secret_dict = await asyncio.to_thread(registry.get_secret, 'azure-open-ai-credentials')
+                self._deployment = secret_dict.get('deployment_name') or secret_dict.get('GPT_4_1_DEPLOYMENT_NAME')
+            except Exception:
+                self._deployment = None
+
+            client = AsyncAzureOpenAI(
+                azure_endpoint=credentials["endpoint"],
+                api_key=credentials["key"],
+                api_version=cfg.aws.get('api_version', '2024-02-15-preview'),
+            )
+        else:
+            from openai import AsyncOpenAI
+
+            api_key = os.getenv('OPENAI_PROJ_API')
+            if not api_key:
+                raise ProxyConfigurationError(
+                    "OPENAI_PROJ_API not configured. Set ENV=production to use Azure OpenAI instead."
+                )
+            client = AsyncOpenAI(api_key=api_key)
+
+        self._clients[mode] = client
+        return client
+
+    async def _call_upstream(self, sys_prompt: str, prompt: str, model: str) -> Any:
+        self.waiting += 1
+        async with self._get_semaphore():
+            self.waiting -= 1
+            self.active += 1
+            start = time.perf_counter()
+            try:
+                client = await self._get_client()
+                self.upstream_calls += 1
+
+                if self.production:
+                    # Default to gpt-4.1-mini for production Azure deployment
+                    model = model if model != "gpt-4.1" else "gpt-4.1-mini"
+                    completion = await client.chat.completions.create(
+                        model=self._deployment or model,
+                        messages=[
+                            {"role": "system", "content": sys_prompt},
+                            {"role": "user", "content": prompt}
+                        ],
+                        temperature=0.7,
+                        max_tokens=4000
+                    )
+                else:
+                    completion = await client.chat.completions.create(
+                        model=model,
+                        messages=[
+                            {"role": "system", "content": sys_prompt},
+                            {"role": "user", "content": prompt},
+                        ],
+                        temperature=0.7,
+                    )
+
+                return _parse_content(completion.choices[0].message.content)
+            finally:
+                self.active -= 1
+                self._latency.observe(time.perf_counter() - start)
+
+    async def complete(self, sys_prompt: str, prompt: str, model: str) -> Any:
+        """
+        Run a completion, sharing the upstream call with identical in-flight requests.
+        """
+        self.requests += 1
+        mode = 'production' if self.production else 'development'
+        key = hashlib.sha256(json.dumps([mode, model, sys_prompt, prompt]).encode('utf-8')).hexdigest()
+
+        existing = self._in_flight.get(key)
+        if existing is not None:
+            self.coalesced += 1
+            return await asyncio.shield(existing)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            result = await self._call_upstream(sys_prompt, prompt, model)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            self.errors += 1
+            future.set_exception(e)
+            # Mark retrieved so an un-awaited future does not log a warning
+            future.exception()
+            raise
+        finally:
+            self._in_flight.pop(key, None)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depth, concurrency, coalescing counters and upstream latency."""
+        return {
+            'mode': 'production' if self.production else 'development',
+            'max_concurrency': self.max_concurrency,
+            'queue_depth': self.waiting,
+            'active_upstream_calls': self.active,
+            'in_flight_keys': len(self._in_flight),
+            'requests': self.requests,
+            'coalesced_requests': self.coalesced,
+            'upstream_calls': self.upstream_calls,
+            'errors': self.errors,
+            'upstream_latency': self._latency.snapshot(),
+        }
+
+
+llm_proxy = AsyncLLMProxy(max_concurrency=int(os.getenv('LLM_PROXY_MAX_CONCURRENCY', '16')))
@@ -9,6 +9,7 @@ import pandas as pd
 import numpy as np
 import pyarrow.parquet as pq
 from shared.utils.utils import gai, fetch_gai_content, fetch_gai_response
+from services.api.llm_proxy import llm_proxy, ProxyConfigurationError
 import json
 from dotenv import load_dotenv
 from pathlib import Path
@@ -53,82 +54,38 @@ def query_gai(input: QueryInput):
     return fetch_gai_content(response)
 
 @app.post("/material_query")
-def material_gai_query(input: QueryInput):
+async def material_gai_query(input: QueryInput):
     """
     LLM query endpoint with environment-based routing.
 
-    - PRODUCTION (ENV=production): Uses Azure OpenAI via utils.gai()
+    - PRODUCTION (ENV=production): Uses Azure OpenAI
     - DEVELOPMENT (default): Uses direct OpenAI API
 
+    Served asynchronously through a shared client with a concurrency cap;
+    identical in-flight requests are coalesced into one upstream call
+    (see services/api/llm_proxy.py).
+
     Environment Variables:
         ENV: Set to 'production' for Azure OpenAI (default: development)
         OPENAI_PROJ_API: OpenAI API key (for development)
+        LLM_PROXY_MAX_CONCURRENCY: Max concurrent upstream calls (default: 16)
     """
-    import json
-    print(f"DEBUG: Endpoint called with model={input.model}")
-
-    # Check environment
-    env = os.getenv('ENV', 'development').lower()
-    print(f"DEBUG: Environment mode: {env}")
-
-    if env == 'production':
-        # PRODUCTION: Use Azure OpenAI directly (not proxy - avoid infinite loop!)
-        # Default to gpt-4.1-mini for production Azure deployment
-        model = input.model if input.model != "gpt-4.1" else "gpt-4.1-mini"
-        print(f"[AZURE] Using Azure OpenAI (production mode) with model: {model}")
-        content = gai(input.sys_prompt, input.prompt, model, source="azure")
+    try:
+        content = await llm_proxy.complete(input.sys_prompt, input.prompt, input.model)
         return {"response": content}
-    else:
-        # DEVELOPMENT: Use direct OpenAI API
-        print("Using OpenAI API (development mode)")
-        from openai import OpenAI
-
-        # Get API key from environment
-        api_key = os.getenv('OPENAI_PROJ_API')
-        if not api_key:
-            raise HTTPException(
-                status_code=500,
-                detail="OPENAI_PROJ_API not configured. Set ENV=production to use Azure OpenAI instead."
-            )
-
-        try:
-            # Debug: Check OpenAI version and module path
-            import openai
-            print(f"DEBUG: OpenAI version: {openai.__version__}")
-            print(f"DEBUG: OpenAI module path: {openai.__file__}")
-            print(f"DEBUG: API key length: {len(api_key)}")
-
-            # Initialize OpenAI client - explicitly pass only api_key
-            import inspect
-            print(f"DEBUG: OpenAI.__init__ signature: {inspect.signature(OpenAI.__init__)}")
-
-            client = OpenAI(api_key=api_key)
-            print("DEBUG: OpenAI client created successfully")
-
-            # Make API call
-            completion = client.chat.completions.create(
-                model=input.model,
-                messages=[
-                    {"role": "system", "content": input.sys_prompt},
-                    {"role": "user", "content": input.prompt},
-                ],
-                temperature=0.7,
-            )
-
-            content = completion.choices[0].message.content
-
-            # Try to parse as JSON if possible
-            try:
-                parsed_content = json.loads(content)
-                return {"response": parsed_content}
-            except json.JSONDecodeError:
-                # Return raw string if not JSON
-                return {"response": content}
+    except ProxyConfigurationError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    except Exception as e:
+        # Pass upstream rate limits / outages through so callers can back off and retry
+        status_code = getattr(e, 'status_code', None)
+        if not isinstance(status_code, int) or status_code < 400:
+            status_code = 500
+        raise HTTPException(status_code=status_code, detail=f"LLM API error: {str(e)}")
 
-        except Exception as e:
-            import traceback
-            print(f"DEBUG: Full traceback:\n{traceback.format_exc()}")
-            raise HTTPException(status_code=500, detail=f"OpenAI API error: {str(e)}")
+@app.get("/metrics")
+async def metrics():
+    """LLM proxy queue depth, coalescing counters and upstream latency."""
+    return {"llm_proxy": llm_proxy.metrics()}
 
 @app.get("/")
 async def root():
@@ -268,6 +225,7 @@ async def list_json_files(request: JsonListRequest):
                             'filename': key.split('/')[-1],
                             'size': obj['Size'],
                             'size_kb': round(obj['Size'] / 1024, 2),
+                            'etag': obj['ETag'].strip('"'),
                             'last_modified': obj['LastModified'].isoformat()
                         })
 
@@ -305,6 +263,53 @@ async def download_json_file(request: JsonDownloadRequest):
         raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
 
 
+@app.get("/s3/download-stream")
+async def download_stream(bucket: str, key: str, start: int = 0):
+    """Stream an S3 object unparsed, optionally from a byte offset (for resumable downloads)"""
+    from fastapi.responses import StreamingResponse
+    try:
+        if start:
+            response = s3_client.get_object(Bucket=bucket, Key=key, Range=f'bytes={start}-')
+        else:
+            response = s3_client.get_object(Bucket=bucket, Key=key)
+
+        return StreamingResponse(
+            response['Body'],
+            status_code=206 if start else 200,
+            media_type='application/octet-stream',
+            headers={
+                'Content-Length': str(response['ContentLength']),
+                'ETag': response['ETag'],
+            }
+        )
+    except ClientError as e:
+        raise HTTPException(status_code=404, detail=f"S3 error: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+
+@app.get("/s3/head")
+async def head_object(bucket: str, key: str):
+    """Size, ETag and server-side encryption of an S3 object (no download)"""
+    try:
+        response = s3_client.head_object(Bucket=bucket, Key=key)
+        encryption = response.get('ServerSideEncryption')
+        if response.get('SSECustomerAlgorithm'):
+            encryption = 'SSE-C'
+
+        return {
+            'key': key,
+            'filename': key.split('/')[-1],
+            'size': response['ContentLength'],
+            'etag': response['ETag'].strip('"'),
+            'encryption': encryption,
+        }
+    except ClientError as e:
+        raise HTTPException(status_code=404, detail=f"S3 error: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error: {str(e)}")
+
+
 @app.post("/s3/json/batch-download")
 async def batch_download_json(request: JsonBatchRequest):
     """Download multiple JSON files from S3"""
@@ -388,6 +393,7 @@ async def list_parquet_files(request: ParquetListRequest):
                             'filename': key.split('/')[-1],
                             'size': obj['Size'],
                             'size_mb': round(obj['Size'] / (1024 * 1024), 2),
+                            'etag': obj['ETag'].strip('"'),
                             'last_modified': obj['LastModified'].isoformat()
                         })
 
@@ -996,6 +1002,45 @@ class S3APIClient:
         response.raise_for_status()
         return response.json()
 
+    def head_object(self, bucket: str, key: str) -> Dict[str, Any]:
+        """
+        Get the size, ETag and encryption of an S3 object without downloading it.
+
+        Args:
+            bucket: S3 bucket name
+            key: S3 object key
+
+        Returns:
+            Dict with key, filename, size, etag and encryption
+        """
+        response = requests.get(
+            f'{self.api_url}/s3/head',
+            params={'bucket': bucket, 'key': key}
+        )
+        response.raise_for_status()
+        return response.json()
+
+    def open_stream(self, bucket: str, key: str, start: int = 0):
+        """
+        Open an S3 object as a raw byte stream (not parsed).
+
+        Args:
+            bucket: S3 bucket name
+            key: S3 object key
+            start: Byte offset to start from (resume a partial download)
+
+        Returns:
+            File-like object with read(); close it when done
+        """
+        response = requests.get(
+            f'{self.api_url}/s3/download-stream',
+            params={'bucket': bucket, 'key': key, 'start': start},
+            stream=True
+        )
+        response.raise_for_status()
+        response.raw.decode_content = True
+        return response.raw
+
     def batch_download_json(
         self,
         bucket: str,
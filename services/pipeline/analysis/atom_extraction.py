@@ -1,17 +1,18 @@
+import argparse
 import sqlite3
-import re
 import json
 import os
 import boto3
 from botocore.exceptions import ClientError
 from openai import AzureOpenAI
-from shared.utils.utils import Config, gai, fetch_gai_content
-from shared.utils.utils import find_json_objects,concatenate_files
-from collections import defaultdict
-import pandas as pd
+from shared.utils.utils import get_llm_engine
+from shared.utils.utils import find_json_objects
+from services.pipeline.ingestion.atom import read_atom_files
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-current_date = datetime.now()
-date_string = current_date.strftime("%Y-%m-%d")
+
+# Append-only log of every extraction result, one JSON object per line
+CHECKPOINT_FILE = "./backend/atom/extraction_results.jsonl"
 
 def load_sql(command):
     sql_file = os.path.join('./kuwait/sql', f'{command}.sql')
@@ -79,7 +80,7 @@ def fetch_gai_content(response):
         gai_output = find_json_objects(response['choices'][0]['message']['content'])
     return gai_output
 
-def gai(sys_prompt, user_prompt, model="gpt-4o-mini"):
+def _azure_request(sys_prompt, user_prompt, source="azure", model="gpt-4o-mini"):
     # Create a chat completion using the specified model and prompts
     completion = client.chat.completions.create(
         model=model, 
@@ -97,6 +98,10 @@ def gai(sys_prompt, user_prompt, model="gpt-4o-mini"):
     # Return the completion as a JSON object
     return json.loads(completion.model_dump_json())
 
+def gai(sys_prompt, user_prompt, model="gpt-4o-mini"):
+    # Shared LLMEngine: azure rate limits, in-flight cap and retry on 429/5xx
+    return get_llm_engine().call(_azure_request, sys_prompt, user_prompt, source="azure", model=model)
+
 def process_output(output):
     if isinstance(output,dict):
         return output
@@ -104,7 +109,7 @@ def process_output(output):
         return output[0]
 
 def fetch_atom_files(directory="./backend/atom/processed"):
-    df = concatenate_files(directory)
+    df = read_atom_files(directory)
     if len(df)<1:
         print("No data loaded")
         return
@@ -113,27 +118,45 @@ def fetch_atom_files(directory="./backend/atom/processed"):
     df['date'] = df['Source Date, Start'].apply(parse_date)
     return df
 
-def insert_extract(atom_id,output):
-    sql_command = load_sql('insert_extract')
-    salience = process_salience(output)
-    data = (atom_id,
+def extract_row(atom_id,output):
+    """Row for the extract table; non-salient outputs only carry the justification."""
+    salience = str(output.get('salience-bool')).lower() == 'true'
+    return (atom_id,
             salience,
-            output['salience-justification'],
-            output['category'],
-            output['category-justification'],
-            output['subcategory'],
-            output['initiating-country'],
-            output['recipient-country'],
-            output['projects'],
-            output['LAT_LONG'],
-            output['location'],
-            output['monetary-commitment'],
-            output['distilled-text'],
-            output['event-name'])
-    cursor.execute(sql_command,data)
-
-def run_extraction(conn,df):
-    extraction_prompt = '''You are an expert in tracking and identifying inter-country 'soft power' engagements, where one country through economic, social, cultural, or political means, fosters influence over another country.
+            output.get('salience-justification'),
+            output.get('category'),
+            output.get('category-justification'),
+            output.get('subcategory'),
+            output.get('initiating-country'),
+            output.get('recipient-country'),
+            output.get('projects'),
+            output.get('LAT_LONG'),
+            output.get('location'),
+            output.get('monetary-commitment'),
+            output.get('distilled-text'),
+            output.get('event-name'))
+
+def insert_extracts(conn,results):
+    """Insert (atom_id, output) pairs into the extract table in one transaction."""
+    sql_command = load_sql('insert_extract')
+    conn.executemany(sql_command,[extract_row(atom_id,output) for atom_id,output in results])
+    conn.commit()
+
+def load_checkpoint(checkpoint_file=CHECKPOINT_FILE):
+    """Read the JSONL checkpoint into {atom_id: output}; a torn last line is ignored."""
+    results = {}
+    if not os.path.exists(checkpoint_file):
+        return results
+    with open(checkpoint_file,'r') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            results[entry['atom_id']] = entry['output']
+    return results
+
+EXTRACTION_PROMPT = '''You are an expert in tracking and identifying inter-country 'soft power' engagements, where one country through economic, social, cultural, or political means, fosters influence over another country.
 
 Please execute the following steps and output the results using the provided json template.
 1. Determine if the focus of the following text is a soft power-related event or influence activity of one country towards another. Ensure that the context in which soft power is discussed is significant and substantial, not merely a passing reference. Avoid flagging articles that only broadly mention a soft power relevant event without focusing on specific events or initiatives. Exclude articles that primarily focus on unrelated topics with only a tangential mention of a soft power relevant event.
@@ -203,57 +226,90 @@ Please execute the following steps and output the results using the provided jso
 
 IMPORTANT: ONLY output the json. ONLY use the json format. ALL output values should ONLY be in English.
 '''
-    results_file = f"./backend/atom/extraction_results_{date_string}.json"
-    os.makedirs(os.path.dirname(results_file), exist_ok=True)
-    if os.path.exists(results_file):
-        with open(results_file, 'r') as f:
-            previous_results = json.load(f)
-        processed_atoms = set()
-        for r in previous_results:
-            processed_atoms.update(r.keys())
-    else:
-        previous_results = []
-        processed_atoms = set()
-    salient_atoms = [dict(x)['atom_id'] for x in cursor.execute('''SELECT atom_id FROM salience WHERE salience==1''').fetchall()]
-    salient_df = df[df['ATOM ID'].isin(salient_atoms)]
-    salient_df.reset_index(inplace=True,drop=True)
-    atom_extracts = [dict(x)['atom_id'] for x in cursor.execute('''SELECT atom_id FROM extract''').fetchall()]
-    salient_df = salient_df[~salient_df['ATOM ID'].isin(atom_extracts)]
-    salient_df = salient_df[~salient_df['ATOM ID'].isin(processed_atoms)]
-    salient_df.reset_index(inplace=True,drop=True)
-    errors = []
-    count = 0
-    results = previous_results.copy()
-    for i in range(len(salient_df)):
-        result = {}
-        row = salient_df.iloc[i]
-        atom_id = row['ATOM ID']
-        title = row['Title']
-        body = row['BODY']
-        user_prompt = f'{title}: {body}'
-        sys_prompt = extraction_prompt
-        
-        response = gai(sys_prompt,user_prompt,model="gpt-4o-mini")
-        gai_output = fetch_gai_content(response)
-        output = process_output(gai_output)
-        result[atom_id] = output
-        results.append(result)
-        print(f"processed {atom_id}")
-        count += 1
-        if count == 25:
-            count = 0
-            with open(results_file,'w') as f: 
-                json.dump(results,f,indent=4)
+
+def extract_atom(user_prompt):
+    response = gai(EXTRACTION_PROMPT,user_prompt,model="gpt-4o-mini")
+    return process_output(fetch_gai_content(response))
+
+def run_extraction(conn,df,workers=8,write_batch=50,checkpoint_file=CHECKPOINT_FILE):
+    """
+    Extract soft power fields for salient, not yet extracted atoms.
+
+    Prompts run on `workers` threads through the shared LLM engine. Every
+    result is appended to the JSONL checkpoint as soon as it arrives, and
+    extract rows are written every `write_batch` results from this thread
+    (the only one using the sqlite connection). Results that reached the
+    checkpoint but not the database (e.g. after a crash) are inserted first.
+    """
+    cursor = conn.cursor()
+    os.makedirs(os.path.dirname(checkpoint_file), exist_ok=True)
+
+    # Everything already done, loaded once
+    extracted = {str(dict(x)['atom_id']) for x in cursor.execute('''SELECT atom_id FROM extract''').fetchall()}
+    checkpoint = load_checkpoint(checkpoint_file)
+    replay = [(atom_id,output) for atom_id,output in checkpoint.items() if atom_id not in extracted]
+    if replay:
+        insert_extracts(conn,replay)
+        print(f"inserted {len(replay)} checkpointed extracts missing from the database")
+    done = extracted | set(checkpoint)
+
+    salient_atoms = {str(dict(x)['atom_id']) for x in cursor.execute('''SELECT atom_id FROM salience WHERE salience==1''').fetchall()}
+    atom_ids = df['ATOM ID'].astype(str)
+    salient_df = df[atom_ids.isin(salient_atoms) & ~atom_ids.isin(done)]
+    salient_df = salient_df.drop_duplicates(subset='ATOM ID').reset_index(drop=True)
+    total = len(salient_df)
+    print(f"{total} salient atoms to extract ({len(done)} already done), {workers} workers")
+
+    pending = []
+    errors = 0
+    completed = 0
+    with open(checkpoint_file,'a') as log, ThreadPoolExecutor(max_workers=max(1,workers)) as executor:
+        futures = {
+            executor.submit(extract_atom,f'{title}: {body}'): str(atom_id)
+            for atom_id,title,body in zip(salient_df['ATOM ID'],salient_df['Title'],salient_df['BODY'])
+        }
+        for future in as_completed(futures):
+            atom_id = futures[future]
+            completed += 1
+            try:
+                output = future.result()
+                if not isinstance(output,dict):
+                    raise ValueError(f"unparseable response: {str(output)[:100]}")
+            except Exception as e:
+                print(f"error processing {atom_id}: {e}")
+                cursor.execute(load_sql('insert_error'),(atom_id,'extraction'))
+                errors += 1
+                continue
+
+            log.write(json.dumps({'atom_id': atom_id, 'output': output}) + '\n')
+            log.flush()
+            pending.append((atom_id,output))
+            print(f"[{completed}/{total}] processed {atom_id}")
+
+            if len(pending) >= write_batch:
+                insert_extracts(conn,pending)
+                pending = []
                 print('results saved...')
-     
+
+    if pending:
+        insert_extracts(conn,pending)
+    conn.commit()
+    print(f"extraction complete: {completed - errors} extracted, {errors} errors")
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract soft power fields from salient ATOM articles")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent LLM calls (default: 8)")
+    parser.add_argument("--write-batch", type=int, default=50, help="Extract rows per database write (default: 50)")
+    parser.add_argument("--checkpoint", type=str, default=CHECKPOINT_FILE, help=f"JSONL checkpoint file (default: {CHECKPOINT_FILE})")
+    args = parser.parse_args()
+
     conn = sqlite3.connect('./kuwait/kuwait_sp.db')
     conn.row_factory = sqlite3.Row
     conn.execute('PRAGMA journal_mode = WAL;')
     cursor = conn.cursor()
     df = fetch_atom_files()
     if len(df) > 0:
-        run_extraction(conn,df)
+        run_extraction(conn,df,workers=args.workers,write_batch=args.write_batch,checkpoint_file=args.checkpoint)
     else:
         print("no data")
     
@@ -1,9 +1,12 @@
 import boto3
+import hashlib
 import os
 import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from botocore.exceptions import ClientError
 from shared.utils.utils import cfg  # Import the already-loaded config
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from services.api.main import get_s3_api_client
 
 session = boto3.Session()
@@ -212,6 +215,7 @@ def list_s3_json_files(s3_prefix: str = "dsr_extracts/", api_url: Optional[str]
                             'key': key,
                             'filename': key.split('/')[-1],
                             'size': obj['Size'],
+                            'etag': obj['ETag'].strip('"'),
                             'last_modified': obj['LastModified']
                         })
 
@@ -253,33 +257,393 @@ def download_s3_json_file(s3_key: str, api_url: Optional[str] = None) -> List[Di
         print(f"Error downloading {s3_key}: {e}")
         raise
 
+def open_s3_stream(s3_key: str, api_url: Optional[str] = None, start: int = 0, bucket: Optional[str] = None):
+    """
+    Open an S3 object as a raw byte stream without reading it into memory.
+
+    Args:
+        s3_key: S3 object key
+        api_url: Optional API URL (overrides default)
+        start: Byte offset to start from (resume a partial download)
+        bucket: S3 bucket (default: bucket from config)
+
+    Returns:
+        File-like object with read(); close it when done
+    """
+    bucket = bucket or bucket_name
+
+    # Use API client if available
+    client = _get_api_client(api_url)
+    if client:
+        try:
+            return client.open_stream(bucket=bucket, key=s3_key, start=start)
+        except Exception as e:
+            print(f"API client failed, falling back to direct S3: {e}")
+            # Fall through to direct S3 access
+
+    # Fallback to direct boto3 access
+    if start:
+        response = s3_client.get_object(Bucket=bucket, Key=s3_key, Range=f'bytes={start}-')
+    else:
+        response = s3_client.get_object(Bucket=bucket, Key=s3_key)
+    return response['Body']
+
+def head_s3_object(s3_key: str, api_url: Optional[str] = None, bucket: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Get an S3 object's size, ETag and server-side encryption without downloading it.
+
+    Args:
+        s3_key: S3 object key
+        api_url: Optional API URL (overrides default)
+        bucket: S3 bucket (default: bucket from config)
+
+    Returns:
+        File dict with key, filename, size, etag and encryption
+    """
+    bucket = bucket or bucket_name
+
+    # Use API client if available
+    client = _get_api_client(api_url)
+    if client:
+        try:
+            return client.head_object(bucket=bucket, key=s3_key)
+        except Exception as e:
+            print(f"API client failed, falling back to direct S3: {e}")
+            # Fall through to direct S3 access
+
+    # Fallback to direct boto3 access
+    response = s3_client.head_object(Bucket=bucket, Key=s3_key)
+    encryption = response.get('ServerSideEncryption')
+    if response.get('SSECustomerAlgorithm'):
+        encryption = 'SSE-C'
+    return {
+        'key': s3_key,
+        'filename': s3_key.split('/')[-1],
+        'size': response['ContentLength'],
+        'etag': response['ETag'].strip('"'),
+        'encryption': encryption,
+    }
+
+def describe_s3_files(s3_keys: List[str], api_url: Optional[str] = None, bucket: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    File dicts (key, filename, size, etag) for explicitly named objects, like a listing would return.
+
+    Objects that cannot be described are kept with key and filename only,
+    so the failure surfaces when they are downloaded.
+    """
+    files = []
+    for s3_key in s3_keys:
+        try:
+            files.append(head_s3_object(s3_key, api_url=api_url, bucket=bucket))
+        except Exception as e:
+            print(f"[WARNING] Could not get size/ETag of {s3_key}: {e}")
+            files.append({'key': s3_key, 'filename': s3_key.split('/')[-1]})
+    return files
+
+def iter_s3_json_items(s3_key: str, api_url: Optional[str] = None, bucket: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the elements of a top-level JSON array stored in S3, one at a time.
+
+    The object is parsed incrementally (ijson) as it downloads, so memory use
+    does not depend on the file size. The stream is opened on first iteration.
+
+    Args:
+        s3_key: S3 object key
+        api_url: Optional API URL (overrides default)
+        bucket: S3 bucket (default: bucket from config)
+
+    Yields:
+        Parsed array elements
+    """
+    import ijson
+
+    stream = open_s3_stream(s3_key, api_url, bucket=bucket)
+    try:
+        yield from ijson.items(stream, 'item', use_float=True)
+    finally:
+        stream.close()
+
+def iter_json_file(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the elements of a top-level JSON array file one at a time (ijson).
+
+    The file is opened on first iteration and closed when exhausted.
+    """
+    import ijson
+
+    with open(path, 'rb') as f:
+        yield from ijson.items(f, 'item', use_float=True)
+
+# Partial downloads are kept here so an interrupted run resumes them
+DEFAULT_PREFETCH_DIR = './_data/cache/s3_prefetch'
+
+def _file_md5(path: str, chunk_size: int = 1 << 20) -> str:
+    md5 = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            md5.update(chunk)
+    return md5.hexdigest()
+
+def s3_etag_is_md5(etag: Optional[str], encryption: Optional[str] = None) -> bool:
+    """
+    Whether an ETag is the MD5 of the object's content.
+
+    True only for single-part uploads stored unencrypted or with SSE-S3
+    (AES256). Multipart ETags are '<md5>-<parts>', and SSE-KMS / SSE-C
+    objects have ETags that look like an MD5 but are not one.
+    """
+    if not etag or len(etag) != 32 or any(c not in '0123456789abcdef' for c in etag.lower()):
+        return False
+    return encryption in (None, 'AES256')
+
+def verify_download(path: str, expected_size: Optional[int] = None, expected_md5: Optional[str] = None) -> None:
+    """
+    Check a downloaded file against the object's size and, when known, content MD5.
+
+    Args:
+        path: Local file
+        expected_size: Object size in bytes
+        expected_md5: Content MD5 (the ETag, when s3_etag_is_md5); None checks the size only
+
+    Raises:
+        ValueError: If the size or checksum does not match
+    """
+    size = os.path.getsize(path)
+    if expected_size is not None and size != expected_size:
+        raise ValueError(f"Size mismatch for {path}: {size} bytes, expected {expected_size}")
+
+    if expected_md5:
+        checksum = _file_md5(path)
+        if checksum != expected_md5.lower():
+            raise ValueError(f"Checksum mismatch for {path}: md5 {checksum}, expected {expected_md5}")
+
+def _remove_files(*paths: str) -> None:
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+def remove_download(dest: str) -> None:
+    """Delete a file written by download_s3_file, with its partial download and ETag marker."""
+    _remove_files(dest, dest + '.part', dest + '.etag')
+
+def download_s3_file(
+    s3_key: str,
+    dest: str,
+    api_url: Optional[str] = None,
+    bucket: Optional[str] = None,
+    max_retries: int = 3,
+    chunk_size: int = 1 << 20
+) -> str:
+    """
+    Download an S3 object to a local file, resuming partial downloads with byte ranges.
+
+    The object is HEADed first for its current size, ETag and encryption.
+    The ETag is written next to dest (dest + '.etag'); a local copy or
+    .part file left by a run against a different version of the object is
+    discarded instead of reused or appended to.
+
+    Data is written to dest + '.part'. An existing .part file (from an
+    interrupted run or a dropped connection) is continued from its current
+    size instead of starting over. The finished file is checked against the
+    size, and against the MD5 when the ETag is one (see s3_etag_is_md5),
+    before it is renamed to dest; a file that fails the check is deleted so
+    the next attempt starts clean.
+
+    Args:
+        s3_key: S3 object key
+        dest: Local file path
+        api_url: Optional API URL (overrides default)
+        bucket: S3 bucket (default: bucket from config)
+        max_retries: Resume attempts after a failed or truncated read
+
+    Returns:
+        dest
+    """
+    head = head_s3_object(s3_key, api_url=api_url, bucket=bucket)
+    expected_size = head['size']
+    expected_md5 = head['etag'] if s3_etag_is_md5(head['etag'], head.get('encryption')) else None
+
+    part = dest + '.part'
+    marker = dest + '.etag'
+    previous_etag = None
+    if os.path.exists(marker):
+        with open(marker) as f:
+            previous_etag = f.read().strip()
+    if previous_etag != head['etag']:
+        _remove_files(dest, part)
+        with open(marker, 'w') as f:
+            f.write(head['etag'])
+
+    if os.path.exists(dest):
+        try:
+            verify_download(dest, expected_size, expected_md5)
+            return dest
+        except ValueError:
+            os.remove(dest)
+
+    open(part, 'ab').close()
+    for attempt in range(max_retries + 1):
+        offset = os.path.getsize(part)
+        if offset >= expected_size:
+            break
+
+        try:
+            stream = open_s3_stream(s3_key, api_url, start=offset, bucket=bucket)
+            try:
+                with open(part, 'ab') as f:
+                    for chunk in iter(lambda: stream.read(chunk_size), b''):
+                        f.write(chunk)
+            finally:
+                stream.close()
+        except Exception as e:
+            if attempt == max_retries:
+                raise
+            written = os.path.getsize(part)
+            print(f"[WARNING] Download of {s3_key} interrupted at {written} bytes ({e}); resuming")
+            continue
+
+        if os.path.getsize(part) >= expected_size:
+            break
+
+    try:
+        verify_download(part, expected_size, expected_md5)
+    except ValueError:
+        os.remove(part)
+        raise
+
+    os.replace(part, dest)
+    return dest
+
+class S3Prefetcher:
+    """
+    Download S3 files ahead of processing with a bounded thread pool.
+
+    While the caller processes one file, the next `prefetch` files download
+    in the background (resumable, size/ETag verified, see download_s3_file).
+    Files are yielded in listing order with a future for their local path;
+    a file's local copy is deleted when the caller moves on to the next one,
+    so at most prefetch + 1 files are on disk at a time. With prefetch=0 each
+    file is only downloaded once the caller has finished the previous one.
+
+    Usage:
+        for file_info, download in S3Prefetcher(files, prefetch=3):
+            try:
+                path = download.result()
+            except Exception as e:
+                print(f"Failed to download {file_info['filename']}: {e}")
+                continue
+            process(path)
+    """
+
+    def __init__(
+        self,
+        files: List[Dict[str, Any]],
+        prefetch: int = 2,
+        cache_dir: str = DEFAULT_PREFETCH_DIR,
+        api_url: Optional[str] = None,
+        bucket: Optional[str] = None,
+        keep_files: bool = False
+    ):
+        """
+        Args:
+            files: File dicts with 'key' and 'filename'
+            prefetch: Files downloaded ahead of the one being processed (0 = none)
+            cache_dir: Local directory for downloads and resumable .part files
+            api_url: Optional API URL (overrides default)
+            bucket: S3 bucket (default: bucket from config)
+            keep_files: Keep local copies after they have been processed
+        """
+        self.files = files
+        self.prefetch = max(0, prefetch)
+        self.cache_dir = cache_dir
+        self.api_url = api_url
+        self.bucket = bucket
+        self.keep_files = keep_files
+
+    def local_path(self, file_info: Dict[str, Any]) -> str:
+        return os.path.join(self.cache_dir, file_info['key'].replace('/', '__'))
+
+    def _download(self, file_info: Dict[str, Any]) -> str:
+        path = download_s3_file(
+            file_info['key'],
+            self.local_path(file_info),
+            api_url=self.api_url,
+            bucket=self.bucket
+        )
+        print(f"Downloaded {file_info['key']}{' (prefetch)' if self.prefetch else ''}")
+        return path
+
+    def __iter__(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        files = iter(self.files)
+        pending = deque()
+
+        with ThreadPoolExecutor(max_workers=max(1, self.prefetch)) as pool:
+            def submit_next():
+                file_info = next(files, None)
+                if file_info is not None:
+                    pending.append((file_info, pool.submit(self._download, file_info)))
+
+            # The file being processed plus `prefetch` files ahead
+            for _ in range(self.prefetch + 1):
+                submit_next()
+
+            try:
+                while pending:
+                    file_info, future = pending.popleft()
+                    try:
+                        yield file_info, future
+                    finally:
+                        if not self.keep_files and future.done() and not future.exception():
+                            remove_download(future.result())
+                    submit_next()
+            finally:
+                # Caller stopped early: do not start queued downloads
+                for _, future in pending:
+                    future.cancel()
+
 def get_unprocessed_s3_files(s3_prefix: str = "dsr_extracts/") -> List[Dict[str, Any]]:
     """
     Get list of JSON files from S3 that haven't been processed yet.
+
+    A processed file whose ETag no longer matches the one recorded in the
+    tracker has been replaced in S3 and is returned again.
     """
     # Load processed files tracker
     tracker_data = load_processed_files_tracker(s3_prefix)
     processed_files = set(tracker_data.get('processed_files', []))
+    checksums = tracker_data.get('checksums', {})
 
     # Get all JSON files in S3
     all_files = list_s3_json_files(s3_prefix)
 
     # Filter out already processed files
-    unprocessed_files = [
-        file_info for file_info in all_files
-        if file_info['filename'] not in processed_files
-    ]
+    unprocessed_files = []
+    for file_info in all_files:
+        filename = file_info['filename']
+        if filename not in processed_files:
+            unprocessed_files.append(file_info)
+        elif checksums.get(filename) and file_info.get('etag') and checksums[filename] != file_info['etag']:
+            print(f"[INFO] {filename} changed since it was processed (ETag {checksums[filename]} -> {file_info['etag']})")
+            unprocessed_files.append(file_info)
 
     print(f"Found {len(unprocessed_files)} unprocessed files out of {len(all_files)} total JSON files")
     return unprocessed_files
 
-def mark_file_as_processed(filename: str, s3_prefix: str = "dsr_extracts/") -> None:
+def mark_file_as_processed(filename: str, s3_prefix: str = "dsr_extracts/", etag: Optional[str] = None) -> None:
     """
-    Mark a file as processed in the tracker.
+    Mark a file as processed in the tracker, recording its ETag when known.
     """
     tracker_data = load_processed_files_tracker(s3_prefix)
+    changed = False
     if filename not in tracker_data['processed_files']:
         tracker_data['processed_files'].append(filename)
+        changed = True
+    if etag and tracker_data.setdefault('checksums', {}).get(filename) != etag:
+        tracker_data['checksums'][filename] = etag
+        changed = True
+
+    if changed:
         save_processed_files_tracker(tracker_data, s3_prefix)
         print(f"Marked {filename} as processed")
 
@@ -303,46 +667,78 @@ def reprocess_files(filenames: List[str], s3_prefix: str = "dsr_extracts/") -> N
     else:
         print("No files were marked for reprocessing")
 
-def load_dsr_from_s3(s3_prefix: str = "dsr_extracts/", specific_files: List[str] = None) -> List[List[Dict[str, Any]]]:
+def stream_dsr_from_s3(
+    s3_prefix: str = "dsr_extracts/",
+    specific_files: List[str] = None,
+    prefetch: int = 0,
+    cache_dir: str = DEFAULT_PREFETCH_DIR
+) -> Iterator[Tuple[Dict[str, Any], Iterator[Dict[str, Any]]]]:
     """
-    Load DSR JSON files from S3 bucket.
+    Stream DSR JSON files from S3 without materializing them.
+
+    Files are parsed lazily, one at a time, as the caller iterates, and are
+    not marked as processed here: the caller marks each file once its
+    documents are committed (see mark_file_as_processed).
+
+    With prefetch > 0 the next files download to cache_dir in the background
+    (S3Prefetcher) and are parsed from disk; otherwise each file is parsed
+    straight from the S3 stream. Download errors surface when the file's
+    documents are iterated.
 
     Args:
         s3_prefix: S3 prefix/folder to search for JSON files
         specific_files: Optional list of specific filenames to process
+        prefetch: Files to download ahead of the one being parsed (0 = no prefetch)
+        cache_dir: Local directory for prefetched files
 
-    Returns:
-        List of parsed JSON data from each file
+    Yields:
+        (file_info, documents) where documents is a generator of raw DSR documents
     """
-    dsr_data = []
-
     if specific_files:
-        # Process only specific files
-        files_to_process = []
-        for filename in specific_files:
-            s3_key = f"{s3_prefix}{filename}"
-            files_to_process.append({
-                'key': s3_key,
-                'filename': filename
-            })
+        files_to_process = describe_s3_files([f"{s3_prefix}{filename}" for filename in specific_files])
         print(f"Processing {len(specific_files)} specific files")
     else:
-        # Get unprocessed files
         files_to_process = get_unprocessed_s3_files(s3_prefix)
 
     if not files_to_process:
         print("No files to process")
-        return dsr_data
+        return
+
+    if not prefetch:
+        for file_info in files_to_process:
+            yield file_info, iter_s3_json_items(file_info['key'])
+        return
+
+    def prefetched_items(download):
+        yield from iter_json_file(download.result())
+
+    for file_info, download in S3Prefetcher(files_to_process, prefetch=prefetch, cache_dir=cache_dir):
+        yield file_info, prefetched_items(download)
+
+def load_dsr_from_s3(s3_prefix: str = "dsr_extracts/", specific_files: List[str] = None) -> List[List[Dict[str, Any]]]:
+    """
+    Load DSR JSON files from S3 into memory.
+
+    Kept for the legacy backend.scripts.dsr loader; new code should iterate
+    stream_dsr_from_s3 instead of holding every file in memory. Each file is
+    marked as processed once it has been read in full (not for specific files).
+
+    Args:
+        s3_prefix: S3 prefix/folder to search for JSON files
+        specific_files: Optional list of specific filenames to process
+
+    Returns:
+        List of parsed JSON data from each file
+    """
+    dsr_data = []
 
-    for file_info in files_to_process:
+    for file_info, documents in stream_dsr_from_s3(s3_prefix=s3_prefix, specific_files=specific_files):
         try:
-            # Download and parse the JSON file
-            data = download_s3_json_file(file_info['key'])
-            dsr_data.append(data)
+            dsr_data.append(list(documents))
 
             # Mark as processed (only if not processing specific files)
             if not specific_files:
-                mark_file_as_processed(file_info['filename'], s3_prefix)
+                mark_file_as_processed(file_info['filename'], s3_prefix, etag=file_info.get('etag'))
 
         except Exception as e:
             print(f"Error processing {file_info['filename']}: {e}")
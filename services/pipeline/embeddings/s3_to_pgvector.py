@@ -48,7 +48,7 @@ from services.pipeline.embeddings.embedding_vectorstore import (
 from services.api.api_client import get_s3_api_client
 
 # S3 configuration from config.yaml
-from services.pipeline.embeddings.s3 import get_bucket_name, get_s3_prefix
+from services.pipeline.embeddings.s3 import S3Prefetcher, describe_s3_files, get_bucket_name, get_s3_prefix
 
 
 class S3ToPgVectorMigrator:
@@ -62,7 +62,8 @@ class S3ToPgVectorMigrator:
         dry_run: bool = False,
         force_reprocess: bool = False,
         tracker_dir: str = './_data/processed/embeddings',
-        api_url: Optional[str] = None
+        api_url: Optional[str] = None,
+        prefetch: int = 2
     ):
         """
         Initialize the migrator.
@@ -75,6 +76,7 @@ class S3ToPgVectorMigrator:
             force_reprocess: If True, reprocess files even if already processed
             tracker_dir: Local directory to store processed file tracker
             api_url: FastAPI URL for S3 operations (default: from env or localhost:8000)
+            prefetch: Parquet files downloaded in the background while the current one is inserted (0 = none)
         """
         # Use config defaults if not specified
         self.bucket_name = bucket_name or get_bucket_name()
@@ -83,6 +85,8 @@ class S3ToPgVectorMigrator:
         self.collection_name = collection_name
         self.dry_run = dry_run
         self.force_reprocess = force_reprocess
+        self.api_url = api_url
+        self.prefetch = prefetch
 
         # Local tracker file
         self.tracker_dir = Path(tracker_dir)
@@ -120,6 +124,7 @@ class S3ToPgVectorMigrator:
         print(f"  Previously Processed: {len(self.processed_files.get('files', []))} files")
         print(f"  Dry Run: {dry_run}")
         print(f"  Force Reprocess: {force_reprocess}")
+        print(f"  Prefetch: {prefetch} files")
 
     def _load_tracker(self) -> Dict[str, Any]:
         """Load the processed files tracker from local file."""
@@ -163,8 +168,8 @@ class S3ToPgVectorMigrator:
             import traceback
             traceback.print_exc()
 
-    def _mark_file_processed(self, filename: str, document_count: int):
-        """Mark a file as processed in the tracker."""
+    def _mark_file_processed(self, filename: str, document_count: int, etag: Optional[str] = None):
+        """Mark a file as processed in the tracker, recording its ETag when known."""
         if 'files' not in self.processed_files:
             self.processed_files['files'] = []
 
@@ -174,6 +179,8 @@ class S3ToPgVectorMigrator:
             'processed_at': datetime.utcnow().isoformat(),
             'document_count': document_count
         }
+        if etag:
+            file_entry['etag'] = etag
 
         # Remove if already exists (for reprocessing)
         self.processed_files['files'] = [
@@ -184,16 +191,23 @@ class S3ToPgVectorMigrator:
         self.processed_files['files'].append(file_entry)
         self._save_tracker()
 
-    def _is_file_processed(self, filename: str) -> bool:
-        """Check if a file has already been processed."""
+    def _is_file_processed(self, filename: str, etag: Optional[str] = None) -> bool:
+        """
+        Check if a file has already been processed.
+
+        A file whose current ETag differs from the one recorded when it was
+        processed has been replaced in S3 and counts as unprocessed.
+        """
         if self.force_reprocess:
             return False
 
-        processed_filenames = [
-            f.get('filename')
-            for f in self.processed_files.get('files', [])
-        ]
-        return filename in processed_filenames
+        for entry in self.processed_files.get('files', []):
+            if entry.get('filename') == filename:
+                if etag and entry.get('etag') and entry['etag'] != etag:
+                    print(f"[INFO] {filename} changed since it was processed (ETag {entry['etag']} -> {etag})")
+                    return False
+                return True
+        return False
 
     def list_parquet_files(self, skip_processed: bool = True) -> List[Dict[str, Any]]:
         """
@@ -218,7 +232,7 @@ class S3ToPgVectorMigrator:
                 filename = file_info['filename']
 
                 # Skip if already processed
-                if skip_processed and self._is_file_processed(filename):
+                if skip_processed and self._is_file_processed(filename, file_info.get('etag')):
                     continue
 
                 parquet_files.append(file_info)
@@ -242,11 +256,16 @@ class S3ToPgVectorMigrator:
 
         Args:
             s3_key: S3 object key
-            local_path: Not used (kept for compatibility)
+            local_path: Already downloaded copy (e.g. by S3Prefetcher); read instead of downloading
 
         Returns:
             DataFrame containing complete parquet data including full embeddings
         """
+        if local_path:
+            df = pd.read_parquet(local_path)
+            print(f"  Loaded {len(df)} rows from {s3_key} (prefetched)")
+            return df
+
         try:
             # Use API client to download full parquet file
             print(f"Downloading {s3_key} via API...")
@@ -403,12 +422,14 @@ class S3ToPgVectorMigrator:
 
         return normalized
 
-    def process_parquet_file(self, s3_key: str) -> int:
+    def process_parquet_file(self, s3_key: str, local_path: Optional[str] = None, etag: Optional[str] = None) -> int:
         """
         Process a single parquet file: download, extract, and insert into pgvector.
 
         Args:
             s3_key: S3 object key
+            local_path: Prefetched local copy of the file (downloaded here if omitted)
+            etag: S3 ETag of the file, recorded in the tracker once processed
 
         Returns:
             Number of documents processed
@@ -420,13 +441,13 @@ class S3ToPgVectorMigrator:
         print(f"{'='*80}")
 
         # Check if already processed (unless force_reprocess is True)
-        if self._is_file_processed(filename):
+        if self._is_file_processed(filename, etag):
             print(f"⊘ Skipping {filename} - already processed")
             print(f"  Use --force to reprocess this file")
             return 0
 
         # Download parquet file
-        df = self.download_parquet_file(s3_key)
+        df = self.download_parquet_file(s3_key, local_path)
 
         # Validate schema
         if not self.validate_parquet_schema(df):
@@ -450,7 +471,7 @@ class S3ToPgVectorMigrator:
                 if len(df) == 0:
                     print(f"All documents in {filename} already exist in collection, skipping file")
                     # Still mark as processed since all documents are accounted for
-                    self._mark_file_processed(filename, 0)
+                    self._mark_file_processed(filename, 0, etag)
                     return 0
 
         # Get document metadata
@@ -520,7 +541,7 @@ class S3ToPgVectorMigrator:
                 print(f"✓ Successfully inserted {len(documents_to_insert)} documents")
 
                 # Mark file as processed
-                self._mark_file_processed(filename, len(documents_to_insert))
+                self._mark_file_processed(filename, len(documents_to_insert), etag)
 
             except Exception as e:
                 print(f"✗ Error inserting documents: {e}")
@@ -545,23 +566,34 @@ class S3ToPgVectorMigrator:
 
         # Get list of files to process
         if specific_files:
-            files_to_process = []
-            for filename in specific_files:
-                s3_key = f"{self.s3_prefix}{filename}"
-                files_to_process.append({'key': s3_key, 'filename': filename})
+            # HEAD for size/ETag, as a listing would return, so changed files are detected
+            files_to_process = describe_s3_files(
+                [f"{self.s3_prefix}{filename}" for filename in specific_files],
+                api_url=self.api_url,
+                bucket=self.bucket_name
+            )
             print(f"Processing {len(specific_files)} specific files")
         else:
             all_files = self.list_parquet_files()
             files_to_process = all_files
 
-        # Process each file
+        # Don't download files that would be skipped anyway
+        files_to_process = [
+            f for f in files_to_process
+            if not (specific_files and self._is_file_processed(f['filename'], f.get('etag')))
+        ]
+
+        # Process each file while the next ones download in the background
         total_processed = 0
         successful_files = 0
         failed_files = []
 
-        for file_info in files_to_process:
+        prefetcher = S3Prefetcher(
+            files_to_process, prefetch=self.prefetch, api_url=self.api_url, bucket=self.bucket_name
+        )
+        for file_info, download in prefetcher:
             try:
-                count = self.process_parquet_file(file_info['key'])
+                count = self.process_parquet_file(file_info['key'], download.result(), file_info.get('etag'))
                 total_processed += count
                 successful_files += 1
             except Exception as e:
@@ -691,6 +723,12 @@ def main():
         default='http://host.docker.internal:5001',
         help='FastAPI URL for S3 operations (default: from env API_URL or http://localhost:8000)'
     )
+    migrate_parser.add_argument(
+        '--prefetch',
+        type=int,
+        default=2,
+        help='Parquet files downloaded in the background while the current one is inserted; 0 downloads each file only when it is reached (default: 2)'
+    )
 
     # View tracker command
     view_parser = subparsers.add_parser('view', help='View processed files tracker')
@@ -765,6 +803,12 @@ def main():
             default='http://host.docker.internal:5001',
             help='FastAPI URL for S3 operations (default: from env API_URL or http://localhost:8000)'
         )
+        parser.add_argument(
+            '--prefetch',
+            type=int,
+            default=2,
+            help='Parquet files downloaded in the background while the current one is inserted; 0 downloads each file only when it is reached (default: 2)'
+        )
 
         args = parser.parse_args()
 
@@ -776,7 +820,8 @@ def main():
             dry_run=args.dry_run,
             force_reprocess=args.force,
             tracker_dir=args.tracker_dir,
-            api_url=getattr(args, 'api_url', None)
+            api_url=getattr(args, 'api_url', None),
+            prefetch=args.prefetch
         )
 
         # Process files
@@ -801,7 +846,8 @@ def main():
                 dry_run=args.dry_run,
                 force_reprocess=args.force,
                 tracker_dir=args.tracker_dir,
-                api_url=getattr(args, 'api_url', None)
+                api_url=getattr(args, 'api_url', None),
+                prefetch=args.prefetch
             )
 
             # Process files
@@ -17,6 +17,8 @@ import os
 from pathlib import Path
 from datetime import datetime
 
+from shared.utils.llm_cache import add_llm_cache_args, apply_llm_cache_args
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -212,7 +214,10 @@ def main():
     parser.add_argument("--parallel-workers", type=int, default=10,
                         help="Number of parallel workers (default: 10)")
 
+    add_llm_cache_args(parser)
+
     args = parser.parse_args()
+    apply_llm_cache_args(args)
 
     logger.info("="*60)
     logger.info(f"BATCH ENTITY EXTRACTION: {args.country}")
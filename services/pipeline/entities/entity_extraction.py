@@ -35,6 +35,7 @@ from shared.utils.prompts_entity import (
     RELATIONSHIP_TYPES
 )
 from shared.utils.utils import gai, find_json_objects, cfg  # Import the already-loaded config
+from shared.utils.llm_cache import add_llm_cache_args, apply_llm_cache_args
 
 # Configure logging
 logging.basicConfig(
@@ -451,11 +452,14 @@ def main():
     parser.add_argument("--dry-run", action="store_true", help="Don't save to database")
     parser.add_argument("--model", type=str, default="gpt-4o-mini", help="LLM model to use")
     parser.add_argument("--reprocess", action="store_true",
-                        help="Force reprocess documents even if already extracted")
+                        help="Force reprocess documents even if already extracted (bypasses cached LLM responses)")
     parser.add_argument("--parallel-workers", type=int, default=1,
                         help="Number of parallel workers for processing (default: 1 = sequential)")
 
+    add_llm_cache_args(parser)
+
     args = parser.parse_args()
+    apply_llm_cache_args(args, refresh_flags=['reprocess'])
 
     # Parse dates
     start_date = None
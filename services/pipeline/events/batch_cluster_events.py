@@ -26,14 +26,45 @@ Usage:
     # Adjust clustering sensitivity (eps) and LLM batch size
     python services/pipeline/events/batch_cluster_events.py --country China --date 2024-08-15 --eps 0.20 --batch-size 100
 
+    # Parallel backfill: shard (country, date) units across 6 worker processes
+    python services/pipeline/events/batch_cluster_events.py --influencers --start-date 2024-08-01 --end-date 2024-08-31 --workers 6
+
+    # Online leader clustering for very large days (see clustering_backends.py)
+    python services/pipeline/events/batch_cluster_events.py --influencers --start-date 2024-08-01 --end-date 2024-08-31 --algorithm leader
+
+**Clustering backends (--algorithm):**
+- dbscan (default): exact DBSCAN over cosine distances for the whole day
+- hdbscan: density-based, merges clusters closer than --eps
+- leader: single-pass online leader clustering, for very large days
+- Compare them on recorded days with benchmark_clustering.py
+
+**Raw event fetching (serial mode):**
+- Events for all countries are fetched with one streamed range query per
+  window of --fetch-days days (default 31) and partitioned in memory by (country, date)
+- --fetch-days 0 restores one query per (country, date)
+
+**Parallel mode (--workers N, N > 1):**
+- Each (country, date) pair is one work unit, run in a process pool
+- Each worker loads the SentenceTransformer once and uses its own DB connection
+- Workers share the on-disk embedding cache (shared/utils/embedding_cache.py)
+- Each unit commits independently and records its status in clustering_jobs
+- Re-running the same command skips units already marked 'done' (use --force to redo)
+
 Author: Event Pipeline
 Date: 2025-10-22
 """
 
 import argparse
+import contextlib
+import io
+import json
+import multiprocessing
 import re
+import time
+import traceback
 import yaml
 import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import date, datetime, timedelta
 from typing import List, Dict, Tuple
 from collections import defaultdict
@@ -41,11 +72,12 @@ import numpy as np
 
 from sqlalchemy import text
 from sqlalchemy.dialects.postgresql import insert
-from sklearn.cluster import DBSCAN
-from sentence_transformers import SentenceTransformer
 
 from shared.database.database import get_session
 from shared.models.models import EventCluster, RawEvent, Document, InitiatingCountry
+from shared.utils.embedding_cache import CachedEncoder
+from shared.utils.vector_codec import encode_float32
+from services.pipeline.events.clustering_backends import CLUSTERING_ALGORITHMS, get_clustering_backend
 
 
 def load_config(config_path: str = 'shared/config/config.yaml') -> dict:
@@ -80,25 +112,95 @@ def load_influencer_countries(config_path: str = 'shared/config/config.yaml') ->
     return config['influencers']
 
 
+class ClusterWriter:
+    """
+    Batched EventCluster writer.
+
+    Cluster rows are buffered and written with multi-row
+    INSERT ... ON CONFLICT DO NOTHING statements instead of one statement per
+    cluster. Counts and throughput accumulate across flushes for the whole run.
+    """
+
+    def __init__(self, chunk_size: int = 500):
+        """
+        Args:
+            chunk_size: Rows per INSERT statement
+        """
+        self.chunk_size = chunk_size
+        self.pending: List[Dict] = []
+        self.inserted = 0
+        self.skipped = 0
+        self.write_seconds = 0.0
+
+    def add(self, row: Dict):
+        self.pending.append(row)
+
+    def discard(self):
+        """Drop buffered rows, e.g. after the unit they belong to failed."""
+        self.pending = []
+
+    def flush(self, session) -> Tuple[int, int]:
+        """
+        Write buffered rows (does not commit).
+
+        The buffer is emptied even if a statement fails, so a reused writer
+        never carries a failed unit's rows into the next unit's commit.
+
+        Returns:
+            (inserted, skipped) for this flush; skipped rows hit uq_event_cluster
+        """
+        inserted = 0
+        total = len(self.pending)
+        start = time.time()
+
+        try:
+            for i in range(0, total, self.chunk_size):
+                chunk = self.pending[i:i + self.chunk_size]
+                stmt = insert(EventCluster).values(chunk)
+                stmt = stmt.on_conflict_do_nothing(constraint='uq_event_cluster').returning(EventCluster.id)
+                inserted += len(session.execute(stmt).fetchall())
+        finally:
+            self.write_seconds += time.time() - start
+            self.pending = []
+
+        self.inserted += inserted
+        self.skipped += total - inserted
+        return inserted, total - inserted
+
+    def rows_per_second(self) -> float:
+        written = self.inserted + self.skipped
+        return written / self.write_seconds if self.write_seconds > 0 else 0.0
+
+
 class EventBatchClusterer:
     """
     Clusters event names in batches using DBSCAN + embeddings.
     Similar to news_event_tracker.py but processes in batches of ~50 events.
     """
 
-    def __init__(self, batch_size: int = 50, eps: float = 0.15, recipient_countries: List[str] = None):
+    def __init__(
+        self,
+        batch_size: int = 50,
+        eps: float = 0.15,
+        recipient_countries: List[str] = None,
+        algorithm: str = 'dbscan'
+    ):
         """
         Initialize the batch clusterer.
 
         Args:
             batch_size: Number of events to process per batch
-            eps: DBSCAN epsilon parameter (0.15 = strict, 0.30 = loose)
+            eps: Cosine distance threshold (0.15 = strict, 0.30 = loose)
             recipient_countries: List of target recipient countries to filter for (from config.yaml)
+            algorithm: Clustering backend: dbscan, hdbscan or leader
         """
         self.batch_size = batch_size
         self.eps = eps
         self.recipient_countries = recipient_countries or []
-        self.embedding_model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+        self.backend = get_clustering_backend(algorithm, eps=eps)
+        self.writer = ClusterWriter()
+        # Name -> embedding store shared across days, stages and worker processes
+        self.encoder = CachedEncoder.from_config("sentence-transformers/all-MiniLM-L6-v2")
 
     def normalize_event_name(self, name: str) -> str:
         """
@@ -205,12 +307,113 @@ class EventBatchClusterer:
 
         return events
 
+    def get_events_for_range(
+        self,
+        session,
+        countries: List[str],
+        start_date: date,
+        end_date: date
+    ) -> Dict[Tuple[str, date], List[Dict]]:
+        """
+        Get all events for several countries over a date window in one query.
+
+        Same filters and per-unit ordering as get_events_for_date_country, but a
+        single streamed query replaces one round trip per (country, date).
+
+        Returns:
+            Dict mapping (country, date) -> list of dicts with keys: event_name, doc_id, date
+        """
+        recipient_filter = ""
+        params = {
+            'countries': countries,
+            'start_date': start_date,
+            'end_date': end_date
+        }
+        if self.recipient_countries:
+            recipient_filter = """
+                  -- Must have at least one target recipient country
+                  AND EXISTS (
+                      SELECT 1
+                      FROM recipient_countries rc
+                      WHERE rc.doc_id = d.doc_id
+                        AND rc.recipient_country = ANY(:recipients)
+                  )"""
+            params['recipients'] = self.recipient_countries
+
+        query = text(f"""
+            SELECT DISTINCT
+                ic.initiating_country,
+                d.date,
+                re.event_name,
+                re.doc_id
+            FROM raw_events re
+            JOIN documents d ON re.doc_id = d.doc_id
+            JOIN initiating_countries ic ON d.doc_id = ic.doc_id
+            WHERE ic.initiating_country = ANY(:countries)
+              AND d.date BETWEEN :start_date AND :end_date{recipient_filter}
+              -- Exclude documents where recipient = initiator (not soft power)
+              AND NOT EXISTS (
+                  SELECT 1
+                  FROM recipient_countries rc
+                  WHERE rc.doc_id = d.doc_id
+                    AND rc.recipient_country = ic.initiating_country
+              )
+            ORDER BY ic.initiating_country, d.date, re.event_name
+        """)
+
+        # Server-side cursor: rows are streamed instead of buffered by the driver
+        result = session.execute(
+            query,
+            params,
+            execution_options={'stream_results': True, 'yield_per': 10000}
+        )
+
+        events_by_unit = defaultdict(list)
+        for row in result:
+            events_by_unit[(row.initiating_country, row.date)].append({
+                'event_name': row.event_name,
+                'doc_id': row.doc_id,
+                'date': row.date
+            })
+
+        return events_by_unit
+
+    def get_unclustered_events(
+        self,
+        session,
+        country: str,
+        target_date: date
+    ) -> Tuple[List[Dict], int]:
+        """
+        Get events for a country/date whose documents are not in any existing cluster.
+
+        Used to cluster documents ingested after the date was first clustered.
+
+        Returns:
+            (events, next_batch_number) - new events, and the first free batch number
+        """
+        result = session.execute(text("""
+            SELECT batch_number, doc_ids
+            FROM event_clusters
+            WHERE initiating_country = :country
+              AND cluster_date = :target_date
+        """), {'country': country, 'target_date': target_date})
+
+        clustered_doc_ids = set()
+        next_batch = 0
+        for row in result:
+            clustered_doc_ids.update(row.doc_ids or [])
+            next_batch = max(next_batch, row.batch_number + 1)
+
+        events = self.get_events_for_date_country(session, country, target_date)
+        return [e for e in events if e['doc_id'] not in clustered_doc_ids], next_batch
+
     def cluster_batch(
         self,
         events: List[Dict]
-    ) -> List[Tuple[int, List[Dict], List[float]]]:
+    ) -> List[Tuple[int, List[Dict], np.ndarray]]:
         """
-        Cluster a batch of events using DBSCAN.
+        Cluster a batch of events with the configured backend (DBSCAN by default).
 
         Args:
             events: List of event dicts
@@ -223,15 +426,10 @@ class EventBatchClusterer:
 
         # Normalize and generate embeddings
         event_names = [self.normalize_event_name(e['event_name']) for e in events]
-        embeddings = self.embedding_model.encode(event_names, show_progress_bar=False)
+        embeddings = self.encoder.encode(event_names)
 
-        # Cluster using DBSCAN
-        clustering = DBSCAN(
-            metric='cosine',
-            eps=self.eps,
-            min_samples=1  # Allow singleton clusters
-        )
-        labels = clustering.fit_predict(embeddings)
+        # Every event gets a label (singleton clusters allowed)
+        labels = self.backend.fit_predict(embeddings)
 
         # Group by cluster label
         clusters_dict = defaultdict(list)
@@ -245,7 +443,7 @@ class EventBatchClusterer:
         results = []
         for cluster_id, cluster_events in clusters_dict.items():
             cluster_embeddings = np.array(embeddings_dict[cluster_id])
-            centroid = np.mean(cluster_embeddings, axis=0).tolist()
+            centroid = np.mean(cluster_embeddings, axis=0)  # float32 array, encoded as a blob on save
 
             results.append((cluster_id, cluster_events, centroid))
 
@@ -254,7 +452,7 @@ class EventBatchClusterer:
     def find_representative_name(
         self,
         events: List[Dict],
-        centroid: List[float]
+        centroid: np.ndarray
     ) -> str:
         """
         Find the event name closest to the centroid.
@@ -262,9 +460,9 @@ class EventBatchClusterer:
         if len(events) == 1:
             return events[0]['event_name']
 
-        # Get embeddings for all event names
+        # Get embeddings for all event names (in-process cache hits after cluster_batch)
         event_names = [self.normalize_event_name(e['event_name']) for e in events]
-        embeddings = self.embedding_model.encode(event_names, show_progress_bar=False)
+        embeddings = self.encoder.encode(event_names)
 
         # Find closest to centroid
         centroid_array = np.array(centroid)
@@ -279,11 +477,12 @@ class EventBatchClusterer:
         country: str,
         target_date: date,
         batch_number: int,
-        clusters: List[Tuple[int, List[Dict], List[float]]]
+        clusters: List[Tuple[int, List[Dict], np.ndarray]]
     ):
         """
-        Save clustered events to database.
-        Uses ON CONFLICT DO NOTHING to gracefully handle duplicate entries.
+        Queue clustered events for the batched writer.
+        Rows are written by self.writer.flush() with ON CONFLICT DO NOTHING
+        to gracefully handle duplicate entries.
         """
         for cluster_id, cluster_events, centroid in clusters:
             # Extract event names and doc IDs
@@ -304,27 +503,23 @@ class EventBatchClusterer:
                 'doc_ids': doc_ids,
                 'cluster_size': len(cluster_events),
                 'is_noise': bool(cluster_id == -1),  # DBSCAN noise label
-                'centroid_embedding': [float(x) for x in centroid],  # Convert from numpy.float32
+                'centroid_embedding': encode_float32(centroid),  # float32 blob, no per-element floats
                 'representative_name': representative_name,
                 'processed': False,
                 'llm_deconflicted': False,
                 'created_at': datetime.utcnow()
             }
 
-            # Use PostgreSQL's ON CONFLICT DO NOTHING to skip duplicates
-            stmt = insert(EventCluster).values(**cluster_data)
-            stmt = stmt.on_conflict_do_nothing(
-                constraint='uq_event_cluster'
-            )
-
-            session.execute(stmt)
+            self.writer.add(cluster_data)
 
     def process_date(
         self,
         session,
         country: str,
         target_date: date,
-        dry_run: bool = False
+        dry_run: bool = False,
+        events: List[Dict] = None,
+        batch_offset: int = 0
     ) -> Dict:
         """
         Process all events for a specific country and date.
@@ -332,6 +527,11 @@ class EventBatchClusterer:
         NEW BEHAVIOR: Clusters ALL events for the day together (not in batches).
         The batch_size is only used for organizing clusters for later LLM processing.
 
+        Args:
+            events: Events already fetched by get_events_for_range (queried if None)
+            batch_offset: First batch number to write, so late-arriving events
+                can be added to a date that already has clusters
+
         Returns:
             Stats dict with: total_events, num_batches, num_clusters
         """
@@ -340,23 +540,27 @@ class EventBatchClusterer:
         print(f"{'='*60}")
 
         # Get all events for this country/date
-        events = self.get_events_for_date_country(session, country, target_date)
+        if events is None:
+            events = self.get_events_for_date_country(session, country, target_date)
 
         if not events:
             print(f"  No events found for {country} on {target_date}")
             return {
                 'total_events': 0,
                 'num_batches': 0,
-                'num_clusters': 0
+                'num_clusters': 0,
+                'cluster_seconds': 0.0
             }
 
         print(f"  Found {len(events)} events")
         print(f"  Clustering ALL {len(events)} events together...")
         print(f"    Generating embeddings...")
-        print(f"    Running DBSCAN (eps={self.eps})...")
+        print(f"    Running {self.backend.name} (eps={self.eps})...")
 
         # Cluster ALL events for this day at once
+        backend_seconds = self.backend.seconds
         clusters = self.cluster_batch(events)
+        cluster_seconds = self.backend.seconds - backend_seconds
 
         print(f"  [OK] Found {len(clusters)} clusters from {len(events)} events")
 
@@ -390,21 +594,29 @@ class EventBatchClusterer:
             batch_event_count = sum(len(c[1]) for c in batch_clusters)
             print(f"    Batch {batch_num}: {len(batch_clusters)} clusters, {batch_event_count} events")
 
-        # Save to database
+        # Save to database (one batched write per day)
+        inserted = skipped = 0
+        write_seconds = self.writer.write_seconds
         if not dry_run:
-            total_saved = 0
-            for batch_num, batch_clusters in enumerate(batched_clusters):
-                self.save_clusters(
-                    session,
-                    country,
-                    target_date,
-                    batch_num,
-                    batch_clusters
-                )
-                total_saved += len(batch_clusters)
-
-            session.commit()
-            print(f"\n  [OK] Saved {total_saved} clusters in {len(batched_clusters)} batch(es)")
+            # Rows left behind by an earlier unit that failed must not be written with this one
+            self.writer.discard()
+            try:
+                for batch_num, batch_clusters in enumerate(batched_clusters):
+                    self.save_clusters(
+                        session,
+                        country,
+                        target_date,
+                        batch_offset + batch_num,
+                        batch_clusters
+                    )
+
+                inserted, skipped = self.writer.flush(session)
+                session.commit()
+            except Exception:
+                self.writer.discard()
+                raise
+            print(f"\n  [OK] Saved {inserted} clusters in {len(batched_clusters)} batch(es)"
+                  f"{f' ({skipped} already existed)' if skipped else ''}")
             print(f"  [OK] Committed to database for {country} on {target_date}")
         else:
             print(f"\n  [DRY RUN] Would save {len(clusters)} clusters in {len(batched_clusters)} batch(es)")
@@ -412,7 +624,11 @@ class EventBatchClusterer:
         return {
             'total_events': len(events),
             'num_batches': len(batched_clusters),
-            'num_clusters': len(clusters)
+            'num_clusters': len(clusters),
+            'clusters_inserted': inserted,
+            'clusters_skipped': skipped,
+            'write_seconds': round(self.writer.write_seconds - write_seconds, 4),
+            'cluster_seconds': round(cluster_seconds, 4)
         }
 
     def _organize_clusters_for_llm(
@@ -451,6 +667,281 @@ class EventBatchClusterer:
         return batches
 
 
+# ----------------------------------------------------------------------------
+# Parallel (country, date) scheduler
+# ----------------------------------------------------------------------------
+
+# Per-process clusterer, created once by the pool initializer
+_worker_clusterer = None
+
+
+def _init_worker(batch_size: int, eps: float, recipient_countries: List[str], algorithm: str = 'dbscan'):
+    """Pool initializer: load the embedding model once per worker process."""
+    global _worker_clusterer
+    _worker_clusterer = EventBatchClusterer(
+        batch_size=batch_size,
+        eps=eps,
+        recipient_countries=recipient_countries,
+        algorithm=algorithm
+    )
+
+
+def mark_job(session, country: str, target_date: date, status: str,
+             stats: Dict = None, error: str = None):
+    """Insert or update the clustering_jobs row for a work unit and commit."""
+    session.execute(text("""
+        INSERT INTO clustering_jobs
+            (id, initiating_country, cluster_date, status, attempts, error, stats, started_at, finished_at)
+        VALUES
+            (gen_random_uuid(), :country, :target_date, :status,
+             CASE WHEN :status = 'running' THEN 1 ELSE 0 END,
+             :error, CAST(:stats AS JSONB),
+             CASE WHEN :status = 'running' THEN NOW() END,
+             CASE WHEN :status IN ('done', 'failed') THEN NOW() END)
+        ON CONFLICT (initiating_country, cluster_date) DO UPDATE SET
+            status = EXCLUDED.status,
+            attempts = clustering_jobs.attempts + CASE WHEN EXCLUDED.status = 'running' THEN 1 ELSE 0 END,
+            error = EXCLUDED.error,
+            stats = EXCLUDED.stats,
+            started_at = COALESCE(EXCLUDED.started_at, clustering_jobs.started_at),
+            finished_at = EXCLUDED.finished_at
+    """), {
+        'country': country,
+        'target_date': target_date,
+        'status': status,
+        'error': error,
+        'stats': json.dumps(stats or {})
+    })
+    session.commit()
+
+
+def get_done_units(session, countries: List[str], start_date: date, end_date: date) -> set:
+    """(country, date) units already completed by a previous run."""
+    result = session.execute(text("""
+        SELECT initiating_country, cluster_date
+        FROM clustering_jobs
+        WHERE status = 'done'
+          AND initiating_country = ANY(:countries)
+          AND cluster_date BETWEEN :start_date AND :end_date
+    """), {'countries': countries, 'start_date': start_date, 'end_date': end_date})
+    return {(row.initiating_country, row.cluster_date) for row in result}
+
+
+def _run_work_unit(country: str, target_date: date, dry_run: bool) -> Dict:
+    """
+    Cluster one (country, date) unit inside a worker process.
+
+    Uses the worker's own DB connection and commits independently. The
+    detailed per-day output is captured so parallel logs stay readable.
+    """
+    start = time.time()
+    log = io.StringIO()
+
+    with get_session() as session:
+        if not dry_run:
+            mark_job(session, country, target_date, 'running')
+
+        try:
+            with contextlib.redirect_stdout(log):
+                stats = _worker_clusterer.process_date(session, country, target_date, dry_run=dry_run)
+        except Exception as e:
+            session.rollback()
+            error = f"{e}\n{traceback.format_exc()}"
+            if not dry_run:
+                mark_job(session, country, target_date, 'failed', error=error)
+            return {'country': country, 'date': target_date, 'ok': False,
+                    'error': str(e), 'seconds': time.time() - start}
+
+        stats['seconds'] = round(time.time() - start, 2)
+        if not dry_run:
+            mark_job(session, country, target_date, 'done', stats=stats)
+
+    return {'country': country, 'date': target_date, 'ok': True, 'stats': stats, 'seconds': stats['seconds']}
+
+
+def run_parallel(
+    countries: List[str],
+    start_date: date,
+    end_date: date,
+    workers: int,
+    batch_size: int,
+    eps: float,
+    recipient_countries: List[str],
+    dry_run: bool = False,
+    force: bool = False,
+    algorithm: str = 'dbscan'
+) -> Dict:
+    """
+    Shard (country, date) work units across a process pool.
+
+    Returns:
+        Overall stats dict (same keys as the serial loop plus failures/skipped)
+    """
+    units = []
+    current_date = start_date
+    while current_date <= end_date:
+        for country in countries:
+            units.append((country, current_date))
+        current_date += timedelta(days=1)
+
+    skipped = 0
+    if not dry_run and not force:
+        with get_session() as session:
+            done = get_done_units(session, countries, start_date, end_date)
+        skipped = sum(1 for unit in units if unit in done)
+        units = [unit for unit in units if unit not in done]
+
+    print(f"\nParallel mode: {len(units)} work units across {workers} workers"
+          f" ({skipped} already done, skipped)")
+
+    overall_stats = {
+        'total_events': 0,
+        'total_batches': 0,
+        'total_clusters': 0,
+        'dates_processed': 0,
+        'failures': 0,
+        'skipped': skipped,
+        'clusters_inserted': 0,
+        'clusters_skipped': 0,
+        'write_seconds': 0.0,
+        'cluster_seconds': 0.0
+    }
+
+    if not units:
+        return overall_stats
+
+    run_start = time.time()
+    # spawn: torch/SentenceTransformer and DB connections must not be forked
+    context = multiprocessing.get_context('spawn')
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(batch_size, eps, recipient_countries, algorithm)
+    ) as executor:
+        futures = [executor.submit(_run_work_unit, country, unit_date, dry_run) for country, unit_date in units]
+
+        for completed, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            prefix = f"  [{completed}/{len(units)}] {result['country']} {result['date']}"
+
+            if not result['ok']:
+                overall_stats['failures'] += 1
+                print(f"{prefix}: FAILED ({result['error']})")
+                continue
+
+            stats = result['stats']
+            overall_stats['total_events'] += stats['total_events']
+            overall_stats['total_batches'] += stats['num_batches']
+            overall_stats['total_clusters'] += stats['num_clusters']
+            overall_stats['clusters_inserted'] += stats.get('clusters_inserted', 0)
+            overall_stats['clusters_skipped'] += stats.get('clusters_skipped', 0)
+            overall_stats['write_seconds'] += stats.get('write_seconds', 0.0)
+            overall_stats['cluster_seconds'] += stats.get('cluster_seconds', 0.0)
+            if stats['total_events'] > 0:
+                overall_stats['dates_processed'] += 1
+
+            print(f"{prefix}: {stats['total_events']} events -> {stats['num_clusters']} clusters "
+                  f"({result['seconds']:.1f}s)")
+
+    elapsed = time.time() - run_start
+    print(f"\nParallel run finished in {elapsed:.1f}s ({len(units) / elapsed:.2f} units/s)")
+    if not dry_run:
+        written = overall_stats['clusters_inserted'] + overall_stats['clusters_skipped']
+        write_seconds = overall_stats['write_seconds']
+        print(f"  [CLUSTER WRITES] {overall_stats['clusters_inserted']} inserted, "
+              f"{overall_stats['clusters_skipped']} skipped (already existed), "
+              f"{written / write_seconds if write_seconds > 0 else 0.0:.0f} rows/s")
+    print_clustering_runtime(algorithm, overall_stats['total_events'], overall_stats['cluster_seconds'])
+    if overall_stats['failures']:
+        print(f"  [WARNING] {overall_stats['failures']} units failed; re-run the same command to retry them")
+
+    return overall_stats
+
+
+def run_serial(
+    countries: List[str],
+    start_date: date,
+    end_date: date,
+    batch_size: int,
+    eps: float,
+    recipient_countries: List[str],
+    dry_run: bool = False,
+    fetch_days: int = 31,
+    algorithm: str = 'dbscan'
+) -> Dict:
+    """
+    Process dates x countries one at a time on a single session.
+
+    Raw events are fetched with one range query per window of fetch_days
+    (0 = one query per country and date, the old behavior).
+    """
+    clusterer = EventBatchClusterer(
+        batch_size=batch_size,
+        eps=eps,
+        recipient_countries=recipient_countries,
+        algorithm=algorithm
+    )
+
+    overall_stats = {
+        'total_events': 0,
+        'total_batches': 0,
+        'total_clusters': 0,
+        'dates_processed': 0
+    }
+
+    with get_session() as session:
+        current_date = start_date
+        window_events = None
+        window_end = None
+        while current_date <= end_date:
+            if fetch_days > 0 and (window_end is None or current_date > window_end):
+                window_end = min(current_date + timedelta(days=fetch_days - 1), end_date)
+                fetch_start = time.time()
+                window_events = clusterer.get_events_for_range(session, countries, current_date, window_end)
+                print(f"\nFetched {sum(len(v) for v in window_events.values())} events for "
+                      f"{current_date} to {window_end} in {time.time() - fetch_start:.1f}s")
+
+            for country in countries:
+                stats = clusterer.process_date(
+                    session,
+                    country,
+                    current_date,
+                    dry_run=dry_run,
+                    events=window_events.get((country, current_date), []) if fetch_days > 0 else None
+                )
+
+                overall_stats['total_events'] += stats['total_events']
+                overall_stats['total_batches'] += stats['num_batches']
+                overall_stats['total_clusters'] += stats['num_clusters']
+                if stats['total_events'] > 0:
+                    overall_stats['dates_processed'] += 1
+
+            current_date += timedelta(days=1)
+
+    if not dry_run:
+        writer = clusterer.writer
+        print(f"\n[CLUSTER WRITES] {writer.inserted} inserted, {writer.skipped} skipped (already existed), "
+              f"{writer.rows_per_second():.0f} rows/s")
+
+    backend_stats = clusterer.backend.stats()
+    print_clustering_runtime(algorithm, backend_stats['points'], backend_stats['seconds'])
+
+    cache_stats = clusterer.encoder.stats()
+    print(f"\n[EMBEDDING CACHE] {cache_stats['encoded']} encoded, "
+          f"{cache_stats['memory_hits'] + cache_stats['store_hits']} cached "
+          f"({cache_stats['hit_rate']:.0%} hit rate)")
+
+    return overall_stats
+
+
+def print_clustering_runtime(algorithm: str, points: int, seconds: float):
+    """Print the clustering backend's share of the run."""
+    rate = points / seconds if seconds > 0 else 0.0
+    print(f"\n[CLUSTERING] {algorithm}: {points} events in {seconds:.2f}s ({rate:.0f} events/s)")
+
+
 def get_available_countries(session) -> List[str]:
     """Get list of all unique initiating countries in the database."""
     query = text("SELECT DISTINCT initiating_country FROM initiating_countries ORDER BY initiating_country")
@@ -485,8 +976,14 @@ Examples:
     parser.add_argument('--influencers', action='store_true', help='Process all influencer countries from config.yaml (China, Russia, Iran, Turkey, United States)')
     parser.add_argument('--all-countries', action='store_true', help='Process ALL countries in database (not recommended - many spurious countries)')
     parser.add_argument('--batch-size', type=int, default=150, help='Events per batch for LLM processing (default: 150, does NOT affect clustering)')
-    parser.add_argument('--eps', type=float, default=0.15, help='DBSCAN epsilon (default: 0.15, range: 0.10-0.30)')
+    parser.add_argument('--eps', type=float, default=0.15, help='Cosine distance threshold (default: 0.15, range: 0.10-0.30)')
+    parser.add_argument('--algorithm', choices=CLUSTERING_ALGORITHMS, default='dbscan',
+                        help='Clustering backend (default: dbscan; leader = fast online mode for very large days)')
     parser.add_argument('--dry-run', action='store_true', help='Show what would be done without saving')
+    parser.add_argument('--fetch-days', type=int, default=31,
+                        help='Days of raw events fetched per range query in serial mode (0 = one query per country/date)')
+    parser.add_argument('--workers', type=int, default=1, help='Worker processes for (country, date) units (default: 1 = serial)')
+    parser.add_argument('--force', action='store_true', help='With --workers: re-run units already marked done in clustering_jobs')
 
     args = parser.parse_args()
 
@@ -512,20 +1009,15 @@ Examples:
     config = load_config()
     recipient_countries = config['recipients']
 
-    # Initialize clusterer
-    clusterer = EventBatchClusterer(
-        batch_size=args.batch_size,
-        eps=args.eps,
-        recipient_countries=recipient_countries
-    )
-
     print("\n" + "="*60)
     print("BATCH EVENT CLUSTERING")
     print("="*60)
     print(f"Date range: {start_date} to {end_date}")
     print(f"Batch size: {args.batch_size}")
-    print(f"DBSCAN eps: {args.eps}")
+    print(f"Clustering: {args.algorithm} (eps={args.eps})")
     print(f"Recipient filter: {len(recipient_countries)} target countries from config.yaml")
+    if args.workers > 1:
+        print(f"Workers: {args.workers} processes")
     if args.dry_run:
         print("MODE: DRY RUN (no changes will be saved)")
     print("="*60)
@@ -544,32 +1036,31 @@ Examples:
             countries = [args.country]
             print(f"\nProcessing single country: {args.country}")
 
-    # Process each country and date
-    overall_stats = {
-        'total_events': 0,
-        'total_batches': 0,
-        'total_clusters': 0,
-        'dates_processed': 0
-    }
-
-    with get_session() as session:
-        current_date = start_date
-        while current_date <= end_date:
-            for country in countries:
-                stats = clusterer.process_date(
-                    session,
-                    country,
-                    current_date,
-                    dry_run=args.dry_run
-                )
-
-                overall_stats['total_events'] += stats['total_events']
-                overall_stats['total_batches'] += stats['num_batches']
-                overall_stats['total_clusters'] += stats['num_clusters']
-                if stats['total_events'] > 0:
-                    overall_stats['dates_processed'] += 1
-
-            current_date += timedelta(days=1)
+    if args.workers > 1:
+        overall_stats = run_parallel(
+            countries,
+            start_date,
+            end_date,
+            workers=args.workers,
+            batch_size=args.batch_size,
+            eps=args.eps,
+            recipient_countries=recipient_countries,
+            dry_run=args.dry_run,
+            force=args.force,
+            algorithm=args.algorithm
+        )
+    else:
+        overall_stats = run_serial(
+            countries,
+            start_date,
+            end_date,
+            batch_size=args.batch_size,
+            eps=args.eps,
+            recipient_countries=recipient_countries,
+            dry_run=args.dry_run,
+            fetch_days=args.fetch_days,
+            algorithm=args.algorithm
+        )
 
     # Print summary
     print("\n" + "="*60)
@@ -579,6 +1070,8 @@ Examples:
     print(f"Total events: {overall_stats['total_events']}")
     print(f"Total batches: {overall_stats['total_batches']}")
     print(f"Total clusters: {overall_stats['total_clusters']}")
+    if overall_stats.get('failures'):
+        print(f"Failed units: {overall_stats['failures']}")
     if overall_stats['total_events'] > 0:
         avg_cluster_size = overall_stats['total_events'] / overall_stats['total_clusters']
         print(f"Average cluster size: {avg_cluster_size:.1f} events")
@@ -0,0 +1,202 @@
+"""
+Benchmark the Stage 1A clustering backends on recorded days.
+
+Loads the events of real (country, date) days, embeds the normalized names
+once, then runs every backend on every day and compares:
+- Runtime (clustering only; embedding is shared) and events/s
+- Number of clusters and share of singleton clusters
+- Cohesion: mean cosine similarity of events to their cluster centroid
+- Agreement with the baseline backend (adjusted Rand index, 1.0 = identical)
+
+Days can be recorded to a .npz file and replayed without a database, so
+backends can be compared on identical inputs across machines.
+
+Usage:
+    # Benchmark a week of China days from the database
+    python services/pipeline/events/benchmark_clustering.py --country China --start-date 2024-08-01 --end-date 2024-08-07
+
+    # Record the days, then replay them offline
+    python services/pipeline/events/benchmark_clustering.py --influencers --date 2024-08-15 --record ./data/cluster_days.npz
+    python services/pipeline/events/benchmark_clustering.py --from-file ./data/cluster_days.npz --algorithms dbscan,leader --eps 0.20
+"""
+
+import argparse
+import time
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from services.pipeline.events.clustering_backends import CLUSTERING_ALGORITHMS, get_clustering_backend
+
+
+def load_days_from_db(countries: List[str], start_date, end_date) -> List[Tuple[str, List[str], np.ndarray]]:
+    """
+    Load and embed the events of every non-empty (country, date) in the range.
+
+    Returns:
+        List of (label, event_names, embeddings) per day
+    """
+    from shared.database.database import get_session
+    from services.pipeline.events.batch_cluster_events import EventBatchClusterer, load_config
+
+    clusterer = EventBatchClusterer(recipient_countries=load_config()['recipients'])
+
+    with get_session() as session:
+        events_by_unit = clusterer.get_events_for_range(session, countries, start_date, end_date)
+
+    days = []
+    for (country, unit_date), events in sorted(events_by_unit.items(), key=lambda item: (item[0][1], item[0][0])):
+        if not events:
+            continue
+        names = [clusterer.normalize_event_name(e['event_name']) for e in events]
+        embeddings = clusterer.encoder.encode(names)
+        days.append((f"{country}|{unit_date}", names, embeddings))
+    return days
+
+
+def save_days(path: str, days: List[Tuple[str, List[str], np.ndarray]]):
+    arrays = {'labels': np.array([label for label, _, _ in days])}
+    for i, (_, names, embeddings) in enumerate(days):
+        arrays[f'names_{i}'] = np.array(names)
+        arrays[f'embeddings_{i}'] = np.asarray(embeddings, dtype=np.float32)
+    np.savez_compressed(path, **arrays)
+
+
+def load_days_from_file(path: str) -> List[Tuple[str, List[str], np.ndarray]]:
+    data = np.load(path)
+    return [
+        (str(label), data[f'names_{i}'].tolist(), data[f'embeddings_{i}'])
+        for i, label in enumerate(data['labels'])
+    ]
+
+
+def cohesion(embeddings: np.ndarray, labels: np.ndarray) -> float:
+    """Mean cosine similarity of each event to its cluster centroid."""
+    vectors = embeddings / np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+    _, inverse = np.unique(labels, return_inverse=True)
+    sums = np.zeros((inverse.max() + 1, vectors.shape[1]))
+    np.add.at(sums, inverse, vectors)
+    centroids = sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12)
+    return float(np.mean(np.sum(vectors * centroids[inverse], axis=1)))
+
+
+def benchmark(
+    days: List[Tuple[str, List[str], np.ndarray]],
+    algorithms: List[str],
+    eps: float,
+    baseline: str
+) -> Dict[str, Dict]:
+    """
+    Run every backend on every day.
+
+    Returns:
+        Per-algorithm totals: events, seconds, clusters, singletons, cohesion, ari
+    """
+    from sklearn.metrics import adjusted_rand_score
+
+    results = {a: {'events': 0, 'seconds': 0.0, 'clusters': 0, 'singletons': 0,
+                   'cohesion_sum': 0.0, 'ari_sum': 0.0, 'days': 0} for a in algorithms}
+    backends = {a: get_clustering_backend(a, eps=eps) for a in algorithms}
+
+    for label, names, embeddings in days:
+        day_labels = {}
+        for algorithm, backend in backends.items():
+            start = time.perf_counter()
+            labels = backend.fit_predict(embeddings)
+            seconds = time.perf_counter() - start
+            day_labels[algorithm] = labels
+
+            _, sizes = np.unique(labels, return_counts=True)
+            r = results[algorithm]
+            r['events'] += len(labels)
+            r['seconds'] += seconds
+            r['clusters'] += len(sizes)
+            r['singletons'] += int(np.sum(sizes == 1))
+            r['cohesion_sum'] += cohesion(embeddings, labels) * len(labels)
+            r['days'] += 1
+
+        print(f"  {label}: {len(names)} events -> " +
+              ', '.join(f"{a}={len(np.unique(l))}" for a, l in day_labels.items()))
+
+        if baseline in day_labels:
+            for algorithm, labels in day_labels.items():
+                results[algorithm]['ari_sum'] += adjusted_rand_score(day_labels[baseline], labels) * len(labels)
+
+    for r in results.values():
+        events = max(r['events'], 1)
+        r['cohesion'] = r.pop('cohesion_sum') / events
+        r['ari'] = r.pop('ari_sum') / events if baseline in results else None
+        r['events_per_second'] = r['events'] / r['seconds'] if r['seconds'] > 0 else 0.0
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark clustering backends on recorded days')
+    parser.add_argument('--country', type=str, help='Initiating country')
+    parser.add_argument('--influencers', action='store_true', help='All influencer countries from config.yaml')
+    parser.add_argument('--date', type=str, help='Single date (YYYY-MM-DD)')
+    parser.add_argument('--start-date', type=str, help='Start date (YYYY-MM-DD)')
+    parser.add_argument('--end-date', type=str, help='End date (YYYY-MM-DD)')
+    parser.add_argument('--from-file', type=str, help='Replay days recorded with --record instead of querying the database')
+    parser.add_argument('--record', type=str, help='Save the loaded days (names + embeddings) to this .npz file')
+    parser.add_argument('--algorithms', type=str, default=','.join(CLUSTERING_ALGORITHMS),
+                        help=f"Comma-separated backends (default: {','.join(CLUSTERING_ALGORITHMS)})")
+    parser.add_argument('--baseline', type=str, default='dbscan', help='Backend used as reference for the ARI (default: dbscan)')
+    parser.add_argument('--eps', type=float, default=0.15, help='Cosine distance threshold (default: 0.15)')
+
+    args = parser.parse_args()
+
+    algorithms = [a.strip() for a in args.algorithms.split(',') if a.strip()]
+    unknown = [a for a in algorithms if a not in CLUSTERING_ALGORITHMS]
+    if unknown:
+        parser.error(f"Unknown algorithms: {', '.join(unknown)}")
+
+    if args.from_file:
+        days = load_days_from_file(args.from_file)
+    else:
+        if args.country:
+            countries = [args.country]
+        elif args.influencers:
+            from services.pipeline.events.batch_cluster_events import load_influencer_countries
+            countries = load_influencer_countries()
+        else:
+            parser.error("Specify --country, --influencers or --from-file")
+
+        if args.date:
+            start_date = end_date = datetime.strptime(args.date, '%Y-%m-%d').date()
+        elif args.start_date and args.end_date:
+            start_date = datetime.strptime(args.start_date, '%Y-%m-%d').date()
+            end_date = datetime.strptime(args.end_date, '%Y-%m-%d').date()
+        else:
+            parser.error("Specify --date or --start-date and --end-date")
+
+        days = load_days_from_db(countries, start_date, end_date)
+
+    if not days:
+        print("No events found")
+        return
+
+    if args.record:
+        save_days(args.record, days)
+        print(f"[OK] Recorded {len(days)} days to {args.record}")
+
+    print(f"\nBenchmarking {', '.join(algorithms)} on {len(days)} days "
+          f"({sum(len(names) for _, names, _ in days)} events, eps={args.eps})")
+    results = benchmark(days, algorithms, args.eps, args.baseline)
+
+    print("\n" + "=" * 100)
+    print(f"{'Algorithm':<10} {'Events':>8} {'Seconds':>9} {'Events/s':>10} {'Clusters':>9} "
+          f"{'Singletons':>11} {'Cohesion':>9} {f'ARI vs {args.baseline}':>16}")
+    print("-" * 100)
+    for algorithm in algorithms:
+        r = results[algorithm]
+        ari = f"{r['ari']:.3f}" if r['ari'] is not None else 'n/a'
+        singleton_share = r['singletons'] / r['clusters'] if r['clusters'] else 0.0
+        print(f"{algorithm:<10} {r['events']:>8} {r['seconds']:>9.2f} {r['events_per_second']:>10.0f} "
+              f"{r['clusters']:>9} {singleton_share:>10.0%} {r['cohesion']:>9.3f} {ari:>16}")
+    print("=" * 100)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,185 @@
+"""
+Nearest-neighbour queries over canonical_events.embedding_vector, inside Postgres.
+
+embedding_vector is a pgvector vector(384) with an HNSW cosine index
+(ix_canonical_event_embedding_hnsw), so top-k and threshold queries no longer
+require loading a country's vectors into Python.
+
+- Similarity is cosine similarity (1 - cosine distance), as elsewhere in the pipeline
+- Queries are per initiating country; HNSW returns approximate neighbours
+- The country filter is applied to the index scan's candidates, so a query
+  can return fewer than k rows when the country is a small share of the
+  table; raise ef_search (candidate list size) if that happens
+
+Usage:
+    from services.pipeline.events.canonical_event_index import CanonicalEventIndex
+
+    with get_session() as session:
+        index = CanonicalEventIndex(session)
+        hits = index.neighbours('China', embedding, k=10, threshold=0.85)
+        similar = index.neighbours_of(event_id, k=5, masters_only=True)
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import text
+
+
+def to_pgvector(vector: Sequence[float]) -> str:
+    """Format a vector as a pgvector literal ('[x,y,...]')."""
+    return '[' + ','.join(f'{float(x):.8g}' for x in vector) + ']'
+
+
+class CanonicalEventIndex:
+    """Top-k / threshold neighbour queries over canonical event embeddings."""
+
+    def __init__(self, session, ef_search: int = 100):
+        """
+        Args:
+            session: Database session
+            ef_search: HNSW candidate list size per query (raised to k when k is larger)
+        """
+        self.session = session
+        self.ef_search = ef_search
+
+    def _set_ef_search(self, k: int) -> None:
+        # Transaction-local, so it does not leak into other users of the connection
+        self.session.execute(
+            text("SELECT set_config('hnsw.ef_search', :ef_search, true)"),
+            {'ef_search': str(max(self.ef_search, k))}
+        )
+
+    def neighbours(
+        self,
+        country: str,
+        vector: Sequence[float],
+        k: int = 10,
+        threshold: Optional[float] = None,
+        masters_only: bool = False,
+        exclude_ids: Optional[List] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Nearest canonical events of a country to a query vector.
+
+        Args:
+            country: Initiating country
+            vector: Query embedding (384 floats)
+            k: Max neighbours returned
+            threshold: Only return neighbours with cosine similarity >= threshold
+            masters_only: Only consider master events (master_event_id IS NULL)
+            exclude_ids: Event IDs to leave out (e.g. the query event itself)
+
+        Returns:
+            List of dicts with keys: id, canonical_name, master_event_id, similarity
+            (most similar first)
+        """
+        filters = ''
+        if masters_only:
+            filters += ' AND ce.master_event_id IS NULL'
+        if exclude_ids:
+            filters += ' AND ce.id <> ALL(CAST(:exclude_ids AS UUID[]))'
+
+        self._set_ef_search(k)
+        result = self.session.execute(text(f'''
+            SELECT id, canonical_name, master_event_id, similarity
+            FROM (
+                SELECT
+                    ce.id,
+                    ce.canonical_name,
+                    ce.master_event_id,
+                    1 - (ce.embedding_vector <=> CAST(:vector AS vector)) AS similarity
+                FROM canonical_events ce
+                WHERE ce.initiating_country = :country
+                  AND ce.embedding_vector IS NOT NULL{filters}
+                ORDER BY ce.embedding_vector <=> CAST(:vector AS vector)
+                LIMIT :k
+            ) nearest
+            WHERE :threshold IS NULL OR similarity >= :threshold
+            ORDER BY similarity DESC
+        '''), {
+            'country': country,
+            'vector': to_pgvector(vector),
+            'k': k,
+            'threshold': threshold,
+            'exclude_ids': [str(i) for i in exclude_ids or []]
+        })
+
+        return [
+            {
+                'id': row.id,
+                'canonical_name': row.canonical_name,
+                'master_event_id': row.master_event_id,
+                'similarity': float(row.similarity)
+            }
+            for row in result
+        ]
+
+    def neighbours_many(
+        self,
+        event_ids: List,
+        k: int = 10,
+        threshold: Optional[float] = None,
+        masters_only: bool = False
+    ) -> Dict[Any, List[Dict[str, Any]]]:
+        """
+        Nearest neighbours of several stored events in one round trip.
+
+        Each event is compared within its own initiating country and never
+        matches itself.
+
+        Returns:
+            Dict mapping query event id -> list of neighbour dicts (most similar first);
+            events without an embedding map to an empty list
+        """
+        if not event_ids:
+            return {}
+
+        masters_filter = ' AND c.master_event_id IS NULL' if masters_only else ''
+
+        self._set_ef_search(k)
+        result = self.session.execute(text(f'''
+            SELECT q.id AS query_id, n.id, n.canonical_name, n.master_event_id, n.similarity
+            FROM canonical_events q
+            CROSS JOIN LATERAL (
+                SELECT
+                    c.id,
+                    c.canonical_name,
+                    c.master_event_id,
+                    1 - (c.embedding_vector <=> q.embedding_vector) AS similarity
+                FROM canonical_events c
+                WHERE c.initiating_country = q.initiating_country
+                  AND c.embedding_vector IS NOT NULL
+                  AND c.id <> q.id{masters_filter}
+                ORDER BY c.embedding_vector <=> q.embedding_vector
+                LIMIT :k
+            ) n
+            WHERE q.id = ANY(CAST(:event_ids AS UUID[]))
+              AND q.embedding_vector IS NOT NULL
+              AND (:threshold IS NULL OR n.similarity >= :threshold)
+            ORDER BY q.id, n.similarity DESC
+        '''), {
+            'event_ids': [str(i) for i in event_ids],
+            'k': k,
+            'threshold': threshold
+        })
+
+        neighbours = {event_id: [] for event_id in event_ids}
+        by_str = {str(event_id): event_id for event_id in event_ids}
+        for row in result:
+            neighbours[by_str[str(row.query_id)]].append({
+                'id': row.id,
+                'canonical_name': row.canonical_name,
+                'master_event_id': row.master_event_id,
+                'similarity': float(row.similarity)
+            })
+        return neighbours
+
+    def neighbours_of(
+        self,
+        event_id,
+        k: int = 10,
+        threshold: Optional[float] = None,
+        masters_only: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Nearest neighbours of one stored event within its country (excluding itself)."""
+        return self.neighbours_many([event_id], k=k, threshold=threshold, masters_only=masters_only)[event_id]
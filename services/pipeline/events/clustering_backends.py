@@ -0,0 +1,193 @@
+"""
+Pluggable clustering backends for daily event clustering (Stage 1A).
+
+Every backend maps an (n, d) embedding matrix to n integer labels, with
+every event in some cluster (no -1 noise labels, matching the existing
+DBSCAN(min_samples=1) behavior). `eps` is a cosine distance for all of them:
+
+- dbscan:  sklearn DBSCAN(metric='cosine'); exact, builds pairwise
+           distances for the whole day (the original behavior)
+- hdbscan: hdbscan.HDBSCAN on L2-normalized vectors, merging clusters closer
+           than eps; noise points become singleton clusters
+- leader:  single-pass online leader clustering: an event joins the first
+           leader with cosine similarity >= 1 - eps, otherwise it becomes a
+           new leader; O(n x leaders), for very large days
+
+Each backend accumulates its own runtime, so callers can report it.
+
+Usage:
+    backend = get_clustering_backend('leader', eps=0.15)
+    labels = backend.fit_predict(embeddings)
+    print(backend.stats())
+"""
+
+import time
+from typing import Any, Dict
+
+import numpy as np
+
+
+CLUSTERING_ALGORITHMS = ['dbscan', 'hdbscan', 'leader']
+
+
+def _normalize(embeddings: np.ndarray) -> np.ndarray:
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return embeddings / norms
+
+
+class ClusteringBackend:
+    """Base class: subclasses implement _fit_predict(); timing is tracked here."""
+
+    name = 'base'
+
+    def __init__(self, eps: float = 0.15):
+        """
+        Args:
+            eps: Cosine distance threshold (0.15 = strict, 0.30 = loose)
+        """
+        self.eps = eps
+        self.seconds = 0.0
+        self.calls = 0
+        self.points = 0
+
+    def _fit_predict(self, embeddings: np.ndarray) -> np.ndarray:
+        raise NotImplementedError
+
+    def fit_predict(self, embeddings: np.ndarray) -> np.ndarray:
+        """
+        Cluster embeddings.
+
+        Returns:
+            int64 labels of shape (n,), all >= 0
+        """
+        start = time.perf_counter()
+        if len(embeddings) == 0:
+            labels = np.zeros(0, dtype=np.int64)
+        elif len(embeddings) == 1:
+            labels = np.zeros(1, dtype=np.int64)
+        else:
+            labels = np.asarray(self._fit_predict(embeddings), dtype=np.int64)
+        self.seconds += time.perf_counter() - start
+        self.calls += 1
+        self.points += len(embeddings)
+        return labels
+
+    def stats(self) -> Dict[str, Any]:
+        """Accumulated runtime for this backend."""
+        return {
+            'algorithm': self.name,
+            'calls': self.calls,
+            'points': self.points,
+            'seconds': self.seconds,
+            'points_per_second': self.points / self.seconds if self.seconds > 0 else 0.0,
+        }
+
+
+class DBSCANBackend(ClusteringBackend):
+    name = 'dbscan'
+
+    def _fit_predict(self, embeddings: np.ndarray) -> np.ndarray:
+        from sklearn.cluster import DBSCAN
+
+        return DBSCAN(metric='cosine', eps=self.eps, min_samples=1).fit_predict(embeddings)
+
+
+class HDBSCANBackend(ClusteringBackend):
+    name = 'hdbscan'
+
+    def __init__(self, eps: float = 0.15, min_cluster_size: int = 2):
+        """
+        Args:
+            eps: Cosine distance below which clusters are never split
+            min_cluster_size: Smallest group HDBSCAN reports as a cluster
+        """
+        super().__init__(eps)
+        self.min_cluster_size = min_cluster_size
+
+    def _fit_predict(self, embeddings: np.ndarray) -> np.ndarray:
+        import hdbscan
+
+        # On unit vectors, euclidean distance = sqrt(2 * cosine distance)
+        clusterer = hdbscan.HDBSCAN(
+            min_cluster_size=self.min_cluster_size,
+            min_samples=1,
+            metric='euclidean',
+            cluster_selection_epsilon=float(np.sqrt(2 * self.eps))
+        )
+        labels = clusterer.fit_predict(_normalize(embeddings).astype(np.float64))
+
+        # Noise points become their own clusters
+        noise = labels == -1
+        if noise.any():
+            labels = labels.copy()
+            labels[noise] = labels.max() + 1 + np.arange(noise.sum())
+        return labels
+
+
+class LeaderBackend(ClusteringBackend):
+    name = 'leader'
+
+    def __init__(self, eps: float = 0.15, chunk_size: int = 1024):
+        """
+        Args:
+            eps: Cosine distance within which an event joins a leader
+            chunk_size: Events compared against the leaders per matrix product
+        """
+        super().__init__(eps)
+        self.chunk_size = chunk_size
+
+    def _fit_predict(self, embeddings: np.ndarray) -> np.ndarray:
+        vectors = _normalize(embeddings)
+        n, dim = vectors.shape
+        min_similarity = 1.0 - self.eps
+
+        labels = np.empty(n, dtype=np.int64)
+        leaders = np.empty((min(n, 1024), dim), dtype=np.float32)
+        num_leaders = 0
+
+        for start in range(0, n, self.chunk_size):
+            chunk = vectors[start:start + self.chunk_size]
+
+            # Match the whole chunk against the existing leaders at once
+            if num_leaders:
+                sims = chunk @ leaders[:num_leaders].T
+                matched = sims >= min_similarity
+                first = np.where(matched.any(axis=1), matched.argmax(axis=1), -1)
+            else:
+                first = np.full(len(chunk), -1)
+
+            # Unmatched events may still match leaders created earlier in this chunk
+            chunk_leaders_start = num_leaders
+            for i in np.flatnonzero(first == -1):
+                if num_leaders > chunk_leaders_start:
+                    sims = leaders[chunk_leaders_start:num_leaders] @ chunk[i]
+                    hits = np.flatnonzero(sims >= min_similarity)
+                    if len(hits):
+                        first[i] = chunk_leaders_start + hits[0]
+                        continue
+
+                if num_leaders == len(leaders):
+                    leaders = np.concatenate([leaders, np.empty_like(leaders)])
+                leaders[num_leaders] = chunk[i]
+                first[i] = num_leaders
+                num_leaders += 1
+
+            labels[start:start + len(chunk)] = first
+
+        return labels
+
+
+CLUSTERING_BACKENDS = {
+    'dbscan': DBSCANBackend,
+    'hdbscan': HDBSCANBackend,
+    'leader': LeaderBackend,
+}
+
+
+def get_clustering_backend(algorithm: str = 'dbscan', eps: float = 0.15, **kwargs) -> ClusteringBackend:
+    """Build a clustering backend by name (see CLUSTERING_ALGORITHMS)."""
+    if algorithm not in CLUSTERING_BACKENDS:
+        raise ValueError(f"Unknown clustering algorithm '{algorithm}' (choose from {', '.join(CLUSTERING_ALGORITHMS)})")
+    return CLUSTERING_BACKENDS[algorithm](eps=eps, **kwargs)
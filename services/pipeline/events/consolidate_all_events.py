@@ -31,9 +31,29 @@ Usage:
     # Force re-consolidation (resets existing consolidations first)
     python consolidate_all_events.py --country China --force
 
+    # Large countries: bound memory and use several cores
+    python consolidate_all_events.py --country China --block-size 4096 --workers 4
+
+    # Nightly: only compare events created since the last run against existing masters
+    python consolidate_all_events.py --influencers --incremental
+
+    # One-off: adopt --incremental for countries consolidated before watermarks existed
+    python consolidate_all_events.py --influencers --init-watermark
+
 IMPORTANT: Running multiple times without --force will skip already-consolidated events
 to prevent accumulation. Use --force to reset and re-run with different parameters.
 
+INCREMENTAL MODE: Every full run records a watermark (latest canonical_events.created_at
+it saw, capped below the start of any transaction still open, whose events may commit
+later) per country in pipeline_watermarks. --incremental loads only events created after
+the watermark, groups them among themselves, and compares them against the centroids of
+existing master groups: a new group is attached to the most similar master at or above
+the threshold, otherwise it becomes a new master. Cost is O(new x masters) instead of
+O(all^2). Existing masters are never merged with each other; run a full --force pass
+periodically to pick up such merges. Requires at least one full run first; countries
+consolidated before watermarks existed can adopt it with --init-watermark, which seeds the
+watermark without regrouping (keeps Stage 2B-validated groups).
+
 See EVENT_PROCESSING_ARCHITECTURE.md for complete pipeline documentation.
 """
 
@@ -41,12 +61,22 @@ import argparse
 import yaml
 import numpy as np
 import gc
-from typing import List, Dict
-from sklearn.metrics.pairwise import cosine_similarity
+from datetime import datetime
+from typing import List, Dict, Optional, Tuple
 from sqlalchemy import text
 
 from shared.database.database import get_session
 from shared.models.models import CanonicalEvent
+from shared.utils.vector_codec import decode_pgvector
+from services.pipeline.events.event_similarity import (
+    DEFAULT_BLOCK_SIZE,
+    find_best_matches,
+    group_similar_embeddings
+)
+from services.pipeline.events.watermarks import get_watermark, set_watermark
+
+
+WATERMARK_STAGE = 'consolidate_all_events'
 
 
 def load_config(config_path: str = 'shared/config/config.yaml') -> dict:
@@ -64,21 +94,35 @@ def load_config(config_path: str = 'shared/config/config.yaml') -> dict:
 
 def load_all_canonical_events(
     session,
-    country: str
+    country: str,
+    created_after: Optional[datetime] = None,
+    created_until: Optional[datetime] = None
 ) -> List[Dict]:
     """
     Load ALL canonical events for a specific country.
     Only loads events that don't already have a master_event_id set.
 
+    Args:
+        session: Database session
+        country: Initiating country
+        created_after: If set, only events with created_at > this (incremental mode)
+        created_until: If set, only events with created_at <= this
+
     Returns:
         List of dicts with canonical event info plus aggregated mention stats
     """
-    result = session.execute(text('''
+    created_filter = ''
+    if created_after is not None:
+        created_filter += ' AND ce.created_at > :created_after'
+    if created_until is not None:
+        created_filter += ' AND ce.created_at <= :created_until'
+
+    result = session.execute(text(f'''
         SELECT
             ce.id,
             ce.canonical_name,
             ce.initiating_country,
-            ce.embedding_vector,
+            vector_send(ce.embedding_vector) AS embedding_bin,
             ce.alternative_names,
             ce.master_event_id,
             COUNT(DISTINCT dem.mention_date) as days_mentioned,
@@ -88,14 +132,17 @@ def load_all_canonical_events(
         FROM canonical_events ce
         LEFT JOIN daily_event_mentions dem ON ce.id = dem.canonical_event_id
         WHERE ce.initiating_country = :country
-          AND ce.master_event_id IS NULL
+          AND ce.master_event_id IS NULL{created_filter}
         GROUP BY ce.id
         ORDER BY total_articles DESC NULLS LAST
     '''), {
-        'country': country
+        'country': country,
+        'created_after': created_after,
+        'created_until': created_until
     }).fetchall()
 
     events = []
+    embedding_blobs = []
     skipped_no_embedding = 0
 
     for row in result:
@@ -104,11 +151,11 @@ def load_all_canonical_events(
             skipped_no_embedding += 1
             continue
 
+        embedding_blobs.append(row[3])
         events.append({
             'id': row[0],
             'canonical_name': row[1],
             'initiating_country': row[2],
-            'embedding': np.array(row[3]),
             'alternative_names': row[4] or [],
             'master_event_id': row[5],
             'days_mentioned': row[6] or 0,
@@ -120,21 +167,34 @@ def load_all_canonical_events(
     if skipped_no_embedding > 0:
         print(f"  [WARNING] Skipped {skipped_no_embedding:,} events without embeddings")
 
+    # One contiguous float32 matrix; each event's 'embedding' is a row view into it
+    embeddings = decode_pgvector(embedding_blobs)
+    for event, embedding in zip(events, embeddings):
+        event['embedding'] = embedding
+
     return events
 
 
 def find_similar_events(
     events: List[Dict],
     similarity_threshold: float = 0.85,
-    verbose: bool = True
+    verbose: bool = True,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    workers: int = 1
 ) -> List[List[int]]:
     """
     Find groups of similar events using embedding cosine similarity.
 
+    Groups are connected components of the "similarity >= threshold" graph.
+    Similarities are computed in row blocks and pruned at the threshold, so
+    the full n x n matrix is never held in memory (see event_similarity.py).
+
     Args:
         events: List of event dicts with 'embedding' field
         similarity_threshold: Minimum cosine similarity to consider events related
         verbose: Print progress indicators
+        block_size: Rows per similarity block (bounds peak memory)
+        workers: Threads used to compute similarity blocks
 
     Returns:
         List of event index groups (each group is a list of indices into events list)
@@ -142,78 +202,23 @@ def find_similar_events(
     if len(events) == 0:
         return []
 
-    n = len(events)
-
     if verbose:
-        print(f"  Building embedding matrix ({n:,} events)...")
+        print(f"  Building embedding matrix ({len(events):,} events)...")
 
-    # Build embedding matrix
     embeddings = np.vstack([e['embedding'] for e in events])
 
-    if verbose:
-        matrix_size_mb = (n * n * 8) / (1024 * 1024)  # 8 bytes per float64
-        print(f"  Computing similarity matrix ({n:,} x {n:,} = {matrix_size_mb:.1f} MB)...")
-        print(f"  Using chunked computation to avoid memory issues...")
-
-    # Compute pairwise similarities in chunks to avoid memory corruption
-    chunk_size = 1000  # Process 1000 rows at a time
-    similarities = np.zeros((n, n), dtype=np.float32)  # Use float32 to save memory
-
-    for start_idx in range(0, n, chunk_size):
-        end_idx = min(start_idx + chunk_size, n)
-        chunk = embeddings[start_idx:end_idx]
-        similarities[start_idx:end_idx] = cosine_similarity(chunk, embeddings).astype(np.float32)
-
-        if verbose and start_idx > 0 and start_idx % (chunk_size * 5) == 0:
-            progress = (end_idx / n) * 100
-            print(f"    Similarity computation: {progress:.1f}% complete ({end_idx:,}/{n:,})")
-
-        # Clean up chunk
-        del chunk
-        gc.collect()
-
     if verbose:
         print(f"  Finding connected components (threshold={similarity_threshold})...")
 
-    # Find connected components using similarity threshold
-    # Using iterative DFS to avoid recursion depth issues with large clusters
-    visited = [False] * n
-    groups = []
-
-    # Progress tracking for large datasets
-    progress_interval = max(1000, n // 10)  # Report every 10% or every 1000 events
-
-    for i in range(n):
-        if verbose and i > 0 and i % progress_interval == 0:
-            progress_pct = (i / n) * 100
-            print(f"    Progress: {i:,}/{n:,} events processed ({progress_pct:.1f}%), found {len(groups):,} groups so far")
-
-        if not visited[i]:
-            # Iterative DFS using a stack
-            group = []
-            stack = [i]
-
-            while stack:
-                idx = stack.pop()
-
-                if visited[idx]:
-                    continue
-
-                visited[idx] = True
-                group.append(idx)
-
-                # Add unvisited similar events to stack
-                for j in range(n):
-                    if not visited[j] and similarities[idx][j] >= similarity_threshold:
-                        stack.append(j)
-
-            if len(group) > 1:  # Only include groups with multiple events
-                groups.append(group)
+    groups = group_similar_embeddings(
+        embeddings,
+        similarity_threshold=similarity_threshold,
+        block_size=block_size,
+        workers=workers,
+        verbose=verbose
+    )
 
-    # Explicitly clean up large matrices to avoid memory corruption
     del embeddings
-    del similarities
-    del visited
     gc.collect()
 
     return groups
@@ -225,7 +230,9 @@ def consolidate_country(
     similarity_threshold: float = 0.85,
     dry_run: bool = False,
     verbose: bool = True,
-    force: bool = False
+    force: bool = False,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    workers: int = 1
 ) -> Dict[str, int]:
     """
     Consolidate all events for a specific country.
@@ -237,6 +244,8 @@ def consolidate_country(
         dry_run: If True, don't save changes to database
         verbose: Print progress
         force: If True, reset existing consolidations before running
+        block_size: Rows per similarity block (bounds peak memory)
+        workers: Threads used to compute similarity blocks
 
     Returns:
         Dict with statistics
@@ -257,6 +266,7 @@ def consolidate_country(
     if existing_consolidations > 0 and not force and not dry_run:
         print(f"\n  [WARNING] {existing_consolidations} events already consolidated for {country}")
         print(f"  To prevent accumulation of multiple consolidation runs:")
+        print(f"    - Use --init-watermark to keep them and switch to --incremental")
         print(f"    - Use --force to reset and re-consolidate")
         print(f"    - Or manually reset: UPDATE canonical_events SET master_event_id = NULL WHERE initiating_country = '{country}'")
         return {'events': 0, 'groups': 0, 'consolidated': 0, 'updated': 0, 'skipped': True}
@@ -271,25 +281,34 @@ def consolidate_country(
         '''), {'country': country})
         session.commit()
 
+    # Everything created up to now is covered by this run (watermark for --incremental)
+    run_watermark = get_country_high_water(session, country)
+
     # Load ALL canonical events for this country
-    events = load_all_canonical_events(session, country)
+    events = load_all_canonical_events(session, country, created_until=run_watermark)
 
     if len(events) == 0:
         if verbose:
             print(f"  No events found for {country}")
-        return {'events': 0, 'groups': 0, 'consolidated': 0, 'updated': 0}
+        stats = {'events': 0, 'groups': 0, 'consolidated': 0, 'updated': 0}
+        if not dry_run:
+            record_watermark(session, country, run_watermark, stats)
+        return stats
 
     if verbose:
         print(f"  Loaded {len(events)} canonical events")
 
     # Find similar event groups
-    groups = find_similar_events(events, similarity_threshold)
+    groups = find_similar_events(events, similarity_threshold, verbose, block_size, workers)
 
     if verbose:
         print(f"  Identified {len(groups)} event groups to consolidate")
 
     if len(groups) == 0:
-        return {'events': len(events), 'groups': 0, 'consolidated': 0, 'updated': 0}
+        stats = {'events': len(events), 'groups': 0, 'consolidated': 0, 'updated': 0}
+        if not dry_run:
+            record_watermark(session, country, run_watermark, stats)
+        return stats
 
     stats = {
         'events': len(events),
@@ -335,9 +354,10 @@ def consolidate_country(
         elif verbose:
             print(f"    [UPDATED] Linked {len(child_events)} child events to master")
 
-    # Commit changes if not dry run
+    # Commit changes (and the watermark) if not dry run
+    if not dry_run:
+        record_watermark(session, country, run_watermark, stats)
     if not dry_run and stats['updated'] > 0:
-        session.commit()
         if verbose:
             print(f"\n  [COMMITTED] Updated {stats['updated']} canonical events")
     elif dry_run and verbose:
@@ -351,6 +371,260 @@ def consolidate_country(
     return stats
 
 
+def get_country_high_water(session, country: str) -> Optional[datetime]:
+    """
+    Latest canonical_events.created_at for a country that is safe to use as a watermark.
+
+    created_at is now() of the inserting transaction, i.e. its start time, and
+    becomes visible only when that transaction commits. A client transaction
+    that has already written (e.g. a Stage 1B batch between checkpoints) can
+    therefore commit events older than MAX(created_at) after this run. The high
+    water is capped just below the start of the oldest such transaction, so
+    those events stay above the watermark and are picked up by the next run.
+    Background workers and sessions that have not written anything (idle
+    dashboards) do not hold the watermark back.
+
+    Returns:
+        Watermark, or None if the country has no events
+    """
+    row = session.execute(text('''
+        SELECT
+            (SELECT MAX(created_at)
+             FROM canonical_events
+             WHERE initiating_country = :country) AS high_water,
+            (SELECT MIN(xact_start)::timestamp - INTERVAL '1 microsecond'
+             FROM pg_stat_activity
+             WHERE datname = current_database()
+               AND backend_type = 'client backend'
+               AND backend_xid IS NOT NULL
+               AND pid <> pg_backend_pid()) AS open_writes_before
+    '''), {'country': country}).one()
+
+    if row.high_water is None or row.open_writes_before is None or row.open_writes_before >= row.high_water:
+        return row.high_water
+
+    print(f"  [INFO] {country}: watermark held at {row.open_writes_before} (latest event {row.high_water}) "
+          f"by a transaction still writing; later events are picked up by the next run")
+    return row.open_writes_before
+
+
+def get_consolidated_high_water(session, country: str) -> Optional[datetime]:
+    """Latest created_at among a country's events that belong to a consolidated group."""
+    return session.execute(text('''
+        SELECT MAX(ce.created_at)
+        FROM canonical_events ce
+        WHERE ce.initiating_country = :country
+          AND (ce.master_event_id IS NOT NULL
+               OR EXISTS (SELECT 1 FROM canonical_events c WHERE c.master_event_id = ce.id))
+    '''), {'country': country}).scalar()
+
+
+def init_consolidation_watermark(session, country: str, dry_run: bool = False, verbose: bool = True) -> Optional[datetime]:
+    """
+    Seed the incremental watermark for a country consolidated before watermarks existed.
+
+    Existing groups (including Stage 2B-validated ones) are kept as they are.
+    The watermark is the newest event already in a group, so events created
+    after the last full run are still consolidated by the next --incremental
+    run; singletons it re-examines cannot match themselves, because only
+    groups at or before the watermark are compared against.
+
+    Returns:
+        The seeded (or existing) watermark; None if the country has no
+        consolidated groups yet (run a full consolidation instead)
+    """
+    existing = get_watermark(session, WATERMARK_STAGE, country)
+    if existing is not None:
+        if verbose:
+            print(f"  {country}: watermark already set ({existing})")
+        return existing
+
+    consolidated_until = get_consolidated_high_water(session, country)
+    if consolidated_until is None:
+        if verbose:
+            print(f"  {country}: no consolidated groups yet; run a full consolidation instead")
+        return None
+
+    high_water = get_country_high_water(session, country)
+    watermark = min(consolidated_until, high_water) if high_water is not None else consolidated_until
+
+    if dry_run:
+        print(f"  [DRY RUN] {country}: would seed watermark {watermark}")
+        return watermark
+
+    record_watermark(session, country, watermark, {'seeded': True})
+    if verbose:
+        print(f"  [OK] {country}: seeded watermark {watermark} (existing groups kept)")
+    return watermark
+
+
+def record_watermark(
+    session,
+    country: str,
+    watermark: Optional[datetime],
+    stats: Dict[str, int]
+) -> None:
+    """Store the consolidation watermark for a country and commit."""
+    if watermark is not None:
+        set_watermark(session, WATERMARK_STAGE, country, watermark, stats)
+    session.commit()
+
+
+def load_master_centroids(
+    session,
+    country: str,
+    created_until: datetime
+) -> Tuple[List, np.ndarray]:
+    """
+    Load the mean embedding of every existing master group for a country.
+
+    A master group is a master event (master_event_id IS NULL) plus all of its
+    children. Only events at or before the watermark are included.
+
+    Returns:
+        (master_ids, centroids) where centroids[i] belongs to master_ids[i]
+    """
+    # Averaged in Postgres (pgvector avg), so only one vector per group is transferred
+    rows = session.execute(text('''
+        SELECT COALESCE(master_event_id, id) AS group_id,
+               vector_send(AVG(embedding_vector)) AS centroid
+        FROM canonical_events
+        WHERE initiating_country = :country
+          AND created_at <= :created_until
+          AND embedding_vector IS NOT NULL
+        GROUP BY COALESCE(master_event_id, id)
+    '''), {'country': country, 'created_until': created_until}).fetchall()
+
+    if not rows:
+        return [], np.zeros((0, 0))
+
+    return [row[0] for row in rows], decode_pgvector([row[1] for row in rows]).astype(np.float64)
+
+
+def consolidate_country_incremental(
+    session,
+    country: str,
+    similarity_threshold: float = 0.85,
+    dry_run: bool = False,
+    verbose: bool = True,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    workers: int = 1
+) -> Dict[str, int]:
+    """
+    Consolidate only canonical events created since the last recorded run.
+
+    New events are grouped among themselves, then each group is compared
+    against existing master-group centroids. A group that matches is attached
+    to the best-matching master; otherwise its most-mentioned event becomes a
+    new master.
+
+    Args:
+        session: Database session
+        country: Initiating country
+        similarity_threshold: Cosine similarity threshold for merging events
+        dry_run: If True, don't save changes to database
+        verbose: Print progress
+        block_size: Rows per similarity block (bounds peak memory)
+        workers: Threads used to compute similarity blocks
+
+    Returns:
+        Dict with statistics
+    """
+    if verbose:
+        print(f"\n" + "=" * 80)
+        print(f"Incremental consolidation: {country}")
+        print("=" * 80)
+
+    stats = {'events': 0, 'groups': 0, 'consolidated': 0, 'updated': 0, 'attached': 0, 'new_masters': 0}
+
+    watermark = get_watermark(session, WATERMARK_STAGE, country)
+    if watermark is None:
+        print(f"\n  [WARNING] No consolidation watermark for {country}")
+        print(f"  Run a full consolidation first (without --incremental) to establish one")
+        stats['skipped'] = True
+        return stats
+
+    # Never move the watermark back (an open transaction older than it would otherwise do so)
+    run_watermark = max(get_country_high_water(session, country) or watermark, watermark)
+    events = load_all_canonical_events(session, country, created_after=watermark, created_until=run_watermark)
+
+    if verbose:
+        print(f"  Watermark: {watermark}")
+        print(f"  Loaded {len(events):,} new canonical events")
+
+    if len(events) == 0:
+        if not dry_run:
+            record_watermark(session, country, run_watermark, stats)
+        return stats
+
+    stats['events'] = len(events)
+
+    master_ids, centroids = load_master_centroids(session, country, watermark)
+    if verbose:
+        print(f"  Loaded {len(master_ids):,} existing master groups")
+
+    # Group new events among themselves; ungrouped events form singleton units
+    groups = find_similar_events(events, similarity_threshold, verbose, block_size, workers)
+    grouped = {idx for group in groups for idx in group}
+    units = groups + [[idx] for idx in range(len(events)) if idx not in grouped]
+
+    embeddings = np.vstack([e['embedding'] for e in events])
+    best_index, best_similarity = find_best_matches(embeddings, centroids, similarity_threshold, block_size)
+    del embeddings
+
+    updates = []
+    for unit in units:
+        matches = [(best_similarity[idx], best_index[idx]) for idx in unit if best_index[idx] >= 0]
+
+        if matches:
+            # Attach the whole unit to the most similar existing master
+            _, master_idx = max(matches)
+            master_id = master_ids[master_idx]
+            updates.extend({'master_id': master_id, 'child_id': events[idx]['id']} for idx in unit)
+            stats['attached'] += len(unit)
+            stats['groups'] += 1
+            stats['consolidated'] += len(unit)
+            continue
+
+        stats['new_masters'] += 1
+        if len(unit) == 1:
+            continue
+
+        # New multi-event group: most mentioned event becomes the master
+        unit_events = sorted((events[idx] for idx in unit),
+                             key=lambda e: (e['total_articles'], e['days_mentioned']), reverse=True)
+        master_event = unit_events[0]
+        updates.extend({'master_id': master_event['id'], 'child_id': child['id']} for child in unit_events[1:])
+        stats['groups'] += 1
+        stats['consolidated'] += len(unit)
+
+        if verbose:
+            safe_name = master_event['canonical_name'].encode('ascii', 'replace').decode('ascii')
+            print(f"    New master: {safe_name} ({len(unit_events) - 1} children)")
+
+    if verbose:
+        print(f"  Attached {stats['attached']:,} new events to existing masters")
+        print(f"  Started {stats['new_masters']:,} new masters")
+
+    if dry_run:
+        if verbose:
+            print(f"\n  [DRY RUN] Would update {len(updates)} canonical events")
+        return stats
+
+    if updates:
+        session.execute(
+            text('UPDATE canonical_events SET master_event_id = :master_id WHERE id = :child_id'),
+            updates
+        )
+        stats['updated'] = len(updates)
+
+    record_watermark(session, country, run_watermark, stats)
+    if verbose:
+        print(f"\n  [COMMITTED] Updated {stats['updated']} canonical events, watermark -> {run_watermark}")
+
+    return stats
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Comprehensive Canonical Event Consolidation",
@@ -363,12 +637,20 @@ def main():
     parser.add_argument('--influencers', action='store_true', help='Process all influencer countries from config.yaml')
 
     # Consolidation parameters
-    parser.add_argument('--similarity-threshold', type=float, default=0.85,
+    parser.add_argument('--similarity-threshold', '--threshold', dest='similarity_threshold', type=float, default=0.85,
                        help='Cosine similarity threshold for merging events (0.0-1.0)')
+    parser.add_argument('--block-size', type=int, default=DEFAULT_BLOCK_SIZE,
+                       help='Rows per similarity block; bounds peak memory (default: %(default)s)')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Threads used to compute similarity blocks (default: 1)')
 
     # Options
     parser.add_argument('--dry-run', action='store_true', help='Show what would be consolidated without saving')
     parser.add_argument('--force', action='store_true', help='Reset existing consolidations before running (prevents accumulation)')
+    parser.add_argument('--incremental', action='store_true',
+                       help='Only consolidate events created since the last run against existing masters')
+    parser.add_argument('--init-watermark', action='store_true',
+                       help='Seed the --incremental watermark for already consolidated countries without regrouping')
     parser.add_argument('--verbose', action='store_true', default=True, help='Print detailed progress')
 
     args = parser.parse_args()
@@ -388,10 +670,16 @@ def main():
     print("=" * 80)
     print(f"Countries: {', '.join(countries)}")
     print(f"Similarity threshold: {args.similarity_threshold}")
+    print(f"Block size: {args.block_size:,} | Workers: {args.workers}")
     if args.dry_run:
         print("[DRY RUN MODE] No changes will be saved")
+    if sum([args.force, args.incremental, args.init_watermark]) > 1:
+        print("[ERROR] --force, --incremental and --init-watermark cannot be combined")
+        return
     if args.force:
         print("[FORCE MODE] Resetting existing consolidations before running")
+    if args.incremental:
+        print("[INCREMENTAL MODE] Comparing only new events against existing masters")
     print("=" * 80)
 
     overall_stats = {
@@ -401,16 +689,35 @@ def main():
         'total_updated': 0
     }
 
+    if args.init_watermark:
+        with get_session() as session:
+            for country in countries:
+                init_consolidation_watermark(session, country, args.dry_run, args.verbose)
+        return
+
     with get_session() as session:
         for country in countries:
-            stats = consolidate_country(
-                session,
-                country,
-                args.similarity_threshold,
-                args.dry_run,
-                args.verbose,
-                args.force
-            )
+            if args.incremental:
+                stats = consolidate_country_incremental(
+                    session,
+                    country,
+                    args.similarity_threshold,
+                    args.dry_run,
+                    args.verbose,
+                    args.block_size,
+                    args.workers
+                )
+            else:
+                stats = consolidate_country(
+                    session,
+                    country,
+                    args.similarity_threshold,
+                    args.dry_run,
+                    args.verbose,
+                    args.force,
+                    args.block_size,
+                    args.workers
+                )
 
             overall_stats['total_events'] += stats['events']
             overall_stats['total_groups'] += stats['groups']
@@ -0,0 +1,270 @@
+"""
+Dirty-marker queue helpers.
+
+Ingestion records each (initiating_country, date) it loads new documents for
+in the pipeline_dirty_markers table. process_dirty_markers.py claims pending
+markers and re-runs only the affected pipeline steps.
+
+A marker is pending while version > processed_version. Marking an existing
+partition bumps its version, so documents that arrive while a worker is
+processing that partition leave it pending for another pass. Claims are
+leases: the worker renews claimed_at as it makes progress, a worker that dies
+leaves it behind, and the marker becomes claimable again once the lease
+expires. Renewing, completing and failing only touch markers whose claim is
+still the one the worker holds (same claimed_version and claimed_at), so a
+worker that lost its lease cannot overwrite the claim of the worker that took
+the markers over.
+
+Usage:
+    mark_dirty_documents(session, documents)   # after the documents commit
+    session.commit()
+
+    markers = claim_markers(session, ['China'], limit=50)
+    ...
+    renew_markers(session, markers)            # periodically while processing
+    ...
+    complete_markers(session, markers)
+"""
+
+from collections import Counter
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+
+
+def split_countries(val) -> List[str]:
+    """Split a semicolon-separated initiating_country field."""
+    if not val:
+        return []
+    return [x.strip() for x in str(val).split(";") if x.strip()]
+
+
+def mark_dirty(session, partitions: Dict[tuple, int]) -> int:
+    """
+    Upsert markers for (country, date) partitions.
+
+    Does not commit; the caller commits it together with the documents.
+
+    Args:
+        session: Database session
+        partitions: {(initiating_country, date): new document count}
+
+    Returns:
+        Number of partitions marked
+    """
+    if not partitions:
+        return 0
+
+    countries, dates, counts = [], [], []
+    for (country, marker_date), count in partitions.items():
+        countries.append(country)
+        dates.append(marker_date)
+        counts.append(int(count))
+
+    session.execute(text('''
+        INSERT INTO pipeline_dirty_markers
+            (id, initiating_country, marker_date, doc_count, version, processed_version, attempts, last_marked_at)
+        SELECT gen_random_uuid(), t.country, t.marker_date, t.doc_count, 1, 0, 0, NOW()
+        FROM unnest(CAST(:countries AS TEXT[]), CAST(:dates AS DATE[]), CAST(:counts AS INTEGER[]))
+            AS t(country, marker_date, doc_count)
+        ON CONFLICT (initiating_country, marker_date) DO UPDATE
+        SET doc_count = pipeline_dirty_markers.doc_count + EXCLUDED.doc_count,
+            version = pipeline_dirty_markers.version + 1,
+            last_marked_at = NOW(),
+            next_attempt_at = NULL
+    '''), {'countries': countries, 'dates': dates, 'counts': counts})
+
+    return len(partitions)
+
+
+def mark_dirty_documents(session, documents) -> int:
+    """
+    Mark the (initiating country, date) partitions of newly loaded documents.
+
+    Documents without a date or initiating country are ignored.
+
+    Returns:
+        Number of partitions marked
+    """
+    partitions = Counter()
+    for doc in documents:
+        doc_date = doc.date
+        if isinstance(doc_date, str):
+            doc_date = datetime.strptime(doc_date[:10], '%Y-%m-%d').date()
+        elif isinstance(doc_date, datetime):
+            doc_date = doc_date.date()
+        if not isinstance(doc_date, date):
+            continue
+        for country in split_countries(doc.initiating_country):
+            partitions[(country, doc_date)] += 1
+
+    return mark_dirty(session, partitions)
+
+
+def claim_markers(
+    session,
+    countries: Optional[List[str]] = None,
+    limit: int = 50,
+    settle_seconds: int = 120,
+    lease_seconds: int = 3600
+) -> List[Dict]:
+    """
+    Claim up to `limit` pending markers, oldest partition first, and commit the claim.
+
+    Args:
+        session: Database session
+        countries: Only claim markers for these countries (None = all)
+        limit: Max markers to claim
+        settle_seconds: Skip markers marked more recently than this, so a
+            running ingestion finishes a partition before it is processed
+        lease_seconds: Claims older than this are considered abandoned
+
+    Returns:
+        List of dicts with keys: id, initiating_country, marker_date, claimed_version, claimed_at
+    """
+    country_filter = "AND initiating_country = ANY(:countries)" if countries else ""
+    result = session.execute(text(f'''
+        WITH claimable AS (
+            SELECT id
+            FROM pipeline_dirty_markers
+            WHERE version > processed_version
+              {country_filter}
+              AND last_marked_at <= NOW() - make_interval(secs => :settle_seconds)
+              AND (claimed_at IS NULL OR claimed_at <= NOW() - make_interval(secs => :lease_seconds))
+              AND (next_attempt_at IS NULL OR next_attempt_at <= NOW())
+            ORDER BY marker_date, initiating_country
+            LIMIT :limit
+            FOR UPDATE SKIP LOCKED
+        )
+        UPDATE pipeline_dirty_markers m
+        SET claimed_at = NOW(),
+            claimed_version = m.version,
+            attempts = m.attempts + 1
+        FROM claimable
+        WHERE m.id = claimable.id
+        RETURNING m.id, m.initiating_country, m.marker_date, m.claimed_version, m.claimed_at
+    '''), {
+        'countries': countries,
+        'limit': limit,
+        'settle_seconds': settle_seconds,
+        'lease_seconds': lease_seconds
+    })
+
+    markers = [
+        {
+            'id': row.id,
+            'initiating_country': row.initiating_country,
+            'marker_date': row.marker_date,
+            'claimed_version': row.claimed_version,
+            'claimed_at': row.claimed_at
+        }
+        for row in result
+    ]
+    session.commit()
+    return markers
+
+
+class MarkerLeaseLost(RuntimeError):
+    """Raised when claimed markers were reclaimed by another worker after their lease expired."""
+
+
+def _claim_params(markers: List[Dict]) -> Dict:
+    return {
+        'ids': [str(m['id']) for m in markers],
+        'versions': [m['claimed_version'] for m in markers],
+        'claimed_ats': [m['claimed_at'] for m in markers]
+    }
+
+
+# Matches only markers still held by the claim the worker got from claim_markers
+HELD_CLAIMS = '''
+    FROM unnest(CAST(:ids AS UUID[]), CAST(:versions AS INTEGER[]), CAST(:claimed_ats AS TIMESTAMP[]))
+        AS held(id, claimed_version, claimed_at)
+    WHERE m.id = held.id
+      AND m.claimed_version = held.claimed_version
+      AND m.claimed_at = held.claimed_at
+'''
+
+
+def renew_markers(session, markers: List[Dict]) -> None:
+    """
+    Extend the lease on claimed markers, and commit.
+
+    Updates claimed_at in each marker dict so later renew/complete/fail calls
+    match the renewed claim.
+
+    Raises:
+        MarkerLeaseLost: If any marker is no longer held by this claim
+    """
+    if not markers:
+        return
+    result = session.execute(text(f'''
+        UPDATE pipeline_dirty_markers m
+        SET claimed_at = clock_timestamp()
+        {HELD_CLAIMS}
+        RETURNING m.id, m.claimed_at
+    '''), _claim_params(markers))
+    renewed = {row.id: row.claimed_at for row in result}
+    session.commit()
+
+    for marker in markers:
+        if marker['id'] in renewed:
+            marker['claimed_at'] = renewed[marker['id']]
+    lost = len(markers) - len(renewed)
+    if lost:
+        raise MarkerLeaseLost(f"{lost} of {len(markers)} markers were reclaimed after their lease expired")
+
+
+def complete_markers(session, markers: List[Dict]) -> int:
+    """
+    Record claimed markers as processed up to the version seen at claim time, and commit.
+
+    Returns:
+        Number of markers completed; markers reclaimed by another worker are left to it
+    """
+    if not markers:
+        return 0
+    result = session.execute(text(f'''
+        UPDATE pipeline_dirty_markers m
+        SET processed_version = GREATEST(m.processed_version, m.claimed_version),
+            claimed_at = NULL,
+            processed_at = NOW(),
+            attempts = 0,
+            error = NULL
+        {HELD_CLAIMS}
+    '''), _claim_params(markers))
+    session.commit()
+    return result.rowcount
+
+
+def fail_markers(session, markers: List[Dict], error: str, max_backoff_seconds: int = 3600) -> int:
+    """
+    Release claimed markers after a failure with exponential retry backoff, and commit.
+
+    Returns:
+        Number of markers released; markers reclaimed by another worker are left to it
+    """
+    if not markers:
+        return 0
+    result = session.execute(text(f'''
+        UPDATE pipeline_dirty_markers m
+        SET claimed_at = NULL,
+            error = :error,
+            next_attempt_at = NOW() + make_interval(secs => LEAST(:max_backoff, 60 * power(2, m.attempts - 1)))
+        {HELD_CLAIMS}
+    '''), {**_claim_params(markers), 'error': error, 'max_backoff': max_backoff_seconds})
+    session.commit()
+    return result.rowcount
+
+
+def pending_counts(session) -> Dict[str, int]:
+    """Pending (unprocessed) marker count per country."""
+    result = session.execute(text('''
+        SELECT initiating_country, COUNT(*) AS pending
+        FROM pipeline_dirty_markers
+        WHERE version > processed_version
+        GROUP BY initiating_country
+        ORDER BY initiating_country
+    '''))
+    return {row.initiating_country: row.pending for row in result}
@@ -0,0 +1,268 @@
+"""
+Blocked Similarity Grouping Engine
+
+Finds groups of near-duplicate events from their embeddings without ever
+materializing the full n x n similarity matrix.
+
+Approach:
+1. L2-normalize the embedding matrix once (cosine similarity == dot product)
+2. Walk the upper triangle in row blocks: block @ embeddings[start:].T
+3. Keep only pairs at or above the threshold (threshold pruning)
+4. Fold each block's edges into a running component labelling with a
+   sparse connected-components pass (union-find over the graph so far)
+
+Memory is bounded by O(n + block_size * n) regardless of dataset size, and
+blocks can be computed on several cores with --workers (numpy releases the
+GIL inside matrix products, so a thread pool shares the embedding matrix
+without copying it).
+
+find_best_matches() does the same blocked, pruned search between two
+different sets (e.g. new events against existing master centroids).
+
+Used by:
+  - consolidate_all_events.py (Stage 2A, full and --incremental)
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Tuple
+
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+
+DEFAULT_BLOCK_SIZE = 2048
+
+
+def normalize_embeddings(embeddings: np.ndarray) -> np.ndarray:
+    """
+    L2-normalize rows of an embedding matrix.
+
+    Zero vectors are left as zeros (similarity 0 to everything), matching
+    sklearn's cosine_similarity behaviour.
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float64)
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return embeddings / norms
+
+
+def _block_edges(
+    normalized: np.ndarray,
+    start: int,
+    end: int,
+    similarity_threshold: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute above-threshold pairs (i, j) with start <= i < end and i < j.
+
+    Only the upper triangle is computed: rows [start, end) against
+    columns [start, n). Similarities are compared as float32, the same
+    precision the original dense implementation used.
+    """
+    sims = (normalized[start:end] @ normalized[start:].T).astype(np.float32)
+    rows, cols = np.nonzero(sims >= similarity_threshold)
+    del sims
+
+    rows = rows + start
+    cols = cols + start
+    upper = rows < cols
+    return rows[upper].astype(np.int64), cols[upper].astype(np.int64)
+
+
+def iter_similar_pairs(
+    normalized: np.ndarray,
+    similarity_threshold: float,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    workers: int = 1
+) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+    """
+    Yield (block_end, rows, cols) for every above-threshold pair, block by block.
+
+    Blocks are yielded in order. With workers > 1, at most 2 * workers
+    blocks are in flight at once so memory stays bounded.
+    """
+    n = normalized.shape[0]
+    starts = list(range(0, n, block_size))
+
+    if workers <= 1:
+        for start in starts:
+            end = min(start + block_size, n)
+            rows, cols = _block_edges(normalized, start, end, similarity_threshold)
+            yield end, rows, cols
+        return
+
+    max_in_flight = workers * 2
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = []
+        next_idx = 0
+
+        while next_idx < len(starts) or pending:
+            while next_idx < len(starts) and len(pending) < max_in_flight:
+                start = starts[next_idx]
+                end = min(start + block_size, n)
+                future = executor.submit(_block_edges, normalized, start, end, similarity_threshold)
+                pending.append((end, future))
+                next_idx += 1
+
+            end, future = pending.pop(0)
+            rows, cols = future.result()
+            yield end, rows, cols
+
+
+def _merge_components(
+    labels: np.ndarray,
+    rows: np.ndarray,
+    cols: np.ndarray
+) -> np.ndarray:
+    """
+    Fold new edges into an existing component labelling.
+
+    labels[i] is the representative node (lowest index) of i's component.
+    Each node is linked to its representative, the new edges are added, and
+    a sparse connected-components pass produces the merged labelling. Only
+    O(n + edges) memory is used.
+    """
+    n = labels.shape[0]
+    nodes = np.arange(n, dtype=np.int64)
+
+    graph = coo_matrix(
+        (
+            np.ones(n + len(rows), dtype=np.int8),
+            (np.concatenate([nodes, rows]), np.concatenate([labels, cols]))
+        ),
+        shape=(n, n)
+    )
+    _, component = connected_components(graph, directed=False)
+
+    # Map component ids back to representative node indices
+    _, first_node = np.unique(component, return_index=True)
+    return first_node[component].astype(np.int64)
+
+
+def group_similar_embeddings(
+    embeddings: np.ndarray,
+    similarity_threshold: float = 0.85,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+    workers: int = 1,
+    verbose: bool = True
+) -> List[List[int]]:
+    """
+    Group rows of an embedding matrix into connected components of similarity.
+
+    Two rows are connected when their cosine similarity is >= threshold; a
+    group is a connected component of that graph (transitive closure), which
+    is exactly what the original DFS produced.
+
+    Args:
+        embeddings: (n, d) embedding matrix
+        similarity_threshold: Minimum cosine similarity to connect two rows
+        block_size: Rows per similarity block (bounds peak memory)
+        workers: Threads used to compute similarity blocks
+        verbose: Print progress indicators
+
+    Returns:
+        Groups with more than one member, each a sorted list of row indices,
+        ordered by their smallest index
+    """
+    n = embeddings.shape[0]
+    if n == 0:
+        return []
+
+    block_size = max(1, block_size)
+    normalized = normalize_embeddings(embeddings)
+
+    if verbose:
+        peak_mb = (min(block_size, n) * n * 12) / (1024 * 1024)  # float64 product + float32 copy
+        print(f"  Blocked similarity search: {n:,} events, block size {block_size:,}, "
+              f"{workers} worker(s), ~{peak_mb:.1f} MB per block")
+
+    labels = np.arange(n, dtype=np.int64)
+    total_edges = 0
+    pending_rows: List[np.ndarray] = []
+    pending_cols: List[np.ndarray] = []
+    pending_count = 0
+    start_time = time.time()
+    progress_every = max(1, (n // block_size) // 10)
+    blocks_done = 0
+
+    for block_end, rows, cols in iter_similar_pairs(normalized, similarity_threshold, block_size, workers):
+        blocks_done += 1
+        if len(rows):
+            pending_rows.append(rows)
+            pending_cols.append(cols)
+            pending_count += len(rows)
+            total_edges += len(rows)
+
+        # Merge accumulated edges once they are worth an O(n) pass
+        if pending_count >= n:
+            labels = _merge_components(labels, np.concatenate(pending_rows), np.concatenate(pending_cols))
+            pending_rows, pending_cols, pending_count = [], [], 0
+
+        if verbose and blocks_done % progress_every == 0 and block_end < n:
+            elapsed = time.time() - start_time
+            print(f"    Similarity blocks: {block_end:,}/{n:,} rows ({block_end / n * 100:.1f}%), "
+                  f"{total_edges:,} similar pairs, {elapsed:.1f}s")
+
+    if pending_count:
+        labels = _merge_components(labels, np.concatenate(pending_rows), np.concatenate(pending_cols))
+
+    del normalized
+
+    # Collect components with more than one member
+    order = np.argsort(labels, kind='stable')
+    sorted_labels = labels[order]
+    boundaries = np.flatnonzero(np.diff(sorted_labels)) + 1
+    groups = [g.tolist() for g in np.split(order, boundaries) if len(g) > 1]
+    groups.sort(key=lambda g: g[0])
+
+    if verbose:
+        elapsed = time.time() - start_time
+        print(f"  Found {len(groups):,} groups from {total_edges:,} similar pairs in {elapsed:.1f}s")
+
+    return groups
+
+
+def find_best_matches(
+    query_embeddings: np.ndarray,
+    reference_embeddings: np.ndarray,
+    similarity_threshold: float,
+    block_size: int = DEFAULT_BLOCK_SIZE
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    For each query row, find its most similar reference row.
+
+    Cost is O(queries x references), computed in blocks of query rows.
+
+    Args:
+        query_embeddings: (q, d) embedding matrix
+        reference_embeddings: (r, d) embedding matrix
+        similarity_threshold: Minimum cosine similarity for a match
+        block_size: Query rows per block
+
+    Returns:
+        (best_index, best_similarity) arrays of length q; best_index is -1
+        where no reference row reaches the threshold
+    """
+    q = query_embeddings.shape[0]
+    best_index = np.full(q, -1, dtype=np.int64)
+    best_similarity = np.zeros(q, dtype=np.float32)
+
+    if q == 0 or reference_embeddings.shape[0] == 0:
+        return best_index, best_similarity
+
+    queries = normalize_embeddings(query_embeddings)
+    references = normalize_embeddings(reference_embeddings)
+    block_size = max(1, block_size)
+
+    for start in range(0, q, block_size):
+        end = min(start + block_size, q)
+        sims = (queries[start:end] @ references.T).astype(np.float32)
+        idx = np.argmax(sims, axis=1)
+        best = sims[np.arange(end - start), idx]
+
+        best_index[start:end] = np.where(best >= similarity_threshold, idx, -1)
+        best_similarity[start:end] = best
+
+    return best_index, best_similarity
@@ -42,6 +42,7 @@ from shared.models.models import (
     EventStatus
 )
 from shared.utils.utils import Config, gai, fetch_gai_content
+from shared.utils.llm_cache import add_llm_cache_args, apply_llm_cache_args
 from shared.utils.prompts import event_summary_prompt
 
 
@@ -456,7 +457,10 @@ def main():
         help='Minimum documents per event (default: 2)'
     )
 
+    add_llm_cache_args(parser)
+
     args = parser.parse_args()
+    apply_llm_cache_args(args)
 
     # Parse dates
     try:
@@ -57,6 +57,7 @@ from sqlalchemy import text
 
 from shared.database.database import get_session
 from shared.utils.utils import gai
+from shared.utils.llm_cache import add_llm_cache_args, apply_llm_cache_args
 
 
 def load_config(config_path: str = 'shared/config/config.yaml') -> dict:
@@ -567,7 +568,10 @@ def main():
     parser.add_argument('--resume', action='store_true', help='Resume from last checkpoint (skip already-validated groups)')
     parser.add_argument('--batch-size', type=int, default=10, help='Commit every N groups (default: 10, for checkpointing)')
 
+    add_llm_cache_args(parser)
+
     args = parser.parse_args()
+    apply_llm_cache_args(args)
 
     # Get countries to process
     if args.influencers:
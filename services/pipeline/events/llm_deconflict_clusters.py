@@ -31,6 +31,12 @@ Usage:
     # Custom checkpoint frequency for more frequent commits
     python llm_deconflict_clusters.py --country China --checkpoint-frequency 5
 
+    # Review up to 8 clusters concurrently (LLM calls are rate limited by gai())
+    python llm_deconflict_clusters.py --influencers --start-date 2024-08-01 --end-date 2024-08-31 --llm-workers 8
+
+    # Pack small clusters (<= 8 unique names) into shared prompts of ~2000 tokens
+    python llm_deconflict_clusters.py --country China --pack-token-budget 2000
+
     # Dry run (no database writes)
     python llm_deconflict_clusters.py --country China --date 2024-08-01 --dry-run
 
@@ -38,20 +44,143 @@ Checkpoint/Resume:
     The script automatically resumes from where it left off by only processing clusters where
     llm_deconflicted=False. Progress is committed every --checkpoint-frequency clusters (default: 10)
     within each batch. If interrupted, simply re-run the same command to continue.
+    With --llm-workers N, reviews run concurrently but results are written and committed
+    by a single writer, so the same checkpoint semantics apply.
 """
 
 import argparse
 import json
+import uuid
 import yaml
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, date
 from typing import List, Dict, Any, Optional
-from collections import defaultdict
+from collections import Counter, defaultdict
+from types import SimpleNamespace
 from sqlalchemy import text
+from sqlalchemy.orm import defer
 
 from shared.database.database import get_session
 from shared.models.models import EventCluster, CanonicalEvent, DailyEventMention, RawEvent
 from shared.utils.utils import gai
-from sentence_transformers import SentenceTransformer
+from shared.utils.llm_cache import add_llm_cache_args, apply_llm_cache_args
+from shared.utils.embedding_cache import CachedEncoder
+
+
+REVIEW_SYS_PROMPT = """You are an expert at tracking events across their lifecycle in news coverage.
+
+**CRITICAL UNDERSTANDING:**
+Events evolve through stages over time. Your task is to group event names that refer to the SAME underlying event, EVEN IF they are at different stages.
+
+**Event Lifecycle Stages:**
+- ANNOUNCEMENT: "China announces Belt and Road Forum"
+- PREPARATION: "China preparing for Belt and Road Forum"
+- EXECUTION: "Belt and Road Forum begins in Beijing"
+- CONTINUATION: "Belt and Road Forum continues with trade deals"
+- AFTERMATH: "Belt and Road Forum concludes with 50 agreements"
+
+**Your Task:**
+Analyze the following list of event names that were clustered together. Identify which event names refer to the SAME underlying event across different stages, and which are DISTINCT events.
+
+**Context:**
+- These events all occurred on the same date
+- They are all initiated by the same country
+- The clustering algorithm grouped them based on semantic similarity
+- The algorithm often groups topically related but DISTINCT events together
+
+**Examples:**
+
+✅ SAME EVENT - Group Together (same event at different stages):
+- "China announces South-South Cooperation Forum"
+- "Preparations underway for South-South Cooperation Forum"
+- "South-South Cooperation Forum opens in Beijing"
+- "South-South Cooperation Forum concludes with cooperation agreements"
+→ All refer to same forum at different lifecycle stages
+
+✅ SAME EVENT - Group Together (same event, different wording):
+- "President Xi visits Egypt for bilateral talks"
+- "Xi Jinping state visit to Egypt"
+- "China-Egypt summit during Xi's Cairo visit"
+→ All refer to same visit
+
+✅ SAME EVENT - Group Together (same event, different aspects):
+- "Beijing Declaration", "Beijing Agreement", "Beijing Summit Agreement"
+→ All refer to same agreement
+- "Arbaeen Pilgrimage", "Arbaeen Pilgrimage Support", "Arbaeen Healthcare Services"
+→ All aspects of same pilgrimage event
+
+❌ DIFFERENT EVENTS - Keep Separate (different instances):
+- "First China-Arab States Cooperation Forum"
+- "Second China-Arab States Cooperation Forum"
+→ Different instances of the same type of event
+
+❌ DIFFERENT EVENTS - Keep Separate (different topics with same partner):
+- "China signs trade deal with Egypt"
+- "China signs defense cooperation with Egypt"
+→ Different agreements, even with same country
+
+❌ DIFFERENT EVENTS - Keep Separate (same type, different partners):
+- "China signs trade deal with Egypt"
+- "China signs trade deal with UAE"
+→ Different countries = different events
+
+❌ DIFFERENT EVENTS - Keep Separate (topically related but distinct):
+- "Belt and Road Initiative", "Beijing Declaration", "25-year Cooperation Plan"
+→ Three separate diplomatic initiatives
+- "Humanitarian Aid to Gaza", "Ceasefire Negotiations", "UN Security Council Meeting"
+→ Related to same conflict but three distinct events
+
+**Your Goal:**
+- Group event names that refer to the SAME core event (even at different stages)
+- Keep DISTINCT events in separate groups
+- Err on the side of grouping if it's the same core event evolving over time"""
+
+# Appended to REVIEW_SYS_PROMPT when several clusters share one request
+PACKED_REVIEW_INSTRUCTIONS = """
+
+**MULTIPLE CLUSTERS:**
+You will receive several independent clusters in one request. Review each cluster
+on its own - never group names across clusters. Numbering restarts at 1 in every cluster."""
+
+
+def parse_llm_json(response: Any) -> Any:
+    """Parse a gai() response into JSON (handles markdown fences and surrounding text)."""
+    if not isinstance(response, str):
+        return response
+
+    import re
+    json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', response, re.DOTALL)
+    if json_match:
+        return json.loads(json_match.group(1))
+
+    # Try to find any JSON object in the response
+    json_match = re.search(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', response, re.DOTALL)
+    if json_match:
+        return json.loads(json_match.group(0))
+    return json.loads(response)
+
+
+def unique_event_names(cluster) -> List[str]:
+    """
+    A cluster's distinct event names in a fixed (sorted) order.
+
+    Prompts number the names in this order and LLM groups refer back to those
+    numbers, so every step must use the same order; set() order changes
+    between processes, which would also change the LLM cache key.
+    """
+    return sorted(set(cluster.event_names))
+
+
+def valid_groups(groups: Any, num_names: int) -> bool:
+    """True if groups is a partition of 1..num_names (each number exactly once)."""
+    if not isinstance(groups, list) or not groups:
+        return False
+    flat = []
+    for group in groups:
+        if not isinstance(group, list) or not group:
+            return False
+        flat.extend(group)
+    return all(isinstance(i, int) and not isinstance(i, bool) for i in flat) and sorted(flat) == list(range(1, num_names + 1))
 
 
 class LLMClusterDeconfliction:
@@ -59,18 +188,37 @@ class LLMClusterDeconfliction:
     Handles LLM-based deconfliction of event clusters.
     """
 
-    def __init__(self, dry_run: bool = False, verbose: bool = True):
+    def __init__(
+        self,
+        dry_run: bool = False,
+        verbose: bool = True,
+        llm_workers: int = 1,
+        pack_token_budget: int = 0,
+        pack_max_names: int = 8
+    ):
         self.dry_run = dry_run
         self.verbose = verbose
-        # Initialize embedding model for canonical events
+        # Concurrent LLM reviews per batch (DB writes stay on the calling thread)
+        self.llm_workers = llm_workers
+        # Packed prompts: small clusters share one request up to this many prompt tokens (0 = off)
+        self.pack_token_budget = pack_token_budget
+        self.pack_max_names = pack_max_names
+
+        # Per-session lookup indexes used by create_canonical_events_from_cluster;
+        # they hold ORM objects, so they are rebuilt whenever the session changes
+        self._index_session = None
+        self._canonical_index: Dict[str, Dict[str, List[CanonicalEvent]]] = {}  # country -> name -> events
+        self._mention_index: Dict[tuple, Dict[Any, DailyEventMention]] = {}  # (country, date) -> event id -> mention
+        self._doc_attributes: Dict[str, tuple] = {}  # doc_id -> (recipients, categories)
+        # Embedding encoder for canonical events (shared name -> embedding cache)
         self.embedding_model = None
 
     def get_embedding_model(self):
-        """Lazy load embedding model."""
+        """Lazy load the cached embedding encoder."""
         if self.embedding_model is None:
             if self.verbose:
-                print("  Loading sentence transformer model...")
-            self.embedding_model = SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
+                print("  Loading embedding encoder (with shared cache)...")
+            self.embedding_model = CachedEncoder.from_config('sentence-transformers/all-MiniLM-L6-v2')
         return self.embedding_model
 
     def load_config(self, config_path: str = 'shared/config/config.yaml') -> dict:
@@ -160,6 +308,80 @@ class LLMClusterDeconfliction:
 
         return clusters
 
+    def _bind_indexes(self, session):
+        """
+        Drop the lookup indexes if they were loaded through another session.
+
+        Their objects would be detached from `session` (updates to them are
+        lost) and miss rows written since by other processes or Stage 2 merges.
+        """
+        if session is not self._index_session:
+            self._index_session = session
+            self._canonical_index = {}
+            self._mention_index = {}
+
+    def get_canonical_index(self, session, country: str) -> Dict[str, List[CanonicalEvent]]:
+        """
+        Canonical events for a country keyed by canonical_name, loaded once per session.
+
+        Events created during the run are added by create_canonical_events_from_cluster.
+        """
+        self._bind_indexes(session)
+        if country not in self._canonical_index:
+            events = session.query(CanonicalEvent).options(
+                defer(CanonicalEvent.embedding_vector),
+                defer(CanonicalEvent.consolidated_description),
+                defer(CanonicalEvent.key_facts),
+                defer(CanonicalEvent.material_justification)
+            ).filter(CanonicalEvent.initiating_country == country).all()
+
+            index = defaultdict(list)
+            for event in events:
+                index[event.canonical_name].append(event)
+            self._canonical_index[country] = index
+
+            if self.verbose:
+                print(f"  Indexed {len(events)} canonical events for {country}")
+
+        return self._canonical_index[country]
+
+    def get_mention_index(self, session, country: str, target_date: date) -> Dict[Any, DailyEventMention]:
+        """Daily mentions for (country, date) keyed by canonical_event_id, loaded once per session."""
+        self._bind_indexes(session)
+        key = (country, target_date)
+        if key not in self._mention_index:
+            mentions = session.query(DailyEventMention).filter(
+                DailyEventMention.initiating_country == country,
+                DailyEventMention.mention_date == target_date
+            ).all()
+            self._mention_index[key] = {mention.canonical_event_id: mention for mention in mentions}
+        return self._mention_index[key]
+
+    def prefetch_doc_attributes(self, session, doc_ids: List[str]):
+        """Load recipient countries and categories for any doc_ids not already cached (two queries)."""
+        missing = list({doc_id for doc_id in doc_ids if doc_id not in self._doc_attributes})
+        if not missing:
+            return
+
+        recipients = defaultdict(list)
+        for doc_id, recipient in session.execute(text("""
+            SELECT rc.doc_id, rc.recipient_country
+            FROM recipient_countries rc
+            WHERE rc.doc_id = ANY(:doc_ids)
+        """), {"doc_ids": missing}):
+            recipients[doc_id].append(recipient)
+
+        categories = defaultdict(list)
+        for doc_id, category in session.execute(text("""
+            SELECT c.doc_id, c.category
+            FROM categories c
+            WHERE c.doc_id = ANY(:doc_ids)
+        """), {"doc_ids": missing}):
+            categories[doc_id].append(category)
+
+        for doc_id in missing:
+            self._doc_attributes[doc_id] = (recipients.get(doc_id, []), categories.get(doc_id, []))
+
     def needs_llm_review(self, cluster: EventCluster) -> bool:
         """
         Determine if a cluster needs LLM review.
@@ -180,7 +402,7 @@ class LLMClusterDeconfliction:
             return False
 
         # Get unique event names
-        unique_names = list(set(cluster.event_names))
+        unique_names = unique_event_names(cluster)
 
         # Skip if all same name (definitely one event)
         if len(unique_names) == 1:
@@ -206,78 +428,12 @@ class LLMClusterDeconfliction:
                 - groups: List[List[int]] (if split, indices of event names grouped together)
                 - refined_cluster_ids: List[int] (new cluster IDs if split)
         """
-        unique_names = list(set(cluster.event_names))
+        unique_names = unique_event_names(cluster)
 
         # Build prompt with numbered list of unique event names
         names_list = "\n".join([f"{i+1}. {name}" for i, name in enumerate(unique_names)])
 
-        sys_prompt = """You are an expert at tracking events across their lifecycle in news coverage.
-
-**CRITICAL UNDERSTANDING:**
-Events evolve through stages over time. Your task is to group event names that refer to the SAME underlying event, EVEN IF they are at different stages.
-
-**Event Lifecycle Stages:**
-- ANNOUNCEMENT: "China announces Belt and Road Forum"
-- PREPARATION: "China preparing for Belt and Road Forum"
-- EXECUTION: "Belt and Road Forum begins in Beijing"
-- CONTINUATION: "Belt and Road Forum continues with trade deals"
-- AFTERMATH: "Belt and Road Forum concludes with 50 agreements"
-
-**Your Task:**
-Analyze the following list of event names that were clustered together. Identify which event names refer to the SAME underlying event across different stages, and which are DISTINCT events.
-
-**Context:**
-- These events all occurred on the same date
-- They are all initiated by the same country
-- The clustering algorithm grouped them based on semantic similarity
-- The algorithm often groups topically related but DISTINCT events together
-
-**Examples:**
-
-✅ SAME EVENT - Group Together (same event at different stages):
-- "China announces South-South Cooperation Forum"
-- "Preparations underway for South-South Cooperation Forum"
-- "South-South Cooperation Forum opens in Beijing"
-- "South-South Cooperation Forum concludes with cooperation agreements"
-→ All refer to same forum at different lifecycle stages
-
-✅ SAME EVENT - Group Together (same event, different wording):
-- "President Xi visits Egypt for bilateral talks"
-- "Xi Jinping state visit to Egypt"
-- "China-Egypt summit during Xi's Cairo visit"
-→ All refer to same visit
-
-✅ SAME EVENT - Group Together (same event, different aspects):
-- "Beijing Declaration", "Beijing Agreement", "Beijing Summit Agreement"
-→ All refer to same agreement
-- "Arbaeen Pilgrimage", "Arbaeen Pilgrimage Support", "Arbaeen Healthcare Services"
-→ All aspects of same pilgrimage event
-
-❌ DIFFERENT EVENTS - Keep Separate (different instances):
-- "First China-Arab States Cooperation Forum"
-- "Second China-Arab States Cooperation Forum"
-→ Different instances of the same type of event
-
-❌ DIFFERENT EVENTS - Keep Separate (different topics with same partner):
-- "China signs trade deal with Egypt"
-- "China signs defense cooperation with Egypt"
-→ Different agreements, even with same country
-
-❌ DIFFERENT EVENTS - Keep Separate (same type, different partners):
-- "China signs trade deal with Egypt"
-- "China signs trade deal with UAE"
-→ Different countries = different events
-
-❌ DIFFERENT EVENTS - Keep Separate (topically related but distinct):
-- "Belt and Road Initiative", "Beijing Declaration", "25-year Cooperation Plan"
-→ Three separate diplomatic initiatives
-- "Humanitarian Aid to Gaza", "Ceasefire Negotiations", "UN Security Council Meeting"
-→ Related to same conflict but three distinct events
-
-**Your Goal:**
-- Group event names that refer to the SAME core event (even at different stages)
-- Keep DISTINCT events in separate groups
-- Err on the side of grouping if it's the same core event evolving over time"""
+        sys_prompt = REVIEW_SYS_PROMPT
 
         user_prompt = f"""Event names from cluster (cluster_id={cluster.cluster_id}, size={cluster.cluster_size}):
 {names_list}
@@ -340,19 +496,7 @@ For each potential group, verify:
             response = gai(sys_prompt, user_prompt, model="gpt-4o-mini")
 
             # Parse JSON response (handle both dict and string)
-            if isinstance(response, str):
-                # Try to extract JSON from markdown code blocks if present
-                import re
-                json_match = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', response, re.DOTALL)
-                if json_match:
-                    response = json.loads(json_match.group(1))
-                else:
-                    # Try to find any JSON object in the response
-                    json_match = re.search(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', response, re.DOTALL)
-                    if json_match:
-                        response = json.loads(json_match.group(0))
-                    else:
-                        response = json.loads(response)
+            response = parse_llm_json(response)
 
             # Validate response structure
             if 'same_event' not in response or 'groups' not in response:
@@ -385,6 +529,125 @@ For each potential group, verify:
                 'refined_cluster_ids': [cluster.cluster_id]
             }
 
+    def pack_clusters(self, clusters: List[Any]) -> List[List[Any]]:
+        """
+        Split clusters into review units for packed prompts.
+
+        Clusters with at most pack_max_names unique names are packed together
+        until the estimated prompt size reaches pack_token_budget (~4 chars per
+        token); larger clusters get their own unit.
+
+        Returns:
+            List of units (each a list of clusters)
+        """
+        if self.pack_token_budget <= 0:
+            return [[cluster] for cluster in clusters]
+
+        units = []
+        pack = []
+        pack_tokens = 0
+        for cluster in clusters:
+            unique_names = set(cluster.event_names)
+            if len(unique_names) > self.pack_max_names:
+                units.append([cluster])
+                continue
+
+            # Names plus numbering and a per-cluster header
+            tokens = sum(len(name) for name in unique_names) // 4 + 4 * len(unique_names) + 20
+            if pack and pack_tokens + tokens > self.pack_token_budget:
+                units.append(pack)
+                pack = []
+                pack_tokens = 0
+            pack.append(cluster)
+            pack_tokens += tokens
+
+        if pack:
+            units.append(pack)
+        return units
+
+    def llm_review_packed(self, clusters: List[Any]) -> List[Dict[str, Any]]:
+        """
+        Review several small clusters with one LLM request.
+
+        Each cluster's groups are validated (every name number exactly once);
+        clusters missing from the response or with invalid groups, and the whole
+        pack if the request fails, fall back to llm_review_cluster().
+
+        Args:
+            clusters: Clusters (or snapshots) to review together
+
+        Returns:
+            One result dict per cluster, in input order (same shape as llm_review_cluster)
+        """
+        if len(clusters) == 1:
+            return [self.llm_review_cluster(clusters[0])]
+
+        names_by_key = {}
+        sections = []
+        for idx, cluster in enumerate(clusters, 1):
+            key = f"C{idx}"
+            unique_names = unique_event_names(cluster)
+            names_by_key[key] = unique_names
+            names_list = "\n".join([f"{i+1}. {name}" for i, name in enumerate(unique_names)])
+            sections.append(f"### Cluster {key} ({len(unique_names)} names)\n{names_list}")
+
+        user_prompt = f"""Review each of the following {len(clusters)} clusters independently.
+For every cluster, group the numbered event names that refer to the SAME underlying event
+(even at different lifecycle stages) and keep distinct events in separate groups.
+
+{chr(10).join(sections)}
+
+**OUTPUT (JSON format):**
+{{
+    "clusters": [
+        {{"cluster": "C1", "reasoning": "1-2 sentences", "same_event": true/false, "groups": [[1,2],[3]], "confidence": 0.9}},
+        ...
+    ]
+}}
+
+**IMPORTANT:**
+- Return exactly one entry per cluster key ({', '.join(names_by_key)})
+- Within each cluster, every number from 1 to that cluster's name count must appear in exactly one group"""
+
+        try:
+            if self.verbose:
+                print(f"    Sending {len(clusters)} packed clusters to LLM for review...")
+            response = parse_llm_json(gai(REVIEW_SYS_PROMPT + PACKED_REVIEW_INSTRUCTIONS, user_prompt, model="gpt-4o-mini"))
+            entries = {
+                str(entry.get('cluster')): entry
+                for entry in response.get('clusters', [])
+                if isinstance(entry, dict)
+            }
+        except Exception as e:
+            if self.verbose:
+                print(f"    Warning: Packed LLM review failed: {e}. Falling back to single-cluster review.")
+            entries = {}
+
+        results = []
+        for idx, cluster in enumerate(clusters, 1):
+            key = f"C{idx}"
+            entry = entries.get(key)
+            num_names = len(names_by_key[key])
+
+            if entry is None or 'same_event' not in entry or not valid_groups(entry.get('groups'), num_names):
+                if self.verbose and entries:
+                    print(f"    Cluster {cluster.cluster_id}: invalid packed result, reviewing on its own")
+                results.append(self.llm_review_cluster(cluster))
+                continue
+
+            result = {
+                'same_event': bool(entry['same_event']),
+                'explanation': entry.get('reasoning', ''),
+                'groups': entry['groups'],
+                'refined_cluster_ids': []
+            }
+            if not result['same_event'] and len(result['groups']) > 1:
+                result['refined_cluster_ids'] = [cluster.cluster_id] + \
+                    [cluster.cluster_id + 1000 + i for i in range(len(result['groups']) - 1)]
+            results.append(result)
+
+        return results
+
     def save_deconfliction_result(
         self,
         session,
@@ -404,7 +667,7 @@ For each potential group, verify:
             llm_result: Dict returned from llm_review_cluster()
         """
         # Build refined_clusters JSONB
-        unique_names = list(set(cluster.event_names))
+        unique_names = unique_event_names(cluster)
 
         refined_data = {
             'same_event': llm_result['same_event'],
@@ -455,9 +718,14 @@ For each potential group, verify:
             llm_result = cluster.refined_clusters
 
         # Get unique event names
-        unique_names = list(set(cluster.event_names))
+        unique_names = unique_event_names(cluster)
         groups = llm_result.get('groups', [[i+1 for i in range(len(unique_names))]])
 
+        # In-memory lookups: no per-group queries; new rows are written at the next flush/commit
+        canonical_index = self.get_canonical_index(session, cluster.initiating_country)
+        mention_index = self.get_mention_index(session, cluster.initiating_country, cluster.cluster_date)
+        self.prefetch_doc_attributes(session, cluster.doc_ids)
+
         # Create mapping of event name to doc_ids
         name_to_docs = defaultdict(list)
         for event_name, doc_id in zip(cluster.event_names, cluster.doc_ids):
@@ -481,41 +749,28 @@ For each potential group, verify:
             # Remove duplicates while preserving order
             group_doc_ids = list(dict.fromkeys(group_doc_ids))
 
-            # Query recipient countries and categories from these documents
-            from sqlalchemy import text
-
-            # Get recipient countries with counts
-            recipients_query = session.execute(text("""
-                SELECT rc.recipient_country, COUNT(*) as count
-                FROM recipient_countries rc
-                WHERE rc.doc_id = ANY(:doc_ids)
-                GROUP BY rc.recipient_country
-            """), {"doc_ids": group_doc_ids}).fetchall()
-            primary_recipients = {row[0]: row[1] for row in recipients_query}
-
-            # Get categories with counts
-            categories_query = session.execute(text("""
-                SELECT c.category, COUNT(*) as count
-                FROM categories c
-                WHERE c.doc_id = ANY(:doc_ids)
-                GROUP BY c.category
-            """), {"doc_ids": group_doc_ids}).fetchall()
-            primary_categories = {row[0]: row[1] for row in categories_query}
+            # Recipient countries and categories with counts (from the prefetched doc map)
+            primary_recipients = Counter()
+            primary_categories = Counter()
+            for doc_id in group_doc_ids:
+                doc_recipients, doc_categories = self._doc_attributes.get(doc_id, ([], []))
+                primary_recipients.update(doc_recipients)
+                primary_categories.update(doc_categories)
+            primary_recipients = dict(primary_recipients)
+            primary_categories = dict(primary_categories)
 
             # Choose canonical name (most frequent or first)
             canonical_name = max(group_names, key=group_names.count)
 
             # Generate embedding for canonical name
             model = self.get_embedding_model()
-            embedding = model.encode(canonical_name).tolist()
+            embedding = model.encode([canonical_name])[0].tolist()
 
-            # Check if canonical event already exists
-            existing_event = session.query(CanonicalEvent).filter(
-                CanonicalEvent.canonical_name == canonical_name,
-                CanonicalEvent.initiating_country == cluster.initiating_country,
-                CanonicalEvent.first_mention_date <= cluster.cluster_date,
-                CanonicalEvent.last_mention_date >= cluster.cluster_date
-            ).first()
+            # Check if canonical event already exists (same name, date within its span)
+            existing_event = next((
+                event for event in canonical_index.get(canonical_name, [])
+                if event.first_mention_date <= cluster.cluster_date <= event.last_mention_date
+            ), None)
 
             if existing_event:
                 # Update existing canonical event
@@ -535,6 +790,7 @@ For each potential group, verify:
             else:
                 # Create new canonical event
                 canonical_event = CanonicalEvent(
+                    id=uuid.uuid4(),  # Assigned here so no flush is needed before the mention
                     canonical_name=canonical_name,
                     initiating_country=cluster.initiating_country,
                     first_mention_date=cluster.cluster_date,
@@ -553,7 +809,7 @@ For each potential group, verify:
                     primary_recipients=primary_recipients
                 )
                 session.add(canonical_event)
-                session.flush()  # Get the ID
+                canonical_index[canonical_name].append(canonical_event)
 
                 if self.verbose:
                     safe_name = canonical_name.encode('ascii', 'replace').decode('ascii')
@@ -562,10 +818,7 @@ For each potential group, verify:
             canonical_events.append(canonical_event)
 
             # Create or update DailyEventMention
-            existing_mention = session.query(DailyEventMention).filter(
-                DailyEventMention.canonical_event_id == canonical_event.id,
-                DailyEventMention.mention_date == cluster.cluster_date
-            ).first()
+            existing_mention = mention_index.get(canonical_event.id)
 
             if existing_mention:
                 # Update existing mention
@@ -592,6 +845,7 @@ For each potential group, verify:
                     doc_ids=group_doc_ids
                 )
                 session.add(daily_mention)
+                mention_index[canonical_event.id] = daily_mention
 
                 if self.verbose:
                     print(f"        Created daily mention: {len(group_doc_ids)} articles on {cluster.cluster_date}")
@@ -609,6 +863,14 @@ For each potential group, verify:
         """
         Process all clusters in a batch with LLM deconfliction.
 
+        Producer/consumer: clusters that need review are queued to a pool of
+        self.llm_workers LLM threads; this thread is the only DB writer and
+        applies each result as it completes (save_deconfliction_result +
+        create_canonical_events_from_cluster), committing every
+        checkpoint_frequency clusters. A cluster is only marked
+        llm_deconflicted in the transaction that writes its result, so an
+        interrupted run resumes with the clusters whose results were lost.
+
         Args:
             session: Database session
             country: Initiating country
@@ -647,9 +909,37 @@ For each potential group, verify:
         if self.verbose:
             print(f"  Processing {len(clusters)} clusters in batch {batch_number}...")
 
-        clusters_since_commit = 0
+        # Recipients/categories for every doc in the batch in two queries
+        if not self.dry_run:
+            self._doc_attributes = {}
+            self.prefetch_doc_attributes(session, [doc_id for cluster in clusters for doc_id in cluster.doc_ids])
+
+        progress = {'done': 0, 'since_commit': 0}
 
-        for i, cluster in enumerate(clusters, 1):
+        def apply_result(cluster: EventCluster, llm_result: Optional[Dict[str, Any]]):
+            """Writer side: persist one cluster's result and checkpoint."""
+            # Create canonical events from deconflicted cluster (unless dry run)
+            if not self.dry_run and llm_result is not None:
+                canonical_events = self.create_canonical_events_from_cluster(session, cluster, llm_result)
+                for ce in canonical_events:
+                    if ce.total_mention_days == 1:
+                        stats['canonical_events_created'] += 1
+                    else:
+                        stats['canonical_events_updated'] += 1
+                    stats['daily_mentions_created'] += 1
+
+            progress['done'] += 1
+            progress['since_commit'] += 1
+
+            # Periodic checkpoint commits for long batches
+            if not self.dry_run and progress['since_commit'] >= checkpoint_frequency:
+                session.commit()
+                if self.verbose:
+                    print(f"  [CHECKPOINT] Committed progress ({progress['done']}/{len(clusters)} clusters in batch {batch_number})")
+                progress['since_commit'] = 0
+
+        to_review = []
+        for cluster in clusters:
             llm_result = None
 
             # Check if LLM review is needed
@@ -667,47 +957,57 @@ For each potential group, verify:
                         'groups': [[i+1 for i in range(len(set(cluster.event_names)))]],
                         'refined_cluster_ids': [cluster.cluster_id],
                         'reviewed_at': datetime.utcnow().isoformat(),
-                        'unique_names_list': list(set(cluster.event_names))
+                        'unique_names_list': unique_event_names(cluster)
                     }
                     cluster.refined_clusters = llm_result
                     cluster.llm_deconflicted = True
                 stats['skipped'] += 1
-
+                apply_result(cluster, llm_result)
             else:
-                # Perform LLM review
-                llm_result = self.llm_review_cluster(cluster)
-                stats['reviewed'] += 1
-
-                if llm_result['same_event']:
-                    stats['confirmed'] += 1
-                else:
-                    stats['split'] += 1
-
-                # Save result (unless dry run)
-                if not self.dry_run:
-                    self.save_deconfliction_result(session, cluster, llm_result)
-
-            # Create canonical events from deconflicted cluster (unless dry run)
-            if not self.dry_run and llm_result is not None:
-                canonical_events = self.create_canonical_events_from_cluster(session, cluster, llm_result)
-                for ce in canonical_events:
-                    if ce.total_mention_days == 1:
-                        stats['canonical_events_created'] += 1
-                    else:
-                        stats['canonical_events_updated'] += 1
-                    stats['daily_mentions_created'] += 1
-
-            clusters_since_commit += 1
-
-            # Periodic checkpoint commits for long batches
-            if not self.dry_run and clusters_since_commit >= checkpoint_frequency:
-                session.commit()
-                if self.verbose:
-                    print(f"  [CHECKPOINT] Committed progress ({i}/{len(clusters)} clusters in batch {batch_number})")
-                clusters_since_commit = 0
+                to_review.append(cluster)
+
+        if to_review:
+            # LLM threads get plain snapshots: the session and its ORM objects are not
+            # thread-safe, and this thread keeps writing and committing through them
+            # while reviews run (a rollback would also expire every instance and make
+            # the next attribute access load from a worker thread)
+            snapshots = [
+                SimpleNamespace(
+                    cluster_id=cluster.cluster_id,
+                    cluster_size=cluster.cluster_size,
+                    event_names=list(cluster.event_names)
+                )
+                for cluster in to_review
+            ]
+
+            cluster_by_snapshot = {id(snapshot): cluster for snapshot, cluster in zip(snapshots, to_review)}
+            units = self.pack_clusters(snapshots)
+            if self.verbose and len(units) < len(snapshots):
+                print(f"    Packed {len(snapshots)} clusters into {len(units)} LLM requests")
+
+            with ThreadPoolExecutor(max_workers=max(1, self.llm_workers)) as executor:
+                futures = {executor.submit(self.llm_review_packed, unit): unit for unit in units}
+
+                for future in as_completed(futures):
+                    unit = futures[future]
+                    for snapshot, llm_result in zip(unit, future.result()):
+                        cluster = cluster_by_snapshot[id(snapshot)]
+                        stats['reviewed'] += 1
+
+                        if llm_result['same_event']:
+                            stats['confirmed'] += 1
+                        else:
+                            stats['split'] += 1
+
+                        # Save result (unless dry run)
+                        if not self.dry_run:
+                            self.save_deconfliction_result(session, cluster, llm_result)
+                            apply_result(cluster, llm_result)
+                        else:
+                            apply_result(cluster, None)
 
         # Final commit for any remaining changes (unless dry run)
-        if not self.dry_run and clusters_since_commit > 0:
+        if not self.dry_run and progress['since_commit'] > 0:
             session.commit()
             if self.verbose:
                 print(f"  [OK] Committed final changes for batch {batch_number}")
@@ -822,14 +1122,29 @@ def main():
                        help='Suppress detailed output')
     parser.add_argument('--checkpoint-frequency', type=int, default=10,
                        help='Commit every N clusters within a batch (default: 10, for checkpointing)')
+    parser.add_argument('--llm-workers', type=int, default=1,
+                       help='Concurrent LLM reviews per batch (default: 1); DB writes stay single-threaded')
+    parser.add_argument('--pack-token-budget', type=int, default=0,
+                       help='Pack small clusters into one LLM prompt up to this many tokens (default: 0 = one cluster per prompt)')
+    parser.add_argument('--pack-max-names', type=int, default=8,
+                       help='Only clusters with at most this many unique names are packed (default: 8)')
+
+    add_llm_cache_args(parser)
 
     args = parser.parse_args()
+    apply_llm_cache_args(args)
 
     # Handle verbosity
     verbose = args.verbose and not args.quiet
 
     # Initialize processor
-    processor = LLMClusterDeconfliction(dry_run=args.dry_run, verbose=verbose)
+    processor = LLMClusterDeconfliction(
+        dry_run=args.dry_run,
+        verbose=verbose,
+        llm_workers=args.llm_workers,
+        pack_token_budget=args.pack_token_budget,
+        pack_max_names=args.pack_max_names
+    )
     checkpoint_frequency = args.checkpoint_frequency
 
     # Print header
@@ -13,9 +13,11 @@ WHAT THIS SCRIPT DOES:
   1. For each LLM-validated master event (master_event_id IS NULL AND llm_validated = TRUE)
   2. Find all child events for that master (master_event_id = master.id)
   3. Reassign all daily_event_mentions from children to master
-  4. Handle date conflicts by merging article counts
+  4. Handle date conflicts by merging article counts, doc_ids and source_names
   5. Delete the now-empty child canonical events
 
+  Steps 2-5 run set-based: a few statements per country in one transaction.
+
 IMPORTANT: Only processes validated masters to prevent over-consolidation errors from Stage 2A
 (Children are never individually validated - validation applies to the entire group via the master)
 
@@ -33,6 +35,7 @@ See EVENT_PROCESSING_ARCHITECTURE.md for complete pipeline documentation.
 """
 
 import argparse
+import time
 import yaml
 from typing import Dict
 from sqlalchemy import text
@@ -53,6 +56,17 @@ def load_config(config_path: str = 'shared/config/config.yaml') -> dict:
         return {'influencers': ['China', 'Russia', 'Iran', 'Turkey', 'United States']}
 
 
+# Validated masters and their children for one country
+MERGE_PAIRS_SQL = '''
+    SELECT child.id AS child_id, master.id AS master_id
+    FROM canonical_events master
+    JOIN canonical_events child ON child.master_event_id = master.id
+    WHERE master.initiating_country = :country
+      AND master.master_event_id IS NULL
+      AND master.llm_validated = TRUE
+'''
+
+
 def merge_canonical_events_for_country(
     session,
     country: str,
@@ -62,6 +76,12 @@ def merge_canonical_events_for_country(
     """
     Merge fragmented canonical events into multi-day events for a specific country.
 
+    Set-based: the whole country is merged in a handful of statements inside
+    one transaction. Child mentions are moved out of daily_event_mentions,
+    aggregated per (master_id, mention_date) - summed article_count, unioned
+    doc_ids/source_names - and upserted onto the masters; children are then
+    deleted in bulk.
+
     Args:
         session: Database session
         country: Initiating country
@@ -76,135 +96,148 @@ def merge_canonical_events_for_country(
         print(f"Merging Canonical Events: {country}")
         print('='*80)
 
-    # Get all LLM-validated master events for this country
     # IMPORTANT: Only process masters that have been validated by LLM in Stage 2B
     # This ensures we only merge children of validated consolidations
-    master_events = session.execute(text('''
-        SELECT id, canonical_name
+    master_count = session.execute(text('''
+        SELECT COUNT(*)
         FROM canonical_events
         WHERE initiating_country = :country
           AND master_event_id IS NULL
           AND llm_validated = TRUE
-        ORDER BY canonical_name
-    '''), {'country': country}).fetchall()
+    '''), {'country': country}).scalar()
 
-    if not master_events:
+    if not master_count:
         if verbose:
             print(f"  No master events found for {country}")
         return {'master_events': 0, 'child_events': 0, 'mentions_reassigned': 0, 'events_deleted': 0}
 
     if verbose:
-        print(f"  Found {len(master_events)} master events")
+        print(f"  Found {master_count} master events")
+
+    # One row per master with children: what will be merged
+    plan = session.execute(text(f'''
+        WITH pairs AS ({MERGE_PAIRS_SQL})
+        SELECT
+            master.canonical_name,
+            COUNT(DISTINCT pairs.child_id) AS child_count,
+            COUNT(dem.id) AS mention_count
+        FROM pairs
+        JOIN canonical_events master ON master.id = pairs.master_id
+        LEFT JOIN daily_event_mentions dem ON dem.canonical_event_id = pairs.child_id
+        GROUP BY master.id, master.canonical_name
+        ORDER BY master.canonical_name
+    '''), {'country': country}).fetchall()
 
     stats = {
-        'master_events': len(master_events),
-        'child_events': 0,
-        'mentions_reassigned': 0,
+        'master_events': master_count,
+        'child_events': sum(row.child_count for row in plan),
+        'mentions_reassigned': sum(row.mention_count for row in plan),
         'events_deleted': 0
     }
 
-    # Process each master event
-    for master_id, master_name in master_events:
-        # Find all child events for this validated master
-        # NOTE: We already filtered for validated masters above, so all these children
-        # are part of a validated consolidation and safe to merge
-        child_events = session.execute(text('''
-            SELECT id, canonical_name
-            FROM canonical_events
-            WHERE master_event_id = :master_id
-        '''), {'master_id': master_id}).fetchall()
-
-        if not child_events:
-            continue  # No children for this master
-
-        stats['child_events'] += len(child_events)
-
-        if verbose and len(child_events) > 0:
+    if verbose:
+        for master_name, child_count, mention_count in plan:
             safe_name = master_name.encode('ascii', 'replace').decode('ascii')[:60]
             print(f"\n  Master: {safe_name}")
-            print(f"    Found {len(child_events)} child events to merge")
-
-        # For each child event, reassign its daily_event_mentions to the master
-        for child_id, child_name in child_events:
-            # Check how many daily_event_mentions this child has
-            mention_count = session.execute(text('''
-                SELECT COUNT(*) FROM daily_event_mentions
-                WHERE canonical_event_id = :child_id
-            '''), {'child_id': child_id}).scalar()
-
-            if mention_count == 0:
-                continue
-
-            if verbose:
-                safe_child = child_name.encode('ascii', 'replace').decode('ascii')[:50]
-                print(f"      Merging {mention_count} mentions from: {safe_child}")
-
-            stats['mentions_reassigned'] += mention_count
-
-            if not dry_run:
-                # Get all mentions from child
-                child_mentions = session.execute(text('''
-                    SELECT mention_date, article_count
-                    FROM daily_event_mentions
-                    WHERE canonical_event_id = :child_id
-                '''), {'child_id': child_id}).fetchall()
-
-                for mention_date, article_count in child_mentions:
-                    # Check if master already has a mention for this date
-                    existing = session.execute(text('''
-                        SELECT article_count
-                        FROM daily_event_mentions
-                        WHERE canonical_event_id = :master_id
-                          AND mention_date = :mention_date
-                    '''), {'master_id': master_id, 'mention_date': mention_date}).fetchone()
-
-                    if existing:
-                        # Master already has mention for this date - merge the counts
-                        new_count = existing[0] + article_count
-                        session.execute(text('''
-                            UPDATE daily_event_mentions
-                            SET article_count = :new_count
-                            WHERE canonical_event_id = :master_id
-                              AND mention_date = :mention_date
-                        '''), {'new_count': new_count, 'master_id': master_id, 'mention_date': mention_date})
-
-                        # Delete the child's mention
-                        session.execute(text('''
-                            DELETE FROM daily_event_mentions
-                            WHERE canonical_event_id = :child_id
-                              AND mention_date = :mention_date
-                        '''), {'child_id': child_id, 'mention_date': mention_date})
-                    else:
-                        # No conflict - just reassign to master
-                        session.execute(text('''
-                            UPDATE daily_event_mentions
-                            SET canonical_event_id = :master_id
-                            WHERE canonical_event_id = :child_id
-                              AND mention_date = :mention_date
-                        '''), {'master_id': master_id, 'child_id': child_id, 'mention_date': mention_date})
+            print(f"    Merging {child_count} child events ({mention_count} mentions)")
 
-        # Delete all child events (they're now empty)
-        if not dry_run and len(child_events) > 0:
-            child_ids = [child_id for child_id, _ in child_events]
+    if dry_run or not plan:
+        if dry_run and verbose:
+            print(f"\n  [DRY RUN] Would reassign {stats['mentions_reassigned']} mentions")
+            print(f"  [DRY RUN] Would delete {stats['child_events']} child events")
+        return stats
 
-            # Delete children
-            for child_id in child_ids:
-                session.execute(text('''
-                    DELETE FROM canonical_events
-                    WHERE id = :child_id
-                '''), {'child_id': child_id})
+    start = time.time()
+    try:
+        session.execute(text(f'''
+            CREATE TEMP TABLE merge_pairs ON COMMIT DROP AS {MERGE_PAIRS_SQL}
+        '''), {'country': country})
+
+        # Move all child mentions out of daily_event_mentions in one statement
+        session.execute(text('''
+            CREATE TEMP TABLE merge_moved ON COMMIT DROP AS
+            SELECT mp.master_id, dem.*
+            FROM daily_event_mentions dem
+            JOIN merge_pairs mp ON dem.canonical_event_id = mp.child_id
+            WITH NO DATA
+        '''))
+        session.execute(text('''
+            WITH moved AS (
+                DELETE FROM daily_event_mentions dem
+                USING merge_pairs mp
+                WHERE dem.canonical_event_id = mp.child_id
+                RETURNING mp.master_id, dem.*
+            )
+            INSERT INTO merge_moved SELECT * FROM moved
+        '''))
+
+        # Aggregate per (master, date) and upsert onto the master's mentions.
+        # Descriptive fields come from the largest child mention for that date;
+        # its id is reused so un-conflicted mentions keep their identity.
+        session.execute(text('''
+            WITH totals AS (
+                SELECT master_id, mention_date, SUM(COALESCE(article_count, 0)) AS article_count
+                FROM merge_moved
+                GROUP BY master_id, mention_date
+            ),
+            docs AS (
+                SELECT mm.master_id, mm.mention_date, array_agg(DISTINCT d.doc_id) AS doc_ids
+                FROM merge_moved mm, unnest(mm.doc_ids) AS d(doc_id)
+                GROUP BY mm.master_id, mm.mention_date
+            ),
+            sources AS (
+                SELECT mm.master_id, mm.mention_date, array_agg(DISTINCT s.source_name) AS source_names
+                FROM merge_moved mm, unnest(mm.source_names) AS s(source_name)
+                GROUP BY mm.master_id, mm.mention_date
+            ),
+            representative AS (
+                SELECT DISTINCT ON (master_id, mention_date) *
+                FROM merge_moved
+                ORDER BY master_id, mention_date, article_count DESC NULLS LAST
+            )
+            INSERT INTO daily_event_mentions (
+                id, canonical_event_id, initiating_country, mention_date, article_count,
+                consolidated_headline, daily_summary, source_names, source_diversity_score,
+                mention_context, news_intensity, doc_ids
+            )
+            SELECT
+                r.id, r.master_id, r.initiating_country, r.mention_date, t.article_count,
+                r.consolidated_headline, r.daily_summary, s.source_names, r.source_diversity_score,
+                r.mention_context, r.news_intensity, d.doc_ids
+            FROM representative r
+            JOIN totals t USING (master_id, mention_date)
+            LEFT JOIN docs d USING (master_id, mention_date)
+            LEFT JOIN sources s USING (master_id, mention_date)
+            ON CONFLICT (canonical_event_id, mention_date) DO UPDATE SET
+                article_count = COALESCE(daily_event_mentions.article_count, 0) + EXCLUDED.article_count,
+                doc_ids = ARRAY(
+                    SELECT DISTINCT x FROM unnest(daily_event_mentions.doc_ids || EXCLUDED.doc_ids) AS x
+                ),
+                source_names = ARRAY(
+                    SELECT DISTINCT x FROM unnest(daily_event_mentions.source_names || EXCLUDED.source_names) AS x
+                )
+        '''))
 
-            stats['events_deleted'] += len(child_ids)
+        # Delete all child events (they're now empty)
+        deleted = session.execute(text('''
+            DELETE FROM canonical_events ce
+            USING merge_pairs mp
+            WHERE ce.id = mp.child_id
+        ''')).rowcount
 
-    # Commit changes
-    if not dry_run and stats['events_deleted'] > 0:
         session.commit()
-        if verbose:
-            print(f"\n  [COMMITTED] Reassigned {stats['mentions_reassigned']} mentions")
-            print(f"  [COMMITTED] Deleted {stats['events_deleted']} child events")
-    elif dry_run and verbose:
-        print(f"\n  [DRY RUN] Would reassign {stats['mentions_reassigned']} mentions")
-        print(f"  [DRY RUN] Would delete {stats['events_deleted']} child events")
+    except Exception:
+        session.rollback()
+        raise
+
+    elapsed = time.time() - start
+    stats['events_deleted'] = deleted
+
+    if verbose:
+        rate = stats['mentions_reassigned'] / elapsed if elapsed > 0 else 0.0
+        print(f"\n  [COMMITTED] Reassigned {stats['mentions_reassigned']} mentions "
+              f"in {elapsed:.2f}s ({rate:,.0f} rows/s)")
+        print(f"  [COMMITTED] Deleted {stats['events_deleted']} child events")
 
     return stats
 
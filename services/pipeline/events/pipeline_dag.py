@@ -0,0 +1,289 @@
+"""
+Minimal in-process DAG executor for pipeline stages.
+
+Tasks declare their dependencies by key. Ready tasks run concurrently on a
+thread pool; each task's outcome is recorded in the pipeline_task_runs table
+so a re-run skips tasks already marked 'done'. A failed task blocks its
+descendants for the rest of the run; everything independent of it continues.
+
+Each task function returns a stats dict; its 'rows' entry is used for
+per-stage throughput in the final report.
+
+Usage:
+    tasks = [
+        Task('cluster:China', 'cluster', 'China', lambda: {'rows': 120}),
+        Task('consolidate:China', 'consolidate', 'China', run_2a, deps=['cluster:China']),
+    ]
+    report = DagRunner(tasks, max_workers=4).run()
+"""
+
+import json
+import time
+import traceback
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from sqlalchemy import text
+
+from shared.database.database import get_session
+
+
+class Task:
+    """One unit of pipeline work: a stage applied to one partition."""
+
+    def __init__(
+        self,
+        key: str,
+        stage: str,
+        partition: str,
+        fn: Callable[[], Dict[str, Any]],
+        deps: Iterable[str] = ()
+    ):
+        """
+        Args:
+            key: Unique task key (also the pipeline_task_runs key)
+            stage: Stage name, used for grouping in the report
+            partition: Partition label, e.g. "China" or "China:2024-08-01..2024-08-31"
+            fn: Runs the task and returns a stats dict (with 'rows' if known)
+            deps: Keys of tasks that must finish first
+        """
+        self.key = key
+        self.stage = stage
+        self.partition = partition
+        self.fn = fn
+        self.deps = list(deps)
+
+    def __repr__(self):
+        return f"Task({self.key})"
+
+
+class TaskStateStore:
+    """Reads and writes task completion records in pipeline_task_runs."""
+
+    def done_keys(self, keys: List[str]) -> set:
+        with get_session() as session:
+            result = session.execute(text('''
+                SELECT task_key
+                FROM pipeline_task_runs
+                WHERE status = 'done' AND task_key = ANY(:keys)
+            '''), {'keys': keys})
+            return {row.task_key for row in result}
+
+    def mark(self, task: Task, status: str, rows: int = 0, seconds: Optional[float] = None,
+             error: Optional[str] = None, stats: Optional[Dict[str, Any]] = None) -> None:
+        with get_session() as session:
+            session.execute(text('''
+                INSERT INTO pipeline_task_runs
+                    (id, task_key, stage, partition, status, rows, seconds, error, stats, started_at, finished_at)
+                VALUES
+                    (gen_random_uuid(), :task_key, :stage, :partition, :status, :rows, :seconds, :error,
+                     CAST(:stats AS JSONB),
+                     CASE WHEN :status = 'running' THEN NOW() END,
+                     CASE WHEN :status IN ('done', 'failed') THEN NOW() END)
+                ON CONFLICT (task_key) DO UPDATE SET
+                    status = EXCLUDED.status,
+                    rows = EXCLUDED.rows,
+                    seconds = EXCLUDED.seconds,
+                    error = EXCLUDED.error,
+                    stats = EXCLUDED.stats,
+                    started_at = COALESCE(EXCLUDED.started_at, pipeline_task_runs.started_at),
+                    finished_at = EXCLUDED.finished_at
+            '''), {
+                'task_key': task.key,
+                'stage': task.stage,
+                'partition': task.partition,
+                'status': status,
+                'rows': int(rows or 0),
+                'seconds': seconds,
+                'error': error,
+                'stats': json.dumps(stats or {}, default=str)
+            })
+            session.commit()
+
+
+class DagRunner:
+    """Runs tasks in dependency order with bounded concurrency."""
+
+    def __init__(
+        self,
+        tasks: List[Task],
+        max_workers: int = 4,
+        force: bool = False,
+        record_state: bool = True,
+        state: Optional[TaskStateStore] = None
+    ):
+        """
+        Args:
+            tasks: Tasks to run; deps on keys not in this list are ignored
+            max_workers: Tasks running at once
+            force: Re-run tasks already marked done
+            record_state: Write task outcomes to pipeline_task_runs (off for dry runs)
+            state: State store (default: TaskStateStore())
+        """
+        self.tasks = {task.key: task for task in tasks}
+        if len(self.tasks) != len(tasks):
+            raise ValueError("Duplicate task keys in DAG")
+
+        for task in tasks:
+            task.deps = [dep for dep in task.deps if dep in self.tasks]
+
+        self.max_workers = max(1, max_workers)
+        self.force = force
+        self.record_state = record_state
+        self.state = state or (TaskStateStore() if record_state else None)
+
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self._check_acyclic()
+
+    def _check_acyclic(self) -> None:
+        visiting, visited = set(), set()
+
+        def visit(key: str):
+            if key in visited:
+                return
+            if key in visiting:
+                raise ValueError(f"Dependency cycle at task {key}")
+            visiting.add(key)
+            for dep in self.tasks[key].deps:
+                visit(dep)
+            visiting.discard(key)
+            visited.add(key)
+
+        for key in self.tasks:
+            visit(key)
+
+    def _run_task(self, task: Task) -> Dict[str, Any]:
+        if self.record_state:
+            self.state.mark(task, 'running')
+
+        start = time.time()
+        started_at = datetime.utcnow()
+        try:
+            stats = task.fn() or {}
+        except Exception as e:
+            seconds = time.time() - start
+            if self.record_state:
+                self.state.mark(task, 'failed', seconds=seconds, error=f"{e}\n{traceback.format_exc()}")
+            return {'status': 'failed', 'error': str(e), 'seconds': seconds,
+                    'started_at': started_at, 'finished_at': datetime.utcnow(), 'rows': 0}
+
+        seconds = time.time() - start
+        rows = int(stats.get('rows', 0) or 0)
+        if self.record_state:
+            self.state.mark(task, 'done', rows=rows, seconds=seconds, stats=stats)
+        return {'status': 'done', 'seconds': seconds, 'rows': rows, 'stats': stats,
+                'started_at': started_at, 'finished_at': datetime.utcnow()}
+
+    def run(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Run the DAG.
+
+        Returns:
+            Per-stage report (see stage_report)
+        """
+        already_done = set()
+        if self.record_state and not self.force and self.tasks:
+            already_done = self.state.done_keys(list(self.tasks))
+        for key in already_done:
+            self.results[key] = {'status': 'skipped', 'rows': 0, 'seconds': 0.0}
+
+        children = defaultdict(list)
+        remaining_deps = {}
+        for key, task in self.tasks.items():
+            remaining_deps[key] = sum(1 for dep in task.deps if dep not in already_done)
+            for dep in task.deps:
+                children[dep].append(key)
+
+        ready = [key for key, count in remaining_deps.items() if count == 0 and key not in already_done]
+        total = len(self.tasks) - len(already_done)
+        finished = 0
+
+        print(f"\n[DAG] {len(self.tasks)} tasks ({len(already_done)} already done, skipped), "
+              f"{self.max_workers} workers")
+
+        def block_descendants(key: str):
+            for child in children[key]:
+                if child not in self.results:
+                    self.results[child] = {'status': 'blocked', 'rows': 0, 'seconds': 0.0, 'blocked_by': key}
+                    block_descendants(child)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            running = {}
+
+            while ready or running:
+                while ready:
+                    key = ready.pop(0)
+                    if key in self.results:  # Blocked meanwhile
+                        continue
+                    print(f"[DAG] START {key}")
+                    running[executor.submit(self._run_task, self.tasks[key])] = key
+
+                if not running:
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    key = running.pop(future)
+                    result = future.result()
+                    self.results[key] = result
+                    finished += 1
+
+                    if result['status'] == 'done':
+                        print(f"[DAG] DONE  {key} ({result['seconds']:.1f}s, {result['rows']} rows) "
+                              f"[{finished}/{total}]")
+                        for child in children[key]:
+                            remaining_deps[child] -= 1
+                            if remaining_deps[child] == 0 and child not in self.results:
+                                ready.append(child)
+                    else:
+                        print(f"[DAG] FAIL  {key}: {result['error']} [{finished}/{total}]")
+                        block_descendants(key)
+
+        return self.stage_report()
+
+    def stage_report(self) -> Dict[str, Dict[str, Any]]:
+        """Per-stage task counts, wall time (first start to last finish), rows and rows/s."""
+        report = {}
+        for key, task in self.tasks.items():
+            result = self.results.get(key, {'status': 'blocked', 'rows': 0, 'seconds': 0.0})
+            stage = report.setdefault(task.stage, {
+                'done': 0, 'skipped': 0, 'failed': 0, 'blocked': 0,
+                'rows': 0, 'task_seconds': 0.0, 'first_start': None, 'last_finish': None
+            })
+            stage[result['status']] += 1
+            stage['rows'] += result.get('rows', 0)
+            stage['task_seconds'] += result.get('seconds', 0.0)
+            if result.get('started_at'):
+                if stage['first_start'] is None or result['started_at'] < stage['first_start']:
+                    stage['first_start'] = result['started_at']
+                if stage['last_finish'] is None or result['finished_at'] > stage['last_finish']:
+                    stage['last_finish'] = result['finished_at']
+
+        for stage in report.values():
+            wall = 0.0
+            if stage['first_start'] is not None:
+                wall = (stage['last_finish'] - stage['first_start']).total_seconds()
+            stage['wall_seconds'] = wall
+            stage['rows_per_second'] = stage['rows'] / wall if wall > 0 else 0.0
+
+        return report
+
+
+def print_stage_report(report: Dict[str, Dict[str, Any]], stage_order: Optional[List[str]] = None) -> None:
+    """Print the per-stage report as a table."""
+    stages = [s for s in (stage_order or []) if s in report] + \
+        [s for s in report if s not in (stage_order or [])]
+
+    print("\n" + "=" * 100)
+    print("PIPELINE STAGE REPORT")
+    print("=" * 100)
+    print(f"{'Stage':<24} {'Done':>5} {'Skip':>5} {'Fail':>5} {'Block':>6} "
+          f"{'Wall (s)':>10} {'Task (s)':>10} {'Rows':>10} {'Rows/s':>10}")
+    print("-" * 100)
+    for name in stages:
+        s = report[name]
+        print(f"{name:<24} {s['done']:>5} {s['skipped']:>5} {s['failed']:>5} {s['blocked']:>6} "
+              f"{s['wall_seconds']:>10.1f} {s['task_seconds']:>10.1f} {s['rows']:>10} {s['rows_per_second']:>10.1f}")
+    print("=" * 100)
@@ -0,0 +1,330 @@
+"""
+Change-driven event processing worker.
+
+DSR ingestion (services/pipeline/ingestion/dsr.py) records every
+(initiating_country, date) it loads new documents for in
+pipeline_dirty_markers. This worker polls that queue and, for each claimed
+partition, runs only the affected steps:
+
+1. Embedding   - embeds the partition's documents that have no embedding yet
+2. Stage 1A    - clusters events from documents not already in a cluster,
+                 written as new batches after the date's existing ones
+3. Stage 1B    - LLM-deconflicts the partition's unprocessed batches
+4. Summaries   - generates monthly event summaries for the affected months
+                 (existing summaries are left as they are)
+
+Markers are completed per country once all steps succeed; a failure releases
+that country's markers with exponential retry backoff. The lease on a country's
+markers is renewed before it starts and after every date (and summary month),
+so --lease-seconds only needs to cover one date, not a whole round; a worker
+that finds its markers reclaimed stops processing that country. Stage 2 (consolidation,
+validation, merging) and scoring remain periodic batch runs.
+
+Usage:
+    # Run continuously for the influencer countries
+    python services/pipeline/events/process_dirty_markers.py --influencers
+
+    # Drain the queue once and exit (e.g. from cron)
+    python services/pipeline/events/process_dirty_markers.py --influencers --once
+
+    # Show pending markers per country
+    python services/pipeline/events/process_dirty_markers.py --status
+"""
+
+import argparse
+import signal
+import time
+import traceback
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import text
+
+from shared.database.database import get_session
+from shared.models.models import PeriodType
+from shared.utils.llm_cache import add_llm_cache_args, apply_llm_cache_args
+from services.pipeline.events.dirty_markers import (
+    MarkerLeaseLost, claim_markers, complete_markers, fail_markers, pending_counts, renew_markers
+)
+
+
+class DirtyMarkerWorker:
+    """Claims dirty (country, date) markers and runs the affected pipeline steps."""
+
+    def __init__(
+        self,
+        countries: List[str] = None,
+        batch_markers: int = 50,
+        settle_seconds: int = 120,
+        lease_seconds: int = 3600,
+        embed: bool = True,
+        summaries: bool = True,
+        min_docs: int = 2,
+        llm_workers: int = 1
+    ):
+        """
+        Args:
+            countries: Countries to process (None = all)
+            batch_markers: Max markers claimed per round
+            settle_seconds: Wait this long after a partition's last mark before processing it
+            lease_seconds: Reclaim markers from workers that stopped responding after this long
+            embed: Run the embedding step
+            summaries: Run the summary step
+            min_docs: Minimum documents per event summary
+            llm_workers: Concurrent LLM reviews in Stage 1B
+        """
+        from services.pipeline.events.batch_cluster_events import EventBatchClusterer, load_config
+        from services.pipeline.events.llm_deconflict_clusters import LLMClusterDeconfliction
+
+        self.countries = countries
+        self.batch_markers = batch_markers
+        self.settle_seconds = settle_seconds
+        self.lease_seconds = lease_seconds
+        self.embed = embed
+        self.summaries = summaries
+        self.min_docs = min_docs
+
+        # Built once so the embedding model and name caches survive across rounds;
+        # the deconflicter reloads its ORM lookup indexes for every new session
+        self.clusterer = EventBatchClusterer(recipient_countries=load_config()['recipients'])
+        self.deconflicter = LLMClusterDeconfliction(verbose=False, llm_workers=llm_workers)
+
+        self.stopping = False
+        self.totals = defaultdict(int)
+
+    def get_unembedded_doc_ids(self, session, country: str, dates: List[date]) -> List[str]:
+        """Documents in the partitions that have no embedding yet."""
+        result = session.execute(text('''
+            SELECT DISTINCT d.doc_id
+            FROM documents d
+            JOIN initiating_countries ic ON ic.doc_id = d.doc_id
+            WHERE ic.initiating_country = :country
+              AND d.date = ANY(CAST(:dates AS DATE[]))
+              AND NOT EXISTS (
+                  SELECT 1
+                  FROM langchain_pg_embedding e
+                  WHERE e.cmetadata->>'doc_id' = d.doc_id
+              )
+        '''), {'country': country, 'dates': dates})
+        return [row.doc_id for row in result]
+
+    def process_country(
+        self,
+        session,
+        country: str,
+        dates: List[date],
+        renew: Optional[Callable[[], None]] = None
+    ) -> Dict[str, int]:
+        """
+        Run embedding, clustering, deconfliction and summaries for one country's dirty dates.
+
+        Args:
+            renew: Called after each step, date and summary month to extend the
+                markers' lease; raises MarkerLeaseLost to abort
+
+        Returns:
+            Stats dict
+        """
+        renew = renew or (lambda: None)
+        stats = defaultdict(int)
+
+        if self.embed:
+            doc_ids = self.get_unembedded_doc_ids(session, country, dates)
+            if doc_ids:
+                # Imported lazily: dsr imports the vector store
+                from services.pipeline.ingestion.dsr import embed_documents_direct
+                embed_documents_direct(doc_ids)
+            stats['documents_embedded'] += len(doc_ids)
+            renew()
+
+        for target_date in dates:
+            events, next_batch = self.clusterer.get_unclustered_events(session, country, target_date)
+            if events:
+                cluster_stats = self.clusterer.process_date(
+                    session, country, target_date, events=events, batch_offset=next_batch
+                )
+                stats['events_clustered'] += cluster_stats['total_events']
+                stats['clusters_created'] += cluster_stats['clusters_inserted']
+            renew()
+
+        for target_date in dates:
+            deconflict_stats = self.deconflicter.process_country_date(session, country, target_date)
+            stats['clusters_deconflicted'] += deconflict_stats.get('total_clusters', 0)
+            stats['canonical_events_created'] += deconflict_stats.get('canonical_events_created', 0)
+            renew()
+
+        if self.summaries:
+            from shared.utils.utils import Config
+            from services.pipeline.events.generate_event_summaries import EventSummaryGenerator
+
+            generator = EventSummaryGenerator(session, Config.from_yaml())
+            months = sorted({d.replace(day=1) for d in dates})
+            for month_start in months:
+                month_end = (month_start.replace(day=28) + timedelta(days=4)).replace(day=1) - timedelta(days=1)
+                summaries = generator.generate_event_summaries(
+                    month_start, month_end, country, PeriodType.MONTHLY, self.min_docs
+                )
+                stats['summaries_created'] += len(summaries)
+                renew()
+
+        return stats
+
+    def run_once(self) -> int:
+        """
+        Claim one round of markers and process them.
+
+        Returns:
+            Number of markers claimed
+        """
+        with get_session() as session:
+            markers = claim_markers(
+                session,
+                countries=self.countries,
+                limit=self.batch_markers,
+                settle_seconds=self.settle_seconds,
+                lease_seconds=self.lease_seconds
+            )
+
+        if not markers:
+            return 0
+
+        by_country = defaultdict(list)
+        for marker in markers:
+            by_country[marker['initiating_country']].append(marker)
+
+        print(f"\n[CLAIMED] {len(markers)} dirty partitions across {len(by_country)} countries")
+
+        for country, country_markers in by_country.items():
+            dates = sorted({m['marker_date'] for m in country_markers})
+            print(f"\n{'=' * 80}")
+            print(f"{country}: {len(dates)} dates ({dates[0]} to {dates[-1]})")
+            print('=' * 80)
+
+            def renew():
+                with get_session() as lease_session:
+                    renew_markers(lease_session, country_markers)
+
+            start = time.time()
+            try:
+                # Earlier countries in the round may have outlived this country's lease
+                renew()
+                with get_session() as session:
+                    stats = self.process_country(session, country, dates, renew=renew)
+                with get_session() as session:
+                    completed = complete_markers(session, country_markers)
+            except MarkerLeaseLost as e:
+                # Another worker holds the markers now; leave them to it
+                print(f"  [WARNING] {country}: {e}; stopping")
+                self.totals['partitions_lost'] += len(country_markers)
+                continue
+            except Exception as e:
+                print(f"  [ERROR] {country}: {e}")
+                traceback.print_exc()
+                with get_session() as session:
+                    fail_markers(session, country_markers, f"{e}\n{traceback.format_exc()}")
+                self.totals['partitions_failed'] += len(country_markers)
+                continue
+
+            self.totals['partitions_processed'] += completed
+            self.totals['partitions_lost'] += len(country_markers) - completed
+            for key, value in stats.items():
+                self.totals[key] += value
+            print(f"\n  [OK] {country} done in {time.time() - start:.1f}s: " +
+                  ', '.join(f"{k}={v}" for k, v in stats.items()))
+
+        return len(markers)
+
+    def run(self, poll_interval: int = 60, once: bool = False) -> Dict[str, int]:
+        """
+        Process markers until stopped (SIGINT/SIGTERM), or until the queue is empty with once=True.
+
+        Returns:
+            Totals across all rounds
+        """
+        def request_stop(signum, frame):
+            print("\n[STOP] Finishing the current round, then exiting...")
+            self.stopping = True
+
+        signal.signal(signal.SIGINT, request_stop)
+        signal.signal(signal.SIGTERM, request_stop)
+
+        while not self.stopping:
+            claimed = self.run_once()
+            if claimed == 0:
+                if once:
+                    break
+                time.sleep(poll_interval)
+
+        return dict(self.totals)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Process dirty (country, date) markers left by DSR ingestion')
+    parser.add_argument('--country', type=str, help='Only process markers for this country')
+    parser.add_argument('--influencers', action='store_true', help='Only process influencer countries from config.yaml')
+    parser.add_argument('--once', action='store_true', help='Drain the queue once and exit instead of polling')
+    parser.add_argument('--status', action='store_true', help='Show pending markers per country and exit')
+    parser.add_argument('--poll-interval', type=int, default=60, help='Seconds between polls of an empty queue (default: 60)')
+    parser.add_argument('--batch-markers', type=int, default=50, help='Max markers claimed per round (default: 50)')
+    parser.add_argument('--settle-seconds', type=int, default=120,
+                        help="Wait this long after a partition's last new document before processing it (default: 120)")
+    parser.add_argument('--lease-seconds', type=int, default=3600,
+                        help='Reclaim markers held by a stopped worker after this long; renewed after every date (default: 3600)')
+    parser.add_argument('--skip-embeddings', action='store_true', help='Do not embed new documents')
+    parser.add_argument('--skip-summaries', action='store_true', help='Do not generate event summaries')
+    parser.add_argument('--min-docs', type=int, default=2, help='Minimum documents per event summary (default: 2)')
+    parser.add_argument('--llm-workers', type=int, default=1, help='Concurrent LLM reviews in Stage 1B (default: 1)')
+    add_llm_cache_args(parser)
+
+    args = parser.parse_args()
+
+    if args.status:
+        with get_session() as session:
+            counts = pending_counts(session)
+        print("Pending dirty markers:")
+        for country, pending in counts.items():
+            print(f"  {country}: {pending}")
+        if not counts:
+            print("  (none)")
+        return
+
+    apply_llm_cache_args(args)
+
+    if args.country:
+        countries = [args.country]
+    elif args.influencers:
+        from services.pipeline.events.batch_cluster_events import load_influencer_countries
+        countries = load_influencer_countries()
+    else:
+        countries = None
+
+    print("=" * 80)
+    print("DIRTY MARKER WORKER")
+    print("=" * 80)
+    print(f"Countries: {', '.join(countries) if countries else 'all'}")
+    print(f"Mode: {'drain once' if args.once else f'poll every {args.poll_interval}s'}")
+    print(f"Steps: embeddings={'off' if args.skip_embeddings else 'on'}, clustering, deconfliction, "
+          f"summaries={'off' if args.skip_summaries else 'on'}")
+
+    worker = DirtyMarkerWorker(
+        countries=countries,
+        batch_markers=args.batch_markers,
+        settle_seconds=args.settle_seconds,
+        lease_seconds=args.lease_seconds,
+        embed=not args.skip_embeddings,
+        summaries=not args.skip_summaries,
+        min_docs=args.min_docs,
+        llm_workers=args.llm_workers
+    )
+    totals = worker.run(poll_interval=args.poll_interval, once=args.once)
+
+    print(f"\n{'=' * 80}")
+    print("WORKER SUMMARY")
+    print('=' * 80)
+    for key, value in sorted(totals.items()):
+        print(f"  {key}: {value}")
+
+
+if __name__ == '__main__':
+    main()
@@ -10,6 +10,9 @@ Usage examples:
 
     # List top master events
     python query_master_events.py --list-top 10 --country "United States"
+
+    # Find the most similar master events (HNSW index, computed in Postgres)
+    python query_master_events.py --master-event "Ceasefire Proposal in Gaza" --similar 10
 """
 
 import argparse
@@ -18,6 +21,7 @@ from typing import List, Dict
 from sqlalchemy import text
 
 from shared.database.database import get_session
+from services.pipeline.events.canonical_event_index import CanonicalEventIndex
 
 
 def get_master_event_docs(master_event_name: str, country: str = None) -> List[str]:
@@ -148,6 +152,44 @@ def list_top_master_events(limit: int = 10, country: str = None) -> List[Dict]:
         ]
 
 
+def find_similar_master_events(
+    master_event_name: str,
+    country: str = None,
+    k: int = 10,
+    threshold: float = None
+) -> List[Dict]:
+    """
+    Find the master events most similar to a master event (same country).
+
+    Args:
+        master_event_name: Name of the master event
+        country: Optional country filter
+        k: Number of neighbours to return
+        threshold: Optional minimum cosine similarity
+
+    Returns:
+        List of dicts with keys: id, canonical_name, master_event_id, similarity
+    """
+    with get_session() as session:
+        query = '''
+            SELECT id
+            FROM canonical_events
+            WHERE master_event_id IS NULL
+              AND canonical_name = :name
+        '''
+        params = {'name': master_event_name}
+
+        if country:
+            query += " AND initiating_country = :country"
+            params['country'] = country
+
+        event_id = session.execute(text(query + " LIMIT 1"), params).scalar()
+        if event_id is None:
+            return []
+
+        return CanonicalEventIndex(session).neighbours_of(event_id, k=k, threshold=threshold, masters_only=True)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Query master events and their underlying data",
@@ -163,6 +205,8 @@ def main():
     parser.add_argument('--get-docs', action='store_true', help='Get all doc_ids for master event')
     parser.add_argument('--timeline', action='store_true', help='Get daily timeline for master event')
     parser.add_argument('--list-top', type=int, help='List top N master events')
+    parser.add_argument('--similar', type=int, help='List the N most similar master events')
+    parser.add_argument('--min-similarity', type=float, help='Minimum cosine similarity for --similar')
 
     args = parser.parse_args()
 
@@ -196,6 +240,15 @@ def main():
                 print(f"{entry['date']}: {entry['event_name']}")
                 print(f"  Articles: {entry['articles']}, Documents: {entry['doc_count']}")
 
+        elif args.similar:
+            neighbours = find_similar_master_events(
+                args.master_event, args.country, args.similar, args.min_similarity
+            )
+            print(f"Master events similar to '{args.master_event}':")
+            print("=" * 100)
+            for i, event in enumerate(neighbours, 1):
+                print(f"{i}. {event['canonical_name']} (similarity: {event['similarity']:.3f})")
+
     else:
         parser.print_help()
 
@@ -0,0 +1,317 @@
+"""
+Run the event pipeline as a resumable, concurrent DAG.
+
+Stages and their dependencies (per country; periods are calendar months by
+default, or weeks with --period week):
+
+    cluster(country, period)                 Stage 1A  batch_cluster_events
+      -> deconflict_clusters(country, period) Stage 1B  llm_deconflict_clusters
+           -> summaries(country, period)               generate_event_summaries
+      -> consolidate(country)                 Stage 2A  consolidate_all_events (after all periods)
+           -> deconflict_canonical(country)   Stage 2B  llm_deconflict_canonical_events
+                -> merge(country)             Stage 2C  merge_canonical_events
+                     -> score(country)                score_canonical_event_materiality
+
+Clustering partitions are independent and run concurrently across countries
+and periods. Stage 1B periods of one country run in date order, one after the
+other, because they read and extend that country's canonical events. Each
+task's completion is recorded in pipeline_task_runs, so re-running the same
+command only runs what is left (use --force to re-run everything). Stage 2
+tasks are recorded per country and run range (start..end), so a later run
+over new months runs them again; they track their own progress and only
+process what changed.
+
+Usage:
+    # All influencer countries, August-October 2024, 4 tasks at a time
+    python services/pipeline/events/run_event_dag.py --influencers --start-date 2024-08-01 --end-date 2024-10-31 --workers 4
+
+    # One country, only the Stage 1 tasks
+    python services/pipeline/events/run_event_dag.py --country China --start-date 2024-08-01 --end-date 2024-08-31 --stages cluster,deconflict_clusters
+
+    # Show the task graph without running anything
+    python services/pipeline/events/run_event_dag.py --influencers --start-date 2024-08-01 --end-date 2024-10-31 --dry-run
+"""
+
+import argparse
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Tuple
+
+from shared.database.database import get_session
+from shared.models.models import PeriodType
+from shared.utils.llm_cache import add_llm_cache_args, apply_llm_cache_args
+from services.pipeline.events.clustering_backends import CLUSTERING_ALGORITHMS
+from services.pipeline.events.pipeline_dag import DagRunner, Task, print_stage_report
+
+
+STAGES = [
+    'cluster',
+    'deconflict_clusters',
+    'consolidate',
+    'deconflict_canonical',
+    'merge',
+    'score',
+    'summaries',
+]
+
+
+def iter_periods(start_date: date, end_date: date, period: str = 'month') -> List[Tuple[date, date]]:
+    """
+    Split [start_date, end_date] into calendar months or ISO weeks (clipped to the range).
+
+    Returns:
+        List of (period_start, period_end) tuples, inclusive
+    """
+    periods = []
+    current = start_date
+    while current <= end_date:
+        if period == 'week':
+            period_end = current + timedelta(days=6 - current.weekday())
+        else:
+            next_month = (current.replace(day=28) + timedelta(days=4)).replace(day=1)
+            period_end = next_month - timedelta(days=1)
+        period_end = min(period_end, end_date)
+        periods.append((current, period_end))
+        current = period_end + timedelta(days=1)
+    return periods
+
+
+def run_cluster(country: str, start: date, end: date, args, recipient_countries: List[str]) -> Dict:
+    from services.pipeline.events.batch_cluster_events import run_serial
+
+    stats = run_serial(
+        [country], start, end,
+        batch_size=args.batch_size,
+        eps=args.eps,
+        recipient_countries=recipient_countries,
+        dry_run=args.dry_run,
+        algorithm=args.algorithm
+    )
+    stats['rows'] = stats['total_events']
+    return stats
+
+
+def run_deconflict_clusters(country: str, start: date, end: date, args) -> Dict:
+    from services.pipeline.events.llm_deconflict_clusters import LLMClusterDeconfliction
+
+    processor = LLMClusterDeconfliction(
+        dry_run=args.dry_run,
+        verbose=False,
+        llm_workers=args.llm_workers
+    )
+
+    totals = {'total_clusters': 0, 'reviewed': 0, 'canonical_events_created': 0, 'daily_mentions_created': 0}
+    with get_session() as session:
+        current = start
+        while current <= end:
+            stats = processor.process_country_date(session, country, current)
+            for key in totals:
+                totals[key] += stats.get(key, 0)
+            current += timedelta(days=1)
+
+    totals['rows'] = totals['total_clusters']
+    return totals
+
+
+def run_summaries(country: str, start: date, end: date, args) -> Dict:
+    from shared.utils.utils import Config
+    from services.pipeline.events.generate_event_summaries import EventSummaryGenerator
+
+    if args.dry_run:
+        print(f"  [DRY RUN] Would generate event summaries for {country} {start} to {end}")
+        return {'rows': 0}
+
+    period_type = PeriodType.WEEKLY if args.period == 'week' else PeriodType.MONTHLY
+    with get_session() as session:
+        generator = EventSummaryGenerator(session, Config.from_yaml())
+        summaries = generator.generate_event_summaries(start, end, country, period_type, args.min_docs)
+
+    return {'rows': len(summaries)}
+
+
+def run_consolidate(country: str, args) -> Dict:
+    from services.pipeline.events.consolidate_all_events import (
+        consolidate_country, consolidate_country_incremental, init_consolidation_watermark
+    )
+
+    with get_session() as session:
+        stats = consolidate_country_incremental(session, country, dry_run=args.dry_run)
+        if stats.get('skipped'):
+            # No watermark yet: first run for this country is a full consolidation
+            stats = consolidate_country(session, country, dry_run=args.dry_run)
+            if stats.get('skipped'):
+                # Consolidated before watermarks existed: keep its groups and go incremental
+                init_consolidation_watermark(session, country, dry_run=args.dry_run)
+                stats = consolidate_country_incremental(session, country, dry_run=args.dry_run)
+
+    stats['rows'] = stats['events']
+    return stats
+
+
+def run_deconflict_canonical(country: str, args) -> Dict:
+    from services.pipeline.events.llm_deconflict_canonical_events import process_country
+
+    with get_session() as session:
+        stats = process_country(session, country, dry_run=args.dry_run, resume=True)
+
+    stats['rows'] = stats.get('groups', 0)
+    return stats
+
+
+def run_merge(country: str, args) -> Dict:
+    from services.pipeline.events.merge_canonical_events import merge_canonical_events_for_country
+
+    with get_session() as session:
+        stats = merge_canonical_events_for_country(session, country, dry_run=args.dry_run)
+
+    stats['rows'] = stats.get('mentions_reassigned', 0)
+    return stats
+
+
+def run_score(country: str, args) -> Dict:
+    from services.pipeline.events.score_canonical_event_materiality import score_country_canonical_events
+
+    stats = score_country_canonical_events(country, dry_run=args.dry_run, verbose=False)
+    stats['rows'] = stats['scored']
+    return stats
+
+
+def build_tasks(
+    countries: List[str],
+    periods: List[Tuple[date, date]],
+    stages: List[str],
+    args,
+    recipient_countries: List[str]
+) -> List[Task]:
+    """
+    Build the task graph for the selected stages.
+
+    Dependencies on stages that were not selected are dropped by DagRunner,
+    so e.g. --stages consolidate,merge runs those stages without re-checking
+    clustering.
+    """
+    tasks = []
+    # Stage 2 tasks are per country but keyed by the run's range: a later run
+    # over new months must not find them already recorded as done
+    run_range = f"{periods[0][0]}..{periods[-1][1]}" if periods else ''
+
+    for country in countries:
+        deconflict_keys = []
+        previous_deconflict = None
+
+        for start, end in periods:
+            partition = f"{country}:{start}..{end}"
+            cluster_key = f"cluster:{partition}"
+            deconflict_key = f"deconflict_clusters:{partition}"
+
+            if 'cluster' in stages:
+                tasks.append(Task(
+                    cluster_key, 'cluster', partition,
+                    lambda c=country, s=start, e=end: run_cluster(c, s, e, args, recipient_countries)
+                ))
+
+            if 'deconflict_clusters' in stages:
+                deps = [cluster_key] + ([previous_deconflict] if previous_deconflict else [])
+                tasks.append(Task(
+                    deconflict_key, 'deconflict_clusters', partition,
+                    lambda c=country, s=start, e=end: run_deconflict_clusters(c, s, e, args),
+                    deps=deps
+                ))
+                previous_deconflict = deconflict_key
+            deconflict_keys.append(deconflict_key)
+
+            if 'summaries' in stages:
+                tasks.append(Task(
+                    f"summaries:{partition}", 'summaries', partition,
+                    lambda c=country, s=start, e=end: run_summaries(c, s, e, args),
+                    deps=[deconflict_key]
+                ))
+
+        country_range = f"{country}:{run_range}"
+        consolidate_key = f"consolidate:{country_range}"
+        deconflict_canonical_key = f"deconflict_canonical:{country_range}"
+        merge_key = f"merge:{country_range}"
+
+        if 'consolidate' in stages:
+            tasks.append(Task(consolidate_key, 'consolidate', country_range,
+                              lambda c=country: run_consolidate(c, args), deps=deconflict_keys))
+        if 'deconflict_canonical' in stages:
+            tasks.append(Task(deconflict_canonical_key, 'deconflict_canonical', country_range,
+                              lambda c=country: run_deconflict_canonical(c, args), deps=[consolidate_key]))
+        if 'merge' in stages:
+            tasks.append(Task(merge_key, 'merge', country_range,
+                              lambda c=country: run_merge(c, args), deps=[deconflict_canonical_key]))
+        if 'score' in stages:
+            tasks.append(Task(f"score:{country_range}", 'score', country_range,
+                              lambda c=country: run_score(c, args), deps=[merge_key]))
+
+    return tasks
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the event pipeline as a resumable DAG')
+    parser.add_argument('--country', type=str, help='Process a single country')
+    parser.add_argument('--influencers', action='store_true', help='Process all influencer countries from config.yaml')
+    parser.add_argument('--start-date', type=str, required=True, help='Start date (YYYY-MM-DD)')
+    parser.add_argument('--end-date', type=str, required=True, help='End date (YYYY-MM-DD)')
+    parser.add_argument('--period', choices=['month', 'week'], default='month',
+                        help='Partition size for the per-period stages (default: month)')
+    parser.add_argument('--stages', type=str, default=','.join(STAGES),
+                        help=f"Comma-separated stages to run (default: all of {','.join(STAGES)})")
+    parser.add_argument('--workers', type=int, default=4, help='Tasks run concurrently (default: 4)')
+    parser.add_argument('--force', action='store_true', help='Re-run tasks already recorded as done')
+    parser.add_argument('--dry-run', action='store_true', help='Run stages in dry-run mode and record no task state')
+    parser.add_argument('--batch-size', type=int, default=50, help='Stage 1A events per batch (default: 50)')
+    parser.add_argument('--eps', type=float, default=0.15, help='Stage 1A cosine distance threshold (default: 0.15)')
+    parser.add_argument('--algorithm', choices=CLUSTERING_ALGORITHMS, default='dbscan',
+                        help='Stage 1A clustering backend (default: dbscan)')
+    parser.add_argument('--llm-workers', type=int, default=1,
+                        help='Concurrent LLM reviews inside each Stage 1B task (default: 1)')
+    parser.add_argument('--min-docs', type=int, default=2, help='Minimum documents per event summary (default: 2)')
+    add_llm_cache_args(parser)
+
+    args = parser.parse_args()
+    apply_llm_cache_args(args)
+
+    from services.pipeline.events.batch_cluster_events import load_config, load_influencer_countries
+
+    if args.country:
+        countries = [args.country]
+    elif args.influencers:
+        countries = load_influencer_countries()
+    else:
+        parser.error("Specify --country or --influencers")
+
+    stages = [s.strip() for s in args.stages.split(',') if s.strip()]
+    unknown = [s for s in stages if s not in STAGES]
+    if unknown:
+        parser.error(f"Unknown stages: {', '.join(unknown)} (choose from {', '.join(STAGES)})")
+
+    start_date = datetime.strptime(args.start_date, '%Y-%m-%d').date()
+    end_date = datetime.strptime(args.end_date, '%Y-%m-%d').date()
+    periods = iter_periods(start_date, end_date, args.period)
+    recipient_countries = load_config()['recipients']
+
+    print("=" * 80)
+    print("EVENT PIPELINE DAG")
+    print("=" * 80)
+    print(f"Countries: {', '.join(countries)}")
+    print(f"Date range: {start_date} to {end_date} ({len(periods)} {args.period} partitions)")
+    print(f"Stages: {', '.join(stages)}")
+    print(f"Workers: {args.workers}")
+    if args.force:
+        print("[FORCE] Re-running tasks already marked done")
+    if args.dry_run:
+        print("[DRY RUN] No changes or task state will be saved")
+
+    tasks = build_tasks(countries, periods, stages, args, recipient_countries)
+    runner = DagRunner(tasks, max_workers=args.workers, force=args.force, record_state=not args.dry_run)
+    report = runner.run()
+    print_stage_report(report, STAGES)
+
+    failed = sum(stage['failed'] + stage['blocked'] for stage in report.values())
+    if failed:
+        print(f"\n[WARNING] {failed} tasks failed or were blocked; re-run the same command to resume")
+
+
+if __name__ == '__main__':
+    main()
@@ -21,6 +21,7 @@ project_root = Path(__file__).parent.parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 from shared.config.config import Config
+from shared.utils.llm_cache import add_llm_cache_args, apply_llm_cache_args
 
 
 def parse_date(date_str: str) -> date:
@@ -132,7 +133,10 @@ def main():
         help='Skip publication generation'
     )
 
+    add_llm_cache_args(parser)
+
     args = parser.parse_args()
+    apply_llm_cache_args(args)
 
     # Parse and validate dates
     try:
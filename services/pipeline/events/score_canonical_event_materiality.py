@@ -7,16 +7,31 @@ measuring the concrete/substantive nature of events versus symbolic/rhetorical g
 This allows tracking the materiality of specific initiatives over their entire lifecycle
 across multiple days/weeks of mentions.
 
+Scoring engine:
+- --events-per-prompt N packs N events into one request with strict per-event
+  JSON output; events missing or invalid in the response are re-scored alone
+- --workers N scores prompts concurrently across all selected countries
+  (gai() applies the per-backend rate limits)
+- Scores are written with bulk UPDATEs every --write-batch events
+- Resume: normal runs only load unscored events, so re-running continues where
+  the last run stopped. --rescore runs walk events in id order and persist a
+  cursor in pipeline_watermarks; an interrupted rescore resumes from it
+  (--restart ignores it)
+
 Usage:
     python score_canonical_event_materiality.py --country China
     python score_canonical_event_materiality.py --influencers
     python score_canonical_event_materiality.py --country Russia --rescore --dry-run
     python score_canonical_event_materiality.py --influencers --min-days 5
+    python score_canonical_event_materiality.py --influencers --events-per-prompt 8 --workers 6
 """
 
 import argparse
 import json
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
 from typing import List, Dict, Optional
 from pathlib import Path
 
@@ -27,6 +42,14 @@ if sys.platform == "win32":
 from sqlalchemy import text
 from shared.database.database import get_session
 from shared.utils.utils import Config, gai
+from shared.utils.llm_cache import add_llm_cache_args, apply_llm_cache_args
+from services.pipeline.events.watermarks import get_watermark_stats, set_watermark
+
+
+# pipeline_watermarks stage holding the --rescore resume cursor (scope = country)
+CURSOR_STAGE = 'score_canonical_event_materiality'
+
+MATERIALITY_SYS_PROMPT = "You are an expert analyst assessing the materiality of soft power events. You assign scores from 1-10 measuring concrete/substantive nature versus symbolic/rhetorical gestures."
 
 
 # Materiality scoring prompt for canonical events
@@ -84,11 +107,55 @@ Respond with ONLY the JSON object.
 """
 
 
+# Packed prompt: several events scored in one request
+PACKED_MATERIALITY_PROMPT = """You are an expert analyst assessing the material impact of soft power events.
+
+Score EACH of the {count} events below independently, from 1.0 to 10.0, measuring the
+concrete/substantive nature of the event.
+
+**Scoring Scale:**
+- 1-3: Symbolic/rhetorical (statements, cultural events with no material commitments)
+- 4-6: Mixed symbolic and material (agreements with unclear implementation, capacity building)
+- 7-10: Highly material (concrete infrastructure, specific financial commitments, tangible deliverables)
+
+**Consider:**
+- Concrete commitments vs. symbolic gestures
+- Specific financial amounts vs. vague promises
+- Tangible deliverables vs. aspirational statements
+- Implementation status vs. announcements only
+
+{events}
+
+**Output JSON format (exactly one entry per event key: {keys}):**
+{{
+    "scores": [
+        {{"event": "E1", "material_score": 7.5, "justification": "Brief explanation of the score"}},
+        ...
+    ]
+}}
+
+Respond with ONLY the JSON object.
+"""
+
+PACKED_EVENT_BLOCK = """### Event {key}
+**Event:** {event_name}
+**Country:** {country}
+**Time Period:** {first_mention} to {last_mention} ({total_days} days mentioned)
+**Total Articles:** {total_articles}
+**Primary Categories:** {categories}
+**Primary Recipients:** {recipients}
+**Description:** {event_description}
+**Key Facts:**
+{key_facts}
+"""
+
+
 def load_canonical_events_to_score(
     session,
     country: str,
     rescore: bool = False,
-    min_days: int = 1
+    min_days: int = 1,
+    after_id: Optional[str] = None
 ) -> List[Dict]:
     """
     Load master canonical events that need materiality scoring.
@@ -98,11 +165,15 @@ def load_canonical_events_to_score(
         country: Initiating country
         rescore: If True, rescore all events. If False, only score unscored events.
         min_days: Minimum number of days mentioned (default: 1)
+        after_id: Rescore cursor - only load events with id greater than this
 
     Returns:
         List of canonical event dictionaries
     """
     score_filter = "" if rescore else "AND ce.material_score IS NULL"
+    cursor_filter = "AND ce.id > CAST(:after_id AS UUID)" if after_id else ""
+    # Rescore runs walk a stable id order so the cursor is meaningful
+    order_by = "ce.id" if rescore else "ce.total_articles DESC NULLS LAST"
 
     query = text(f"""
         SELECT
@@ -123,12 +194,14 @@ def load_canonical_events_to_score(
           AND ce.master_event_id IS NULL
           AND ce.total_mention_days >= :min_days
           {score_filter}
-        ORDER BY ce.total_articles DESC NULLS LAST
+          {cursor_filter}
+        ORDER BY {order_by}
     """)
 
     result = session.execute(query, {
         'country': country,
-        'min_days': min_days
+        'min_days': min_days,
+        'after_id': after_id
     }).fetchall()
 
     events = []
@@ -219,9 +292,7 @@ def score_canonical_event_materiality(
 
     # Call LLM
     try:
-        sys_prompt = "You are an expert analyst assessing the materiality of soft power events. You assign scores from 1-10 measuring concrete/substantive nature versus symbolic/rhetorical gestures."
-
-        response = gai(sys_prompt, prompt, use_proxy=use_proxy)
+        response = gai(MATERIALITY_SYS_PROMPT, prompt, use_proxy=use_proxy)
 
         # Parse response
         if isinstance(response, dict):
@@ -233,24 +304,111 @@ def score_canonical_event_materiality(
                 print(f"    [ERROR] Failed to parse LLM response: {e}")
                 return None
 
-        # Validate score
-        if 'material_score' not in score_data:
+        return validate_score(score_data, verbose=True)
+
+    except Exception as e:
+        print(f"    [ERROR] LLM call failed: {e}")
+        return None
+
+
+def validate_score(score_data, verbose: bool = False) -> Optional[Dict]:
+    """Return {'material_score', 'justification'} if score_data holds a valid 1-10 score."""
+    if not isinstance(score_data, dict) or 'material_score' not in score_data:
+        if verbose:
             print(f"    [ERROR] No material_score in response")
-            return None
+        return None
 
+    try:
         score = float(score_data['material_score'])
-        if not (1.0 <= score <= 10.0):
+    except (TypeError, ValueError):
+        if verbose:
+            print(f"    [ERROR] Invalid material_score: {score_data['material_score']}")
+        return None
+
+    if not (1.0 <= score <= 10.0):
+        if verbose:
             print(f"    [ERROR] Score out of range: {score}")
-            return None
+        return None
 
-        return {
-            'material_score': score,
-            'justification': score_data.get('justification', '')
-        }
+    return {
+        'material_score': score,
+        'justification': score_data.get('justification', '')
+    }
+
+
+def score_canonical_events_packed(
+    events: List[Dict],
+    use_proxy: bool = True
+) -> List[Optional[Dict]]:
+    """
+    Score several canonical events with one LLM request.
+
+    Events whose entry is missing or invalid in the response (or all of them
+    if the request fails) are scored individually.
 
+    Returns:
+        One score dict (or None if scoring failed) per event, in input order
+    """
+    if len(events) == 1:
+        return [score_canonical_event_materiality(events[0], use_proxy=use_proxy)]
+
+    keys = [f"E{i}" for i in range(1, len(events) + 1)]
+    blocks = [
+        PACKED_EVENT_BLOCK.format(key=key, **format_canonical_event_for_scoring(event))
+        for key, event in zip(keys, events)
+    ]
+    prompt = PACKED_MATERIALITY_PROMPT.format(
+        count=len(events),
+        events="\n".join(blocks),
+        keys=", ".join(keys)
+    )
+
+    entries = {}
+    try:
+        response = gai(MATERIALITY_SYS_PROMPT, prompt, use_proxy=use_proxy)
+        if isinstance(response, str):
+            response = json.loads(response)
+        for entry in response.get('scores', []):
+            if isinstance(entry, dict):
+                entries[str(entry.get('event'))] = entry
     except Exception as e:
-        print(f"    [ERROR] LLM call failed: {e}")
-        return None
+        print(f"    [WARNING] Packed scoring failed ({e}); scoring {len(events)} events individually")
+
+    results = []
+    for key, event in zip(keys, events):
+        result = validate_score(entries.get(key))
+        if result is None:
+            result = score_canonical_event_materiality(event, use_proxy=use_proxy)
+        results.append(result)
+    return results
+
+
+def bulk_update_materiality_scores(session, scores: List[tuple]):
+    """
+    Write many scores with one UPDATE (does not commit).
+
+    Args:
+        scores: List of (event_id, material_score, justification)
+    """
+    if not scores:
+        return
+
+    session.execute(text("""
+        UPDATE canonical_events ce
+        SET material_score = v.material_score,
+            material_justification = v.justification
+        FROM (
+            SELECT
+                unnest(CAST(:ids AS UUID[])) AS id,
+                unnest(CAST(:material_scores AS NUMERIC[])) AS material_score,
+                unnest(CAST(:justifications AS TEXT[])) AS justification
+        ) v
+        WHERE ce.id = v.id
+    """), {
+        'ids': [event_id for event_id, _, _ in scores],
+        'material_scores': [score for _, score, _ in scores],
+        'justifications': [justification for _, _, justification in scores]
+    })
 
 
 def update_canonical_event_materiality_score(
@@ -287,87 +445,157 @@ def score_country_canonical_events(
     Returns:
         Statistics dictionary
     """
+    return score_countries(
+        [country],
+        rescore=rescore,
+        dry_run=dry_run,
+        verbose=verbose,
+        min_days=min_days
+    )[country]
+
+
+def score_countries(
+    countries: List[str],
+    rescore: bool = False,
+    dry_run: bool = False,
+    verbose: bool = True,
+    min_days: int = 1,
+    events_per_prompt: int = 1,
+    workers: int = 1,
+    write_batch: int = 100,
+    restart: bool = False
+) -> Dict[str, Dict[str, int]]:
+    """
+    Score materiality for canonical events across countries.
+
+    Prompts (events_per_prompt events each) from all countries are scored by
+    a pool of `workers` threads. This thread writes results with bulk UPDATEs
+    every `write_batch` scores and, for --rescore runs, advances each country's
+    resume cursor to the last event of its contiguous completed prefix in the
+    same transaction.
+
+    Returns:
+        Statistics dictionary per country
+    """
     if verbose:
         print(f"\n{'='*80}")
-        print(f"CANONICAL EVENT MATERIALITY SCORING: {country}")
+        print(f"CANONICAL EVENT MATERIALITY SCORING: {', '.join(countries)}")
         print(f"{'='*80}")
         print(f"Rescore existing: {'Yes' if rescore else 'No'}")
         print(f"Minimum days mentioned: {min_days}")
+        print(f"Events per prompt: {events_per_prompt}, workers: {workers}")
         print(f"Dry run: {'Yes' if dry_run else 'No'}")
 
-    with get_session() as session:
-        # Load events
-        events = load_canonical_events_to_score(
-            session,
-            country,
-            rescore,
-            min_days
-        )
-
-        if not events:
-            if verbose:
-                print(f"\n  [INFO] No events found to score")
-            return {'total': 0, 'scored': 0, 'failed': 0}
-
-        if verbose:
-            print(f"  Found {len(events)} events to score")
-
-        stats = {
-            'total': len(events),
-            'scored': 0,
-            'failed': 0
-        }
+    all_stats = {country: {'total': 0, 'scored': 0, 'failed': 0} for country in countries}
 
-        # Score each event
-        for i, event in enumerate(events, 1):
-            event_name = event['canonical_name']
-            safe_name = event_name.encode('ascii', 'replace').decode('ascii')
+    with get_session() as session:
+        # Load events per country (resuming an interrupted rescore from its cursor)
+        chunks_by_country = {}
+        for country in countries:
+            after_id = None
+            if rescore and not restart:
+                cursor = get_watermark_stats(session, CURSOR_STAGE, country) or {}
+                if cursor.get('cursor_id') and not cursor.get('completed') and cursor.get('min_days') == min_days:
+                    after_id = cursor['cursor_id']
+                    if verbose:
+                        print(f"  [RESUME] {country}: continuing rescore after event {after_id}")
 
+            events = load_canonical_events_to_score(session, country, rescore, min_days, after_id=after_id)
+            all_stats[country]['total'] = len(events)
+            chunks_by_country[country] = [
+                events[i:i + events_per_prompt] for i in range(0, len(events), events_per_prompt)
+            ]
             if verbose:
-                existing_score = f" (current: {event['material_score']:.1f})" if event['material_score'] else ""
-                print(f"\n  [{i}/{len(events)}] {safe_name[:80]}{existing_score}")
-                print(f"    Days: {event['total_mention_days']}, Articles: {event['total_articles']}")
+                print(f"  {country}: {len(events)} events to score")
 
-            # Score the event
-            if verbose:
-                print(f"    [PROXY] Calling LLM for materiality assessment...")
-
-            score_result = score_canonical_event_materiality(event, use_proxy=True)
-
-            if score_result:
-                score = score_result['material_score']
-                justification = score_result['justification']
-
-                if verbose:
-                    print(f"    [SCORE] {score:.1f}/10.0")
-                    print(f"    [REASON] {justification[:100]}...")
-
-                if not dry_run:
-                    update_canonical_event_materiality_score(
-                        session,
-                        event['id'],
-                        score,
-                        justification
-                    )
-                    session.commit()
-                    if verbose:
-                        print(f"    [SAVED] Material score updated")
+        # Interleave countries so they progress concurrently
+        work = []
+        max_chunks = max((len(chunks) for chunks in chunks_by_country.values()), default=0)
+        for idx in range(max_chunks):
+            for country in countries:
+                if idx < len(chunks_by_country[country]):
+                    work.append((country, idx, chunks_by_country[country][idx]))
 
-                stats['scored'] += 1
-            else:
-                if verbose:
-                    print(f"    [FAILED] Could not score this event")
-                stats['failed'] += 1
+        if not work:
+            if verbose:
+                print(f"\n  [INFO] No events found to score")
+            return all_stats
+
+        total_events = sum(stats['total'] for stats in all_stats.values())
+        pending_writes = []
+        done_chunks = {country: set() for country in countries}
+        next_chunk = {country: 0 for country in countries}  # First chunk not yet contiguous-complete
+        run_started = datetime.utcnow()
+        start = time.time()
+        completed = 0
+
+        def flush():
+            """Bulk-write pending scores and advance rescore cursors; commit."""
+            if dry_run:
+                pending_writes.clear()
+                return
+            bulk_update_materiality_scores(session, pending_writes)
+            if rescore:
+                for country in countries:
+                    chunks = chunks_by_country[country]
+                    if next_chunk[country] > 0:
+                        last_event = chunks[next_chunk[country] - 1][-1]
+                        set_watermark(session, CURSOR_STAGE, country, run_started, {
+                            'cursor_id': last_event['id'],
+                            'min_days': min_days,
+                            'completed': next_chunk[country] == len(chunks)
+                        })
+            session.commit()
+            pending_writes.clear()
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            futures = {
+                executor.submit(score_canonical_events_packed, chunk, True): (country, idx, chunk)
+                for country, idx, chunk in work
+            }
+
+            for future in as_completed(futures):
+                country, idx, chunk = futures[future]
+                for event, result in zip(chunk, future.result()):
+                    completed += 1
+                    safe_name = event['canonical_name'].encode('ascii', 'replace').decode('ascii')
+
+                    if result:
+                        all_stats[country]['scored'] += 1
+                        pending_writes.append((event['id'], result['material_score'], result['justification']))
+                        if verbose:
+                            existing_score = f" (was {event['material_score']:.1f})" if event['material_score'] else ""
+                            print(f"  [{completed}/{total_events}] {country} | {safe_name[:70]}: "
+                                  f"{result['material_score']:.1f}/10.0{existing_score}")
+                    else:
+                        all_stats[country]['failed'] += 1
+                        if verbose:
+                            print(f"  [{completed}/{total_events}] {country} | {safe_name[:70]}: [FAILED]")
+
+                done_chunks[country].add(idx)
+                while next_chunk[country] in done_chunks[country]:
+                    next_chunk[country] += 1
+
+                if len(pending_writes) >= write_batch:
+                    flush()
+                    if verbose and not dry_run:
+                        print(f"  [SAVED] {completed}/{total_events} events ({completed / (time.time() - start):.1f} events/s)")
+
+        flush()
 
         if verbose:
+            elapsed = time.time() - start
             print(f"\n{'='*80}")
             print(f"SUMMARY")
             print(f"{'='*80}")
-            print(f"  Total events: {stats['total']}")
-            print(f"  Successfully scored: {stats['scored']}")
-            print(f"  Failed: {stats['failed']}")
+            for country in countries:
+                stats = all_stats[country]
+                print(f"  {country}: {stats['scored']}/{stats['total']} scored, {stats['failed']} failed")
+            if elapsed > 0:
+                print(f"  Elapsed: {elapsed:.1f}s ({completed / elapsed:.1f} events/s)")
+            print(f"\nMateriality scoring completed")
 
-        return stats
+    return all_stats
 
 
 def main():
@@ -383,15 +611,26 @@ def main():
 
     # Options
     parser.add_argument('--rescore', action='store_true',
-                       help='Rescore events that already have scores')
+                       help='Rescore events that already have scores (bypasses cached LLM responses)')
     parser.add_argument('--dry-run', action='store_true',
                        help='Test without updating database')
     parser.add_argument('--quiet', action='store_true',
                        help='Suppress verbose output')
     parser.add_argument('--min-days', type=int, default=1,
                        help='Minimum number of days mentioned (default: 1)')
+    parser.add_argument('--events-per-prompt', type=int, default=1,
+                       help='Events scored per LLM request (default: 1)')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Concurrent LLM requests across all countries (default: 1)')
+    parser.add_argument('--write-batch', type=int, default=100,
+                       help='Scores written per bulk UPDATE/commit (default: 100)')
+    parser.add_argument('--restart', action='store_true',
+                       help='With --rescore: ignore the saved resume cursor and start over')
+
+    add_llm_cache_args(parser)
 
     args = parser.parse_args()
+    apply_llm_cache_args(args, refresh_flags=['rescore'])
 
     # Get countries to process
     if args.influencers:
@@ -402,23 +641,23 @@ def main():
 
     verbose = not args.quiet
 
-    # Process each country
-    total_stats = {'total': 0, 'scored': 0, 'failed': 0}
-
-    for country in countries:
-        stats = score_country_canonical_events(
-            country=country,
-            rescore=args.rescore,
-            dry_run=args.dry_run,
-            verbose=verbose,
-            min_days=args.min_days
-        )
-
-        total_stats['total'] += stats['total']
-        total_stats['scored'] += stats['scored']
-        total_stats['failed'] += stats['failed']
+    all_stats = score_countries(
+        countries,
+        rescore=args.rescore,
+        dry_run=args.dry_run,
+        verbose=verbose,
+        min_days=args.min_days,
+        events_per_prompt=max(1, args.events_per_prompt),
+        workers=max(1, args.workers),
+        write_batch=max(1, args.write_batch),
+        restart=args.restart
+    )
 
     if len(countries) > 1 and verbose:
+        total_stats = {
+            key: sum(stats[key] for stats in all_stats.values())
+            for key in ('total', 'scored', 'failed')
+        }
         print(f"\n{'='*80}")
         print(f"OVERALL SUMMARY ({len(countries)} countries)")
         print(f"{'='*80}")
@@ -0,0 +1,62 @@
+"""
+Pipeline watermark helpers.
+
+Incremental stages store a high-water mark per (stage, scope) in the
+pipeline_watermarks table and only process rows newer than it.
+
+Usage:
+    watermark = get_watermark(session, 'consolidate_all_events', 'China')
+    ...
+    set_watermark(session, 'consolidate_all_events', 'China', new_mark, {'attached': 12})
+"""
+
+import json
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import text
+
+
+def get_watermark(session, stage: str, scope: str) -> Optional[datetime]:
+    """Return the stored watermark for (stage, scope), or None if the stage never ran."""
+    return session.execute(text('''
+        SELECT watermark
+        FROM pipeline_watermarks
+        WHERE stage = :stage AND scope = :scope
+    '''), {'stage': stage, 'scope': scope}).scalar()
+
+
+def get_watermark_stats(session, stage: str, scope: str) -> Optional[Dict[str, Any]]:
+    """Return the run_stats stored with (stage, scope), or None if the stage never ran."""
+    return session.execute(text('''
+        SELECT run_stats
+        FROM pipeline_watermarks
+        WHERE stage = :stage AND scope = :scope
+    '''), {'stage': stage, 'scope': scope}).scalar()
+
+
+def set_watermark(
+    session,
+    stage: str,
+    scope: str,
+    watermark: datetime,
+    run_stats: Optional[Dict[str, Any]] = None
+) -> None:
+    """
+    Insert or advance the watermark for (stage, scope).
+
+    Does not commit; the caller commits it together with the work it covers.
+    """
+    session.execute(text('''
+        INSERT INTO pipeline_watermarks (id, stage, scope, watermark, run_stats, updated_at)
+        VALUES (gen_random_uuid(), :stage, :scope, :watermark, CAST(:run_stats AS JSONB), NOW())
+        ON CONFLICT (stage, scope) DO UPDATE
+        SET watermark = EXCLUDED.watermark,
+            run_stats = EXCLUDED.run_stats,
+            updated_at = NOW()
+    '''), {
+        'stage': stage,
+        'scope': scope,
+        'watermark': watermark,
+        'run_stats': json.dumps(run_stats or {}, default=str)
+    })
@@ -1,61 +1,129 @@
+import argparse
 import os
 import pandas as pd
-from shared.utils.utils import cfg, concatenate_files  # Import the already-loaded config
+from shared.utils.utils import cfg  # Import the already-loaded config
 from datetime import datetime
 
+# Tried in order; latin-1 decodes any byte sequence, so it is the last resort
+CSV_ENCODINGS = ('utf-8-sig', 'latin-1')
+
+def read_atom_csv(file_path, engine='c'):
+    """
+    Read an ATOM CSV export, falling back through CSV_ENCODINGS.
+
+    Args:
+        file_path: Path to the CSV file
+        engine: pandas CSV engine ('c' or 'pyarrow'); ATOM bodies contain
+            quoted newlines, which only the C engine handles reliably
+
+    Returns:
+        DataFrame with a clean 'Title' header (no byte order mark)
+    """
+    options = {'low_memory': False} if engine == 'c' else {}
+    for encoding in CSV_ENCODINGS:
+        try:
+            df = pd.read_csv(file_path, engine=engine, on_bad_lines='skip', encoding=encoding, **options)
+            break
+        except (UnicodeDecodeError, ValueError):
+            if encoding == CSV_ENCODINGS[-1]:
+                raise
+    # A UTF-8 byte order mark read as latin-1 ends up in the first header
+    df.columns = df.columns.str.replace('^(\ufeff|\u00ef\u00bb\u00bf)', '', regex=True)
+    return df
+
 def clean_atom_output(df,fields,process_body,filter_fields,qry=None):
-    try:
+    if 'Collection Name' in df.columns:
         df = df[df['Collection Name'] == cfg.atom_collection]
-    except:
-        pass
     df = df.dropna(subset=['Body'])
     cols = [col for col in df.columns if 'Unnamed' not in col]
-    df = df[cols]
+    df = df[cols].copy()
     df[cfg.text_field] = df['Body']
     if filter_fields:
-        
-        df = df[fields]
-    
+
+        df = df[fields].copy()
+
     if qry:
         df["Query"] = qry
-    
-    df.drop_duplicates('Title', inplace=True)
-    df[cfg.text_field] = [text.replace('\n', ' ').strip() for text in df['BODY']]
+
+    df = df.drop_duplicates('Title')
+    df[cfg.text_field] = df[cfg.text_field].astype(str).str.replace('\n', ' ', regex=False).str.strip()
 
     return df
 
-def process_atom_files(directory= './backend/atom', 
-                       output_directory = os.path.join(directory,'processed'),
+def process_atom_files(directory= './backend/atom',
+                       output_directory = None,
                        delete=True,
                        fields=cfg.fields['raw_atom'],
                        process_body=True,
-                       filter_fields=True):
-    
+                       filter_fields=True,
+                       engine='c',
+                       excel=False):
+    """
+    Clean every ATOM CSV in `directory` into a parquet file in `output_directory`.
+
+    Args:
+        directory: Folder with the raw ATOM CSV exports
+        output_directory: Destination folder (default: <directory>/processed)
+        delete: Remove each CSV once its cleaned output is written
+        engine: pandas CSV engine, see read_atom_csv
+        excel: Also write an .xlsx copy of each cleaned file for manual review
+    """
+    output_directory = output_directory or os.path.join(directory,'processed')
+    os.makedirs(output_directory, exist_ok=True)
+
     # Get the current date
     current_date = datetime.now().strftime("%Y-%m-%d")  # Format: YYYY-MM-DD
-    
+
     for filename in os.listdir(directory):
         if filename.endswith('.csv'):
             file_path = os.path.join(directory, filename)
-            # try:
-                # Read the CSV file
-            try:
-                df = pd.read_csv(file_path, engine='python',on_bad_lines='skip', encoding="utf-8-sig")
-            except:
-                df = pd.read_csv(file_path, engine='python',on_bad_lines='skip', encoding="latin-1")
-                df.rename(columns={'ï»¿Title': 'Title'}, inplace=True)
-            # except:
-            #     print(f'ERROR:{file_path}')
-            #     continue
+            df = read_atom_csv(file_path, engine=engine)
+
             # Clean the data
             cleaned_df = clean_atom_output(df,fields,process_body,filter_fields)
-            
+
             # Export the cleaned data
-            cleaned_file_path = os.path.join(output_directory, f'cleaned_{filename[:-4]}_{current_date}.xlsx')
-            cleaned_df.to_excel(cleaned_file_path, index=False)
+            cleaned_name = f'cleaned_{filename[:-4]}_{current_date}'
+            cleaned_df.to_parquet(os.path.join(output_directory, f'{cleaned_name}.parquet'), index=False)
+            if excel:
+                cleaned_df.to_excel(os.path.join(output_directory, f'{cleaned_name}.xlsx'), index=False)
+            print(f"{filename}: {len(cleaned_df)} articles -> {cleaned_name}.parquet")
             if delete:
                 #Delete the original file
                 os.remove(file_path)
 
+def read_atom_files(directory='./backend/atom/processed'):
+    """
+    Concatenate the cleaned ATOM files in `directory`.
+
+    Reads the parquet outputs of process_atom_files and the .xlsx exports of
+    older runs. A file written in both formats is read once, from parquet.
+    """
+    files = {}
+    for filename in sorted(os.listdir(directory)):
+        name, extension = os.path.splitext(filename)
+        if extension == '.parquet' or (extension == '.xlsx' and name not in files):
+            files[name] = filename
+
+    frames = []
+    for filename in files.values():
+        file_path = os.path.join(directory, filename)
+        if filename.endswith('.parquet'):
+            frames.append(pd.read_parquet(file_path))
+        else:
+            frames.append(pd.read_excel(file_path))
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True)
+
 if __name__ == "__main__":
-    process_atom_files()
+    parser = argparse.ArgumentParser(description="Clean raw ATOM CSV exports into parquet")
+    parser.add_argument("--directory", type=str, default='./backend/atom', help="Folder with raw ATOM CSVs (default: ./backend/atom)")
+    parser.add_argument("--output-directory", type=str, help="Destination folder (default: <directory>/processed)")
+    parser.add_argument("--engine", choices=['c', 'pyarrow'], default='c', help="pandas CSV engine (default: c)")
+    parser.add_argument("--excel", action='store_true', help="Also export each cleaned file as .xlsx")
+    parser.add_argument("--keep", action='store_true', help="Keep the raw CSVs after processing")
+    args = parser.parse_args()
+
+    process_atom_files(directory=args.directory, output_directory=args.output_directory,
+                       delete=not args.keep, engine=args.engine, excel=args.excel)
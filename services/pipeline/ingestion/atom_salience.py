@@ -6,7 +6,8 @@ import boto3
 from botocore.exceptions import ClientError
 from openai import AzureOpenAI
 from shared.utils.utils import Config, gai, fetch_gai_content
-from shared.utils.utils import find_json_objects,concatenate_files
+from shared.utils.utils import find_json_objects
+from services.pipeline.ingestion.atom import read_atom_files
 from collections import defaultdict
 import pandas as pd
 from datetime import datetime
@@ -35,7 +36,7 @@ def parse_date(date_str):
         return dt.strftime('%Y-%m-%d')
 
 def fetch_atom_files(directory="./backend/atom/processed"):
-    df = concatenate_files(directory)
+    df = read_atom_files(directory)
     if len(df)<1:
         print("No data loaded")
         return
@@ -1,13 +1,16 @@
-import json
+import io
 import os
 from shared.utils.utils import cfg  # Import the already-loaded config
-from shared.models.models import Document, RawEvent, Category, Subcategory, InitiatingCountry, RecipientCountry
+from shared.models.models import Document, Category, Subcategory, InitiatingCountry, RecipientCountry
 from shared.database.database import get_session, init_database, get_engine
 from services.pipeline.embeddings.embedding_vectorstore import chunk_store
 from datetime import datetime
 from sqlalchemy.sql import text
-from services.pipeline.embeddings.s3 import load_dsr_from_s3, reprocess_files, list_s3_json_files
-from typing import List, Optional
+from services.pipeline.embeddings.s3 import (
+    iter_json_file, stream_dsr_from_s3, mark_file_as_processed, reprocess_files, list_s3_json_files
+)
+from services.pipeline.events.dirty_markers import mark_dirty_documents
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 
 def split_multi(val):
     """Split multi-value fields by semicolon, following the dispatcher pattern."""
@@ -63,212 +66,311 @@ def move_file(src, dst):
     os.rename(src, dst)
     print(f"Moved {src} to {dst}")
 
-def load_dsr(directory=None,relocate=True):
-    if directory is None: 
+def stream_dsr(directory=None) -> Iterator[Tuple[str, Iterator[Dict]]]:
+    """
+    Stream local DSR JSON files without loading them into memory.
+
+    Yields:
+        (file_path, documents) where documents is a generator of raw DSR documents
+    """
+    if directory is None:
         directory = cfg.dsr_data
-        # Resolve the full directory path relative to this script
+    # Resolve the full directory path relative to this script
     base_dir = os.path.dirname(os.path.abspath(__file__))
     directory = os.path.abspath(os.path.join(base_dir, '..', '..', directory))
     print(f"Looking for files in: {directory}")
-    dsr = []
-    for filename in os.listdir(directory):
-        if filename.endswith('.json'):
-            if 'errors' in filename:
-                continue
+
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith('.json') and 'errors' not in filename:
             file = os.path.join(directory, filename)
-            with open(file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                dsr.append(data)
-                print(f'loaded {file}...')
-            if relocate:    
-                move_file(file,os.path.join(directory,'processed'))
-    print(f'{len(dsr)} documents loaded...')  
-    return dsr
+            yield file, iter_json_file(file)
+
+def relocate_processed_file(file: str):
+    """Move a fully loaded DSR file into the processed/ folder next to it."""
+    move_file(file, os.path.join(os.path.dirname(file), 'processed', os.path.basename(file)))
 
 def parse_date(date_str):
         # Parse the date string and convert it to the desired format
         dt = datetime.fromisoformat(date_str.replace("Z", "+00:00"))
         return dt.strftime('%Y-%m-%d')
 
-def flatten_events_to_raw_events(session, documents):
+# Relationship table -> value column, flattened from multi-value Document fields
+RELATIONSHIP_TABLES = {
+    'categories': 'category',
+    'subcategories': 'subcategory',
+    'initiating_countries': 'initiating_country',
+    'recipient_countries': 'recipient_country',
+    'raw_events': 'event_name',
+}
+
+DOCUMENT_COLUMNS = [column.name for column in Document.__table__.columns]
+
+
+def relationship_rows(documents) -> Dict[str, List[Tuple[str, str]]]:
     """
-    Flatten event_name, project_name, and projects fields from documents into RawEvent table.
+    Flatten ALL multi-value fields into (doc_id, value) rows per relationship table.
 
-    This consolidates all event/project mentions into a normalized many-to-many relationship.
+    Covers categories, subcategories, initiating/recipient countries and raw
+    events. Raw events combine event_name, project_name (legacy schema) and
+    projects, deduplicated per document.
 
     Args:
-        session: SQLAlchemy session
-        documents: List of Document objects to process
+        documents: Parsed Document objects
 
     Returns:
-        int: Number of RawEvent records created
+        dict: Relationship table name -> list of (doc_id, value) rows
     """
-    raw_events_to_insert = []
+    rows = {table: [] for table in RELATIONSHIP_TABLES}
 
     for doc in documents:
-        # Collect all unique event/project values from the document
-        event_values = set()
-
-        # Add from event_name field
-        if doc.event_name:
-            # Handle semicolon-separated values
-            for val in split_multi(doc.event_name):
-                if val:
-                    event_values.add(val)
-
-        # Add from project_name field (legacy schema)
-        if hasattr(doc, 'project_name') and doc.project_name:
-            for val in split_multi(doc.project_name):
-                if val and val not in event_values:
-                    event_values.add(val)
-
-        # Add from projects field
-        if hasattr(doc, 'projects') and doc.projects:
-            for val in split_multi(doc.projects):
-                if val and val not in event_values:
-                    event_values.add(val)
-
-        # Create RawEvent entries for each unique value
-        for event_value in event_values:
-            raw_events_to_insert.append({
-                'doc_id': doc.doc_id,
-                'event_name': event_value
-            })
-
-    # Bulk insert using ON CONFLICT DO NOTHING for idempotency
-    if raw_events_to_insert:
-        for event_record in raw_events_to_insert:
-            session.execute(
-                text("INSERT INTO raw_events (doc_id, event_name) VALUES (:doc_id, :event_name) ON CONFLICT (doc_id, event_name) DO NOTHING"),
-                event_record
-            )
-        print(f"[INFO] Flattened {len(raw_events_to_insert)} event/project entries into RawEvent table")
+        for table, field in (
+            ('categories', doc.category),
+            ('subcategories', doc.subcategory),
+            ('initiating_countries', doc.initiating_country),
+            ('recipient_countries', doc.recipient_country),
+        ):
+            rows[table].extend((doc.doc_id, value) for value in set(split_multi(field)))
+
+        event_values = set(split_multi(doc.event_name))
+        event_values.update(split_multi(doc.project_name))
+        event_values.update(split_multi(doc.projects))
+        rows['raw_events'].extend((doc.doc_id, value) for value in event_values)
+
+    return rows
+
+
+def _copy_value(value) -> str:
+    """Format one value for COPY ... FROM STDIN (text format)."""
+    if value is None:
+        return '\\N'
+    # Postgres text cannot hold NUL; escape the COPY delimiters
+    return (str(value).replace('\x00', '')
+            .replace('\\', '\\\\')
+            .replace('\t', '\\t')
+            .replace('\n', '\\n')
+            .replace('\r', '\\r'))
+
+
+def copy_rows(cursor, table: str, columns: List[str], rows) -> int:
+    """
+    COPY rows into a table over a psycopg2 cursor.
+
+    Returns:
+        Number of rows copied
+    """
+    buffer = io.StringIO()
+    count = 0
+    for row in rows:
+        buffer.write('\t'.join(_copy_value(value) for value in row))
+        buffer.write('\n')
+        count += 1
+
+    if count:
+        buffer.seek(0)
+        cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
+    return count
 
-    return len(raw_events_to_insert)
 
-def flatten_all_relationships(session, documents):
+class BulkDocumentLoader:
     """
-    Flatten ALL multi-value fields into normalized relationship tables.
+    Set-based loader for parsed DSR documents.
+
+    Documents are buffered into batches. Each batch:
+    1. Checks which doc_ids already exist with one query
+    2. COPYs new documents and the relationship rows of every document in the
+       batch into temp staging tables
+    3. Merges staging into documents and the five relationship tables with
+       INSERT ... SELECT ... ON CONFLICT DO NOTHING
+    4. Marks dirty (country, date) partitions for the new documents and commits
+
+    Relationships are still flattened for documents that already exist, as
+    before, so re-running a file repairs missing relationship rows.
+
+    Usage:
+        with get_session() as session:
+            loader = BulkDocumentLoader(session, batch_size=1000)
+            for doc in documents:
+                loader.add(doc)
+            loader.flush()
+            print(loader.stats, len(loader.new_doc_ids))
+    """
+
+    def __init__(self, session, batch_size: int = 1000):
+        """
+        Args:
+            session: Database session (each batch is committed on it)
+            batch_size: Documents per COPY batch
+        """
+        self.session = session
+        self.batch_size = batch_size
+        self.batch = []
+        self.batch_doc_ids = set()  # Track doc_ids in current batch to prevent within-batch duplicates
+        self.new_doc_ids = []
+        self.stats = {'loaded': 0, 'existing': 0, 'duplicates': 0, 'batches': 0}
+        self.relationship_counts = {table: 0 for table in RELATIONSHIP_TABLES}
+
+    def add(self, doc: Document):
+        """Buffer a parsed document; flushes when the batch is full."""
+        if doc.doc_id in self.batch_doc_ids:
+            print(f"[WARNING]  Document {doc.doc_id} is a duplicate within the same batch. Skipping...")
+            self.stats['duplicates'] += 1
+            return
+
+        self.batch.append(doc)
+        self.batch_doc_ids.add(doc.doc_id)
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def _create_staging_tables(self):
+        # Temp tables live per connection; ON COMMIT DELETE ROWS empties them after every batch
+        self.session.execute(text(
+            "CREATE TEMP TABLE IF NOT EXISTS dsr_stage_documents "
+            "(LIKE documents INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+        ))
+        for table in RELATIONSHIP_TABLES:
+            self.session.execute(text(
+                f"CREATE TEMP TABLE IF NOT EXISTS dsr_stage_{table} "
+                f"(LIKE {table}) ON COMMIT DELETE ROWS"
+            ))
+
+    def flush(self):
+        """Load and commit the buffered batch."""
+        if not self.batch:
+            return
+
+        batch = self.batch
+        self.batch = []
+        self.batch_doc_ids = set()
+
+        existing = set(self.session.execute(
+            text("SELECT doc_id FROM documents WHERE doc_id = ANY(:doc_ids)"),
+            {'doc_ids': [doc.doc_id for doc in batch]}
+        ).scalars())
+        new_docs = [doc for doc in batch if doc.doc_id not in existing]
+
+        self._create_staging_tables()
+        cursor = self.session.connection().connection.cursor()
+        try:
+            copy_rows(
+                cursor, 'dsr_stage_documents', DOCUMENT_COLUMNS,
+                (tuple(getattr(doc, column) for column in DOCUMENT_COLUMNS) for doc in new_docs)
+            )
+            for table, rows in relationship_rows(batch).items():
+                copy_rows(cursor, f'dsr_stage_{table}', ['doc_id', RELATIONSHIP_TABLES[table]], rows)
+        finally:
+            cursor.close()
+
+        columns = ', '.join(DOCUMENT_COLUMNS)
+        inserted = set(self.session.execute(text(f"""
+            INSERT INTO documents ({columns})
+            SELECT {columns} FROM dsr_stage_documents
+            ON CONFLICT (doc_id) DO NOTHING
+            RETURNING doc_id
+        """)).scalars())
+
+        for table, column in RELATIONSHIP_TABLES.items():
+            result = self.session.execute(text(f"""
+                INSERT INTO {table} (doc_id, {column})
+                SELECT DISTINCT doc_id, {column} FROM dsr_stage_{table}
+                ON CONFLICT (doc_id, {column}) DO NOTHING
+            """))
+            self.relationship_counts[table] += result.rowcount
+
+        loaded_docs = [doc for doc in new_docs if doc.doc_id in inserted]
+        # Queue (country, date) partitions for process_dirty_markers.py
+        mark_dirty_documents(self.session, loaded_docs)
+        self.session.commit()
+
+        self.new_doc_ids.extend(doc.doc_id for doc in loaded_docs)
+        self.stats['loaded'] += len(loaded_docs)
+        # Includes documents inserted concurrently between the check and the merge
+        self.stats['existing'] += len(batch) - len(loaded_docs)
+        self.stats['batches'] += 1
+        print(f"[SUCCESS] Committed batch of {len(loaded_docs)} new documents "
+              f"({len(batch) - len(loaded_docs)} already in database)")
+
+
+def load_dsr_documents(session, dsr_files, batch_size: int = 1000, on_file_loaded: Optional[Callable[[str], None]] = None) -> Dict:
+    """
+    Parse DSR files and bulk-load their documents with BulkDocumentLoader.
 
-    This creates one-to-many relationships for:
-    - Categories
-    - Subcategories
-    - Initiating Countries
-    - Recipient Countries
-    - Events/Projects (via flatten_events_to_raw_events)
+    Documents are pulled from each file only as fast as batches are committed,
+    so with streamed files (stream_dsr, stream_dsr_from_s3) memory holds at
+    most one batch, whatever the number or size of files. Each file's last
+    batch is flushed before moving on, then on_file_loaded(name) is called;
+    a file that fails to read part-way keeps the documents already loaded but
+    is not reported as loaded.
 
     Args:
-        session: SQLAlchemy session
-        documents: List of Document objects to process
+        session: Database session
+        dsr_files: Iterable of (name, documents) where documents iterates raw DSR documents
+        batch_size: Documents per COPY batch
+        on_file_loaded: Called with the file name once all its documents are committed
 
     Returns:
-        dict: Count of records created for each relationship type
-    """
-    counts = {
-        'categories': 0,
-        'subcategories': 0,
-        'initiating_countries': 0,
-        'recipient_countries': 0,
-        'raw_events': 0
-    }
+        dict: new_doc_ids, loaded, skipped, errors, files, relationships
+    """
+    loader = BulkDocumentLoader(session, batch_size=batch_size)
+    invalid_count = 0
+    error_count = 0
+    files_loaded = 0
+
+    for name, dsr_docs in dsr_files:
+        print(f'Loading documents from {name}...')
+        file_doc_count = 0
+        file_failed = False
+
+        documents = iter(dsr_docs)
+        while True:
+            try:
+                dsr_doc = next(documents)
+            except StopIteration:
+                break
+            except Exception as e:
+                print(f"[ERROR] Failed reading {name} after {file_doc_count} documents: {e}")
+                error_count += 1
+                file_failed = True
+                break
+
+            file_doc_count += 1
+            try:
+                doc = parse_doc(dsr_doc)
+            except Exception as e:
+                print(f'Error processing {dsr_doc.get("id")}: {e}')
+                error_count += 1
+                continue
 
-    # Collect all records to insert
-    categories_to_insert = []
-    subcategories_to_insert = []
-    init_countries_to_insert = []
-    rec_countries_to_insert = []
+            if doc:
+                loader.add(doc)
+            else:
+                print(f"Skipped document: {dsr_doc.get('id')}")
+                invalid_count += 1
 
-    for doc in documents:
-        # Process categories (use set to avoid duplicates)
-        if doc.category:
-            unique_cats = set(split_multi(doc.category))
-            for cat in unique_cats:
-                if cat:
-                    categories_to_insert.append({
-                        'doc_id': doc.doc_id,
-                        'category': cat
-                    })
-
-        # Process subcategories (use set to avoid duplicates)
-        if doc.subcategory:
-            unique_subs = set(split_multi(doc.subcategory))
-            for sub in unique_subs:
-                if sub:
-                    subcategories_to_insert.append({
-                        'doc_id': doc.doc_id,
-                        'subcategory': sub
-                    })
-
-        # Process initiating countries (use set to avoid duplicates)
-        if doc.initiating_country:
-            unique_ics = set(split_multi(doc.initiating_country))
-            for ic in unique_ics:
-                if ic:
-                    init_countries_to_insert.append({
-                        'doc_id': doc.doc_id,
-                        'initiating_country': ic
-                    })
-
-        # Process recipient countries (use set to avoid duplicates)
-        if doc.recipient_country:
-            unique_rcs = set(split_multi(doc.recipient_country))
-            for rc in unique_rcs:
-                if rc:
-                    rec_countries_to_insert.append({
-                        'doc_id': doc.doc_id,
-                        'recipient_country': rc
-                    })
-
-    # Bulk insert all relationships using ON CONFLICT DO NOTHING for idempotency
-    # Categories
-    if categories_to_insert:
-        for cat_record in categories_to_insert:
-            session.execute(
-                text("INSERT INTO categories (doc_id, category) VALUES (:doc_id, :category) ON CONFLICT (doc_id, category) DO NOTHING"),
-                cat_record
-            )
-        counts['categories'] = len(categories_to_insert)
-
-    # Subcategories
-    if subcategories_to_insert:
-        for sub_record in subcategories_to_insert:
-            session.execute(
-                text("INSERT INTO subcategories (doc_id, subcategory) VALUES (:doc_id, :subcategory) ON CONFLICT (doc_id, subcategory) DO NOTHING"),
-                sub_record
-            )
-        counts['subcategories'] = len(subcategories_to_insert)
-
-    # Initiating Countries
-    if init_countries_to_insert:
-        for ic_record in init_countries_to_insert:
-            session.execute(
-                text("INSERT INTO initiating_countries (doc_id, initiating_country) VALUES (:doc_id, :initiating_country) ON CONFLICT (doc_id, initiating_country) DO NOTHING"),
-                ic_record
-            )
-        counts['initiating_countries'] = len(init_countries_to_insert)
-
-    # Recipient Countries
-    if rec_countries_to_insert:
-        for rc_record in rec_countries_to_insert:
-            session.execute(
-                text("INSERT INTO recipient_countries (doc_id, recipient_country) VALUES (:doc_id, :recipient_country) ON CONFLICT (doc_id, recipient_country) DO NOTHING"),
-                rc_record
-            )
-        counts['recipient_countries'] = len(rec_countries_to_insert)
+        loader.flush()
+        if file_failed:
+            continue
 
-    # Events/Projects
-    event_count = flatten_events_to_raw_events(session, documents)
-    counts['raw_events'] = event_count
+        files_loaded += 1
+        print(f"[OK] {name}: {file_doc_count} documents read")
+        if on_file_loaded:
+            on_file_loaded(name)
 
-    # Print summary
-    print(f"[INFO] Flattened relationships:")
-    print(f"   - Categories: {counts['categories']}")
-    print(f"   - Subcategories: {counts['subcategories']}")
-    print(f"   - Initiating Countries: {counts['initiating_countries']}")
-    print(f"   - Recipient Countries: {counts['recipient_countries']}")
-    print(f"   - Raw Events: {counts['raw_events']}")
 
-    return counts
+    print(f"[INFO] Flattened relationships (new rows):")
+    print(f"   - Categories: {loader.relationship_counts['categories']}")
+    print(f"   - Subcategories: {loader.relationship_counts['subcategories']}")
+    print(f"   - Initiating Countries: {loader.relationship_counts['initiating_countries']}")
+    print(f"   - Recipient Countries: {loader.relationship_counts['recipient_countries']}")
+    print(f"   - Raw Events: {loader.relationship_counts['raw_events']}")
+
+    return {
+        'new_doc_ids': loader.new_doc_ids,
+        'loaded': loader.stats['loaded'],
+        'skipped': loader.stats['existing'] + loader.stats['duplicates'] + invalid_count,
+        'errors': error_count,
+        'files': files_loaded,
+        'relationships': loader.relationship_counts,
+    }
 
 def parse_doc(dsr_doc):
     """
@@ -378,7 +480,7 @@ def parse_doc(dsr_doc):
 
     return doc
    
-def process_dsr(relocate=True, batch_size=100):
+def process_dsr(relocate=True, batch_size=1000):
     """
     Process DSR JSON files and load them into the database efficiently.
     Documents are loaded in batches for better performance.
@@ -387,89 +489,23 @@ def process_dsr(relocate=True, batch_size=100):
         relocate (bool): Whether to move processed files to processed folder
         batch_size (int): Number of documents to process in each batch
     """
-    dsr = load_dsr(directory=cfg.dsr_data, relocate=relocate)
-
     # Initialize database tables if they don't exist
     init_database()
 
-    loaded_count = 0
-    skipped_count = 0
-    error_count = 0
-    new_doc_ids = []
-
     print(f"Processing DSR documents in batches of {batch_size}...")
 
     with get_session() as session:
-        document_batch = []
-        batch_doc_ids = set()  # Track doc_ids in current batch to prevent within-batch duplicates
-
-        for dsr_docs in dsr:
-            print(f'Loading {len(dsr_docs)} documents from DSR file...')
-
-            for dsr_doc in dsr_docs:
-                try:
-                    doc = parse_doc(dsr_doc)
-                except Exception as e:
-                    print(f'Error processing {dsr_doc["id"]}: {e}')
-                    error_count += 1
-                    continue
-
-                if doc:
-                    # Check if document already exists in database
-                    existing_doc = session.query(Document).filter_by(doc_id=doc.doc_id).first()
-                    if existing_doc:
-                        print(f"Document {doc.doc_id} already exists in database. Flattening all relationships...")
-                        skipped_count += 1
-                        # Flatten ALL relationships for existing documents (Categories, Subcategories, Countries, Events)
-                        flatten_all_relationships(session, [doc])
-                        session.commit()
-                        continue
-
-                    # Check if document already exists in current batch (within-batch duplicate)
-                    if doc.doc_id in batch_doc_ids:
-                        print(f"[WARNING]  Document {doc.doc_id} is a duplicate within the same batch. Skipping...")
-                        skipped_count += 1
-                        continue
-
-                    # Add to batch
-                    document_batch.append(doc)
-                    batch_doc_ids.add(doc.doc_id)
-                    new_doc_ids.append(doc.doc_id)
-                    loaded_count += 1
-
-                    # Process batch when it reaches batch_size
-                    if len(document_batch) >= batch_size:
-                        session.add_all(document_batch)
-                        session.commit()
-                        print(f"[SUCCESS] Committed batch of {len(document_batch)} documents")
-
-                        # Flatten all relationship fields (Categories, Subcategories, Countries, Events)
-                        flatten_all_relationships(session, document_batch)
-                        session.commit()
-
-                        document_batch = []
-                        batch_doc_ids = set()  # Reset batch tracker
-
-                else:
-                    print(f"Skipped document: {dsr_doc['id']}")
-                    skipped_count += 1
-
-        # Process remaining documents in the final batch
-        if document_batch:
-            session.add_all(document_batch)
-            session.commit()
-            print(f"[SUCCESS] Committed final batch of {len(document_batch)} documents")
-
-            # Flatten all relationship fields (Categories, Subcategories, Countries, Events)
-            flatten_all_relationships(session, document_batch)
-            session.commit()
+        result = load_dsr_documents(
+            session, stream_dsr(directory=cfg.dsr_data), batch_size=batch_size,
+            on_file_loaded=relocate_processed_file if relocate else None
+        )
 
     print(f"\nDSR Processing complete:")
-    print(f"  - Loaded: {loaded_count} documents")
-    print(f"  - Skipped: {skipped_count} documents")
-    print(f"  - Errors: {error_count} documents")
+    print(f"  - Loaded: {result['loaded']} documents")
+    print(f"  - Skipped: {result['skipped']} documents")
+    print(f"  - Errors: {result['errors']} documents")
 
-    return new_doc_ids
+    return result['new_doc_ids']
 
 def dispatch_embedding_tasks(doc_ids, batch_size=50):
     """
@@ -568,7 +604,8 @@ def embed_documents_direct(doc_ids, batch_size=50):
 
     print(f"[COMPLETE] Direct embedding complete: {embedded_count} documents embedded")
 
-def process_dsr_s3(s3_prefix: str = "dsr_extracts/", specific_files: Optional[List[str]] = None, batch_size: int = 100):
+def process_dsr_s3(s3_prefix: str = "dsr_extracts/", specific_files: Optional[List[str]] = None, batch_size: int = 1000,
+                   prefetch: int = 2):
     """
     Process DSR JSON files from S3 bucket and load them into the database.
 
@@ -576,101 +613,46 @@ def process_dsr_s3(s3_prefix: str = "dsr_extracts/", specific_files: Optional[Li
         s3_prefix (str): S3 prefix/folder to search for JSON files
         specific_files (Optional[List[str]]): Optional list of specific filenames to process
         batch_size (int): Number of documents to process in each batch
+        prefetch (int): Files downloaded in the background while the current one loads (0 = stream directly)
 
     Returns:
         List of new document IDs that were loaded
     """
-    # Load DSR data from S3
-    dsr_data = load_dsr_from_s3(s3_prefix=s3_prefix, specific_files=specific_files)
-
-    if not dsr_data:
-        print("No DSR data loaded from S3")
-        return []
-
     # Initialize database tables if they don't exist
     init_database()
 
-    loaded_count = 0
-    skipped_count = 0
-    error_count = 0
-    new_doc_ids = []
-
     print(f"Processing DSR documents from S3 in batches of {batch_size}...")
 
-    with get_session() as session:
-        document_batch = []
-        batch_doc_ids = set()  # Track doc_ids in current batch to prevent within-batch duplicates
+    # Files are streamed and parsed as they download; a file is marked as
+    # processed only once its documents are committed (not for specific files)
+    etags = {}
 
-        for dsr_docs in dsr_data:
-            print(f'Loading {len(dsr_docs)} documents from S3 DSR file...')
+    def dsr_files():
+        for file_info, documents in stream_dsr_from_s3(s3_prefix=s3_prefix, specific_files=specific_files, prefetch=prefetch):
+            etags[file_info['filename']] = file_info.get('etag')
+            yield file_info['filename'], documents
 
-            for dsr_doc in dsr_docs:
-                try:
-                    doc = parse_doc(dsr_doc)
-                except Exception as e:
-                    print(f'Error processing {dsr_doc["id"]}: {e}')
-                    error_count += 1
-                    continue
+    on_file_loaded = None if specific_files else (
+        lambda filename: mark_file_as_processed(filename, s3_prefix, etag=etags.get(filename))
+    )
 
-                if doc:
-                    # Check if document already exists in database
-                    existing_doc = session.query(Document).filter_by(doc_id=doc.doc_id).first()
-                    if existing_doc:
-                        print(f"Document {doc.doc_id} already exists in database. Flattening all relationships...")
-                        skipped_count += 1
-                        # Flatten ALL relationships for existing documents (Categories, Subcategories, Countries, Events)
-                        flatten_all_relationships(session, [doc])
-                        session.commit()
-                        continue
-
-                    # Check if document already exists in current batch (within-batch duplicate)
-                    if doc.doc_id in batch_doc_ids:
-                        print(f"[WARNING]  Document {doc.doc_id} is a duplicate within the same batch. Skipping...")
-                        skipped_count += 1
-                        continue
-
-                    # Add to batch
-                    document_batch.append(doc)
-                    batch_doc_ids.add(doc.doc_id)
-                    new_doc_ids.append(doc.doc_id)
-                    loaded_count += 1
-
-                    # Process batch when it reaches batch_size
-                    if len(document_batch) >= batch_size:
-                        session.add_all(document_batch)
-                        session.commit()
-                        print(f"[SUCCESS] Committed batch of {len(document_batch)} documents")
-
-                        # Flatten all relationship fields (Categories, Subcategories, Countries, Events)
-                        flatten_all_relationships(session, document_batch)
-                        session.commit()
-
-                        document_batch = []
-                        batch_doc_ids = set()  # Reset batch tracker
-
-                else:
-                    print(f"Skipped document: {dsr_doc['id']}")
-                    skipped_count += 1
-
-        # Process remaining documents in the final batch
-        if document_batch:
-            session.add_all(document_batch)
-            session.commit()
-            print(f"[SUCCESS] Committed final batch of {len(document_batch)} documents")
-
-            # Flatten all relationship fields (Categories, Subcategories, Countries, Events)
-            flatten_all_relationships(session, document_batch)
-            session.commit()
+    with get_session() as session:
+        result = load_dsr_documents(session, dsr_files(), batch_size=batch_size, on_file_loaded=on_file_loaded)
+
+    if not result['files'] and not result['errors']:
+        print("No DSR data loaded from S3")
+        return []
 
     print(f"\nS3 DSR Processing complete:")
-    print(f"  - Loaded: {loaded_count} documents")
-    print(f"  - Skipped: {skipped_count} documents")
-    print(f"  - Errors: {error_count} documents")
+    print(f"  - Loaded: {result['loaded']} documents")
+    print(f"  - Skipped: {result['skipped']} documents")
+    print(f"  - Errors: {result['errors']} documents")
 
-    return new_doc_ids
+    return result['new_doc_ids']
 
 def process_dsr_s3_with_embedding(s3_prefix: str = "dsr_extracts/", specific_files: Optional[List[str]] = None,
-                                doc_batch_size: int = 100, embed_batch_size: int = 50, use_celery: bool = True):
+                                doc_batch_size: int = 1000, embed_batch_size: int = 50, use_celery: bool = True,
+                                prefetch: int = 2):
     """
     Complete S3 DSR processing workflow: load documents from S3 then dispatch embedding tasks.
 
@@ -680,10 +662,12 @@ def process_dsr_s3_with_embedding(s3_prefix: str = "dsr_extracts/", specific_fil
         doc_batch_size (int): Batch size for document loading
         embed_batch_size (int): Batch size for embedding tasks
         use_celery (bool): Whether to use Celery for parallel embedding
+        prefetch (int): Files downloaded in the background while the current one loads
     """
     # Step 1: Load documents from S3 to database
     print("[START] Step 1: Loading DSR documents from S3 to database...")
-    new_doc_ids = process_dsr_s3(s3_prefix=s3_prefix, specific_files=specific_files, batch_size=doc_batch_size)
+    new_doc_ids = process_dsr_s3(s3_prefix=s3_prefix, specific_files=specific_files, batch_size=doc_batch_size,
+                                 prefetch=prefetch)
 
     if not new_doc_ids:
         print("No new documents to embed")
@@ -698,7 +682,8 @@ def process_dsr_s3_with_embedding(s3_prefix: str = "dsr_extracts/", specific_fil
         embed_documents_direct(new_doc_ids, batch_size=embed_batch_size)
 
 def reprocess_s3_files(filenames: List[str], s3_prefix: str = "dsr_extracts/",
-                      doc_batch_size: int = 100, embed_batch_size: int = 50, use_celery: bool = True):
+                      doc_batch_size: int = 1000, embed_batch_size: int = 50, use_celery: bool = True,
+                      prefetch: int = 2):
     """
     Reprocess specific files from S3 by removing them from processed list and running the full workflow.
 
@@ -708,6 +693,7 @@ def reprocess_s3_files(filenames: List[str], s3_prefix: str = "dsr_extracts/",
         doc_batch_size (int): Batch size for document loading
         embed_batch_size (int): Batch size for embedding tasks
         use_celery (bool): Whether to use Celery for parallel embedding
+        prefetch (int): Files downloaded in the background while the current one loads
     """
     print(f"[PROCESS] Reprocessing {len(filenames)} files from S3...")
 
@@ -720,7 +706,8 @@ def reprocess_s3_files(filenames: List[str], s3_prefix: str = "dsr_extracts/",
         specific_files=filenames,
         doc_batch_size=doc_batch_size,
         embed_batch_size=embed_batch_size,
-        use_celery=use_celery
+        use_celery=use_celery,
+        prefetch=prefetch
     )
 
 def list_s3_dsr_status(s3_prefix: str = "dsr_extracts/"):
@@ -752,7 +739,7 @@ def list_s3_dsr_status(s3_prefix: str = "dsr_extracts/"):
     if tracker_data.get('last_updated'):
         print(f"\n[TIME] Last tracker update: {tracker_data['last_updated']}")
 
-def process_dsr_with_embedding(relocate=True, doc_batch_size=100, embed_batch_size=50, use_celery=True):
+def process_dsr_with_embedding(relocate=True, doc_batch_size=1000, embed_batch_size=50, use_celery=True):
     """
     Complete DSR processing workflow: load documents then dispatch embedding tasks.
 
@@ -796,9 +783,11 @@ if __name__ == "__main__":
     parser.add_argument("--s3-files", nargs="+", help="Specific S3 files to process (S3 only)")
     parser.add_argument("--reprocess", nargs="+", help="Reprocess specific files by removing from processed list (S3 only)")
     parser.add_argument("--status", action="store_true", help="Show S3 processing status (S3 only)")
+    parser.add_argument("--prefetch", type=int, default=2,
+                       help="Files downloaded in the background while the current one loads; 0 streams each file directly (S3 only, default: 2)")
 
     # General processing options
-    parser.add_argument("--doc-batch-size", type=int, default=100, help="Batch size for document loading (default: 100)")
+    parser.add_argument("--doc-batch-size", type=int, default=1000, help="Documents per COPY batch (default: 1000)")
     parser.add_argument("--embed-batch-size", type=int, default=50, help="Batch size for embedding tasks (default: 50)")
     parser.add_argument("--no-embed", action="store_true", help="Skip embedding processing")
     parser.add_argument("--no-celery", action="store_true", help="Use direct embedding instead of Celery workers")
@@ -817,7 +806,8 @@ if __name__ == "__main__":
                 s3_prefix=args.s3_prefix,
                 doc_batch_size=args.doc_batch_size,
                 embed_batch_size=args.embed_batch_size,
-                use_celery=not args.no_celery
+                use_celery=not args.no_celery,
+                prefetch=args.prefetch
             )
         elif args.no_embed:
             # Just load documents from S3 without embedding
@@ -825,7 +815,8 @@ if __name__ == "__main__":
             new_doc_ids = process_dsr_s3(
                 s3_prefix=args.s3_prefix,
                 specific_files=args.s3_files,
-                batch_size=args.doc_batch_size
+                batch_size=args.doc_batch_size,
+                prefetch=args.prefetch
             )
             print(f"[SUCCESS] Loaded {len(new_doc_ids)} new documents")
         else:
@@ -836,7 +827,8 @@ if __name__ == "__main__":
                 specific_files=args.s3_files,
                 doc_batch_size=args.doc_batch_size,
                 embed_batch_size=args.embed_batch_size,
-                use_celery=not args.no_celery
+                use_celery=not args.no_celery,
+                prefetch=args.prefetch
             )
     else:
         # Local processing (original behavior)
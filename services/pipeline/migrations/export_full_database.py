@@ -43,6 +43,7 @@ sys.path.insert(0, str(project_root))
 
 from sqlalchemy import text
 from shared.database.database import get_engine, get_session
+from shared.utils.vector_codec import decode_float32
 
 # Optional S3 support
 try:
@@ -114,7 +115,7 @@ EXPORT_ORDER = [
                 first_mention_date, last_mention_date, total_mention_days, total_articles,
                 story_phase, days_since_last_mention, unique_sources, source_count,
                 peak_mention_date, peak_daily_article_count, consolidated_description,
-                key_facts, embedding_vector, alternative_names, primary_categories,
+                key_facts, CAST(embedding_vector AS REAL[]) AS embedding_vector, alternative_names, primary_categories,
                 primary_recipients, material_score, material_justification
             FROM canonical_events
             ORDER BY initiating_country, first_mention_date, id
@@ -235,6 +236,10 @@ def convert_columns_for_parquet(df: pd.DataFrame) -> pd.DataFrame:
                     # pd.isna() can fail on arrays/sequences, continue processing
                     pass
 
+                # float32 blob (event_clusters.centroid_embedding)
+                if isinstance(val, (bytes, memoryview)):
+                    return decode_float32([bytes(val)])[0].tolist()
+
                 # Already a list or numpy array
                 if isinstance(val, (list, np.ndarray)):
                     # Convert numpy array to list
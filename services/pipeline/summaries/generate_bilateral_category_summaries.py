@@ -36,6 +36,7 @@ if sys.platform == "win32":
 from shared.database.database import get_session
 from shared.models.models import BilateralCategorySummary
 from shared.utils.utils import Config, gai
+from shared.utils.llm_cache import add_llm_cache_args, apply_llm_cache_args
 
 
 # AI Prompt for bilateral category analysis
@@ -625,10 +626,13 @@ def main():
     parser.add_argument(
         '--regenerate',
         action='store_true',
-        help='Regenerate existing summaries (update with fresh AI analysis)'
+        help='Regenerate existing summaries (update with fresh AI analysis; bypasses cached LLM responses)'
     )
 
+    add_llm_cache_args(parser)
+
     args = parser.parse_args()
+    apply_llm_cache_args(args, refresh_flags=['regenerate'])
 
     # Load config
     config = Config.from_yaml('shared/config/config.yaml')
@@ -49,6 +49,7 @@ from shared.models.models import (
     PeriodType, EventSourceLink
 )
 from shared.utils.utils import gai, Config
+from shared.utils.llm_cache import add_llm_cache_args, apply_llm_cache_args
 
 
 # AI prompt for generating bilateral relationship summaries
@@ -686,7 +687,7 @@ def main():
     parser.add_argument(
         '--regenerate',
         action='store_true',
-        help='Regenerate existing summaries'
+        help='Regenerate existing summaries (bypasses cached LLM responses)'
     )
 
     parser.add_argument(
@@ -702,7 +703,10 @@ def main():
         help='Path to config file'
     )
 
+    add_llm_cache_args(parser)
+
     args = parser.parse_args()
+    apply_llm_cache_args(args, refresh_flags=['regenerate'])
 
     # Validate arguments
     if not args.all and not args.init_country:
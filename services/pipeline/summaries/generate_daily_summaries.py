@@ -34,6 +34,7 @@ from shared.models.models import (
     Document, PeriodType
 )
 from shared.utils.utils import gai, Config
+from shared.utils.llm_cache import add_llm_cache_args, apply_llm_cache_args
 from shared.utils.citation_utils import (
     build_hyperlink, get_citations_for_doc_ids
 )
@@ -464,7 +465,10 @@ def main():
         help='DEPRECATED: Now processes all events with ≥3 articles (parameter kept for backward compatibility)'
     )
 
+    add_llm_cache_args(parser)
+
     args = parser.parse_args()
+    apply_llm_cache_args(args)
 
     # Validate arguments
     if not (args.country or args.influencers):
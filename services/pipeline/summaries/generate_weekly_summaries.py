@@ -21,6 +21,7 @@ from uuid import UUID
 from shared.database.database import get_session
 from shared.models.models import EventSummary, PeriodType, EventStatus, EventSourceLink
 from shared.utils.utils import gai
+from shared.utils.llm_cache import add_llm_cache_args, apply_llm_cache_args
 from services.pipeline.summaries.summary_prompts import WEEKLY_SUMMARY_PROMPT
 
 
@@ -338,7 +339,10 @@ def main():
     # Options
     parser.add_argument('--dry-run', action='store_true', help='Preview without saving to database')
 
+    add_llm_cache_args(parser)
+
     args = parser.parse_args()
+    apply_llm_cache_args(args)
 
     # Parse dates
     start_date = datetime.strptime(args.start_date, '%Y-%m-%d').date()
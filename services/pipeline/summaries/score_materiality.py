@@ -25,6 +25,7 @@ if sys.platform == "win32":
 from sqlalchemy import text
 from shared.database.database import get_session
 from shared.utils.utils import Config, gai
+from shared.utils.llm_cache import add_llm_cache_args, apply_llm_cache_args
 from services.pipeline.summaries.summary_prompts import MATERIALITY_SCORE_PROMPT
 
 
@@ -335,13 +336,16 @@ def main():
 
     # Options
     parser.add_argument('--rescore', action='store_true',
-                       help='Rescore events that already have scores')
+                       help='Rescore events that already have scores (bypasses cached LLM responses)')
     parser.add_argument('--dry-run', action='store_true',
                        help='Test without updating database')
     parser.add_argument('--quiet', action='store_true',
                        help='Suppress verbose output')
 
+    add_llm_cache_args(parser)
+
     args = parser.parse_args()
+    apply_llm_cache_args(args, refresh_flags=['rescore'])
 
     # Parse dates
     start_date = datetime.strptime(args.start_date, '%Y-%m-%d').date()
@@ -31,6 +31,7 @@ sys.path.insert(0, str(project_root))
 from shared.database.database import get_session
 from shared.models.models import PeriodType
 from shared.config.config import Config
+from shared.utils.llm_cache import add_llm_cache_args, apply_llm_cache_args
 from services.publication.publication_service import PublicationService
 
 
@@ -129,7 +130,10 @@ def main():
         help='Use existing EventSummary data (default: True)'
     )
 
+    add_llm_cache_args(parser)
+
     args = parser.parse_args()
+    apply_llm_cache_args(args)
 
     # Parse arguments
     try:
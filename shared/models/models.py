@@ -8,11 +8,12 @@ from enum import Enum as PyEnum
 from sqlalchemy import (
     Column, Integer, String, Text, Date, Float, BigInteger,
     DateTime, Boolean, ForeignKey, UniqueConstraint, Index,
-    PrimaryKeyConstraint, func, Enum, CheckConstraint, Numeric
+    PrimaryKeyConstraint, func, Enum, CheckConstraint, Numeric, LargeBinary, text
 )
 
 # PostgreSQL-specific types
 from sqlalchemy.dialects.postgresql import UUID, ARRAY, JSONB
+from pgvector.sqlalchemy import Vector
 
 # Modern SQLAlchemy 2.0 ORM imports
 from sqlalchemy.orm import relationship, Mapped, mapped_column, validates
@@ -552,6 +553,11 @@ class CanonicalEvent(Base):
     llm_validated: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     llm_validated_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
 
+    # Creation time (drives incremental Stage 2A consolidation watermarks). Set by the
+    # database only: the watermark compares it with transaction start times, so it must
+    # come from the same clock as now()
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now(), nullable=False)
+
     # Core identity
     canonical_name: Mapped[str] = mapped_column(Text, nullable=False)
     initiating_country: Mapped[str] = mapped_column(Text, nullable=False)
@@ -578,8 +584,8 @@ class CanonicalEvent(Base):
     consolidated_description: Mapped[Optional[str]] = mapped_column(Text)
     key_facts: Mapped[Dict[str, str]] = mapped_column(JSONB, default=dict)  # Facts extracted from articles
     
-    # For matching
-    embedding_vector: Mapped[Optional[List[float]]] = mapped_column(ARRAY(Float))
+    # For matching (all-MiniLM-L6-v2 embedding; HNSW cosine index, see canonical_event_index.py)
+    embedding_vector: Mapped[Optional[List[float]]] = mapped_column(Vector(384))
     alternative_names: Mapped[List[str]] = mapped_column(ARRAY(Text), default=list)  # Different headlines for same event
     
     # Metadata
@@ -607,6 +613,11 @@ class CanonicalEvent(Base):
         Index("ix_canonical_event_days_since", "days_since_last_mention"),
         Index("ix_canonical_event_master", "master_event_id"),
         Index("ix_canonical_event_llm_validated", "llm_validated"),
+        Index("ix_canonical_event_country_created", "initiating_country", "created_at"),
+        Index("ix_canonical_event_embedding_hnsw", "embedding_vector",
+              postgresql_using="hnsw",
+              postgresql_with={"m": 16, "ef_construction": 64},
+              postgresql_ops={"embedding_vector": "vector_cosine_ops"}),
     )
 
 class DailyEventMention(Base):
@@ -681,7 +692,8 @@ class EventCluster(Base):
     is_noise: Mapped[bool] = mapped_column(Boolean, default=False)  # DBSCAN label = -1
 
     # Embedding information (for later analysis/refinement)
-    centroid_embedding: Mapped[Optional[List[float]]] = mapped_column(ARRAY(Float))
+    # Big-endian float32 blob (shared/utils/vector_codec.py: encode_float32 / decode_float32)
+    centroid_embedding: Mapped[Optional[bytes]] = mapped_column(LargeBinary)
     representative_name: Mapped[Optional[str]] = mapped_column(Text)  # Most central event name
 
     # Processing status
@@ -700,6 +712,34 @@ class EventCluster(Base):
     )
 
 
+class ClusteringJob(Base):
+    """
+    Progress of one (country, date) work unit in batch_cluster_events.py.
+
+    Lets parallel clustering runs resume: units with status 'done' are skipped
+    on re-runs, 'failed' units keep their error and are retried.
+    """
+    __tablename__ = "clustering_jobs"
+
+    id: Mapped[str] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+    initiating_country: Mapped[str] = mapped_column(Text, nullable=False)
+    cluster_date: Mapped[DateType] = mapped_column(Date, nullable=False)
+
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending")  # pending, running, done, failed
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    error: Mapped[Optional[str]] = mapped_column(Text)
+    stats: Mapped[Dict[str, Any]] = mapped_column(JSONB, default=dict)  # total_events, num_clusters, seconds
+
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+
+    __table_args__ = (
+        UniqueConstraint("initiating_country", "cluster_date", name="uq_clustering_job"),
+        Index("ix_clustering_job_status", "status"),
+    )
+
+
 class BilateralRelationshipSummary(Base):
     """
     Comprehensive bilateral relationship summaries between country pairs.
@@ -1012,4 +1052,102 @@ class BilateralCategorySummary(Base):
         return f"<BilateralCategorySummary({self.initiating_country} → {self.recipient_country} → {self.category}, {self.total_documents} docs)>"
 
     def to_dict(self) -> Dict[str, Any]:
-        return {column.name: getattr(self, column.name) for column in self.__table__.columns}
\ No newline at end of file
+        return {column.name: getattr(self, column.name) for column in self.__table__.columns}
+
+
+class PipelineWatermark(Base):
+    """
+    High-water mark for incremental pipeline stages.
+
+    One row per (stage, scope), e.g. ("consolidate_all_events", "China").
+    A stage processes only rows newer than its watermark, then advances it.
+    """
+    __tablename__ = "pipeline_watermarks"
+
+    id: Mapped[str] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+    stage: Mapped[str] = mapped_column(Text, nullable=False)
+    scope: Mapped[str] = mapped_column(Text, nullable=False)  # Usually the initiating country
+
+    watermark: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    run_stats: Mapped[Dict[str, Any]] = mapped_column(JSONB, default=dict)  # Counts from the run that set it
+
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("stage", "scope", name="uq_pipeline_watermark"),
+    )
+
+    def __repr__(self):
+        return f"<PipelineWatermark({self.stage}/{self.scope} @ {self.watermark})>"
+
+
+class PipelineTaskRun(Base):
+    """
+    Completion record for one task of the event pipeline DAG (run_event_dag.py).
+
+    One row per task_key, e.g. "deconflict_clusters:China:2024-08-01..2024-08-31".
+    Re-runs skip tasks whose status is 'done'.
+    """
+    __tablename__ = "pipeline_task_runs"
+
+    id: Mapped[str] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+    task_key: Mapped[str] = mapped_column(Text, nullable=False)
+    stage: Mapped[str] = mapped_column(Text, nullable=False)
+    partition: Mapped[str] = mapped_column(Text, nullable=False)  # "China" or "China:2024-08-01..2024-08-31"
+
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="pending")  # running, done, failed
+    rows: Mapped[int] = mapped_column(Integer, default=0, nullable=False)  # Rows processed, for throughput
+    seconds: Mapped[Optional[float]] = mapped_column(Float)
+    error: Mapped[Optional[str]] = mapped_column(Text)
+    stats: Mapped[Dict[str, Any]] = mapped_column(JSONB, default=dict)
+
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+
+    __table_args__ = (
+        UniqueConstraint("task_key", name="uq_pipeline_task_run"),
+        Index("ix_pipeline_task_run_stage_status", "stage", "status"),
+    )
+
+    def __repr__(self):
+        return f"<PipelineTaskRun({self.task_key}: {self.status})>"
+
+
+class PipelineDirtyMarker(Base):
+    """
+    Queue of (initiating country, date) partitions that received new documents.
+
+    DSR ingestion upserts a marker per partition it loads (bumping `version`);
+    process_dirty_markers.py claims markers whose version is ahead of
+    `processed_version` and re-runs only the affected pipeline steps.
+    """
+    __tablename__ = "pipeline_dirty_markers"
+
+    id: Mapped[str] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+    initiating_country: Mapped[str] = mapped_column(Text, nullable=False)
+    marker_date: Mapped[DateType] = mapped_column(Date, nullable=False)
+
+    doc_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)  # Documents marked since creation
+    version: Mapped[int] = mapped_column(Integer, default=1, nullable=False)  # Bumped on every mark
+    processed_version: Mapped[int] = mapped_column(Integer, default=0, nullable=False)  # Version last processed
+    claimed_version: Mapped[Optional[int]] = mapped_column(Integer)  # Version seen by the current claim
+
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    error: Mapped[Optional[str]] = mapped_column(Text)
+
+    last_marked_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    claimed_at: Mapped[Optional[datetime]] = mapped_column(DateTime)  # Lease start, renewed while processing; NULL when unclaimed
+    next_attempt_at: Mapped[Optional[datetime]] = mapped_column(DateTime)  # Retry backoff after a failure
+    processed_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+
+    __table_args__ = (
+        UniqueConstraint("initiating_country", "marker_date", name="uq_pipeline_dirty_marker"),
+        Index("ix_pipeline_dirty_marker_pending", "marker_date",
+              postgresql_where=text("version > processed_version")),
+    )
+
+    def __repr__(self):
+        return f"<PipelineDirtyMarker({self.initiating_country} {self.marker_date} v{self.version}/{self.processed_version})>"
@@ -0,0 +1,225 @@
+"""
+Shared name -> embedding store for the event clustering stages.
+
+batch_cluster_events.py, find_representative_name() and the LLM
+deconfliction stage all encode event names with the same
+SentenceTransformer, and the same names recur across days. CachedEncoder
+looks every name up first (in-process dict, then a local SQLite file keyed
+by sha1(model, text)) and only encodes the misses, de-duplicated, in large
+batches.
+
+- Vectors are stored as raw float32 bytes, so cached and fresh embeddings
+  are bit-identical
+- The SQLite file runs in WAL mode, so parallel clustering workers can
+  share it
+- The model is loaded lazily: a fully cached run never loads it
+
+Configuration (shared/config/config.yaml):
+    embedding_cache:
+      enabled: true
+      path: './data/embedding_cache.sqlite'
+      batch_size: 256
+
+Usage:
+    from shared.utils.embedding_cache import CachedEncoder
+
+    encoder = CachedEncoder.from_config()
+    embeddings = encoder.encode(["china saudi arabia investment", ...])
+    print(encoder.stats())
+"""
+
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import yaml
+
+
+DEFAULT_MODEL = 'sentence-transformers/all-MiniLM-L6-v2'
+
+# SQLite limits the number of bound parameters per statement
+LOOKUP_CHUNK = 500
+
+
+def make_embedding_key(model_name: str, text: str) -> str:
+    """Content address for one (model, text) embedding."""
+    return hashlib.sha1(f"{model_name}\0{text}".encode('utf-8')).hexdigest()
+
+
+class EmbeddingCache:
+    """Thread-safe SQLite store of float32 embeddings keyed by make_embedding_key()."""
+
+    def __init__(self, path: str):
+        self.path = str(path)
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=60)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL
+            )
+        ''')
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        """Return the stored vectors for whichever keys are present."""
+        found = {}
+        with self._lock:
+            for i in range(0, len(keys), LOOKUP_CHUNK):
+                chunk = list(keys[i:i + LOOKUP_CHUNK])
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f'SELECT key, vector FROM embeddings WHERE key IN ({placeholders})', chunk
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32)
+        return found
+
+    def put_many(self, items: Dict[str, np.ndarray]) -> None:
+        """Store vectors (converted to float32)."""
+        rows = []
+        for key, vector in items.items():
+            vector = np.asarray(vector, dtype=np.float32)
+            rows.append((key, vector.shape[0], vector.tobytes()))
+
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO embeddings (key, dim, vector) VALUES (?, ?, ?)', rows
+            )
+            self._conn.commit()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM embeddings').fetchone()[0]
+
+
+class CachedEncoder:
+    """SentenceTransformer wrapper that only encodes texts it has not seen before."""
+
+    def __init__(
+        self,
+        model_name: str = DEFAULT_MODEL,
+        cache: Optional[EmbeddingCache] = None,
+        batch_size: int = 256,
+        memory_limit: int = 200000
+    ):
+        """
+        Args:
+            model_name: SentenceTransformer model name
+            cache: Persistent store (None = in-process memoization only)
+            batch_size: Encode batch size for misses
+            memory_limit: Max vectors memoized in this process before the dict is reset
+        """
+        self.model_name = model_name
+        self.cache = cache
+        self.batch_size = batch_size
+        self.memory_limit = memory_limit
+
+        self._model = None
+        self._memory: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.store_hits = 0
+        self.encoded = 0
+
+    @classmethod
+    def from_config(
+        cls,
+        model_name: str = DEFAULT_MODEL,
+        config_path: str = 'shared/config/config.yaml'
+    ) -> 'CachedEncoder':
+        """Build an encoder from the `embedding_cache` section of config.yaml."""
+        try:
+            with open(config_path, 'r') as f:
+                settings = (yaml.safe_load(f) or {}).get('embedding_cache') or {}
+        except Exception as e:
+            print(f"Warning: Could not load embedding cache settings: {e}")
+            settings = {}
+
+        cache = None
+        if settings.get('enabled', True):
+            cache = EmbeddingCache(settings.get('path', './data/embedding_cache.sqlite'))
+
+        return cls(
+            model_name=model_name,
+            cache=cache,
+            batch_size=settings.get('batch_size', 256)
+        )
+
+    @property
+    def model(self):
+        """The SentenceTransformer, loaded on first miss."""
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+            self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Embed texts, reusing cached vectors.
+
+        Args:
+            texts: Texts to embed (duplicates are encoded once)
+
+        Returns:
+            float32 array of shape (len(texts), dim)
+        """
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        keys = [make_embedding_key(self.model_name, t) for t in texts]
+        vectors: Dict[str, np.ndarray] = {}
+
+        with self._lock:
+            for key in keys:
+                if key in self._memory:
+                    vectors[key] = self._memory[key]
+        self.memory_hits += sum(1 for key in keys if key in vectors)
+
+        # De-duplicated keys still missing, in first-seen order
+        missing = list(dict.fromkeys(k for k in keys if k not in vectors))
+
+        if missing and self.cache is not None:
+            stored = self.cache.get_many(missing)
+            vectors.update(stored)
+            self.store_hits += sum(1 for key in keys if key in stored)
+            missing = [k for k in missing if k not in stored]
+
+        if missing:
+            text_by_key = dict(zip(keys, texts))
+            fresh = self.model.encode(
+                [text_by_key[k] for k in missing],
+                batch_size=self.batch_size,
+                show_progress_bar=False
+            ).astype(np.float32, copy=False)
+
+            fresh_vectors = dict(zip(missing, fresh))
+            vectors.update(fresh_vectors)
+            self.encoded += len(missing)
+            if self.cache is not None:
+                self.cache.put_many(fresh_vectors)
+
+        with self._lock:
+            if len(self._memory) + len(vectors) > self.memory_limit:
+                self._memory.clear()
+            self._memory.update(vectors)
+
+        return np.stack([vectors[k] for k in keys])
+
+    def stats(self) -> Dict[str, Any]:
+        """Lookup counters for this process."""
+        lookups = self.memory_hits + self.store_hits + self.encoded
+        return {
+            'memory_hits': self.memory_hits,
+            'store_hits': self.store_hits,
+            'encoded': self.encoded,
+            'hit_rate': ((self.memory_hits + self.store_hits) / lookups) if lookups else 0.0,
+        }
@@ -0,0 +1,224 @@
+"""
+Persistent, content-addressed LLM response cache.
+
+gai() looks up every request here before calling a backend. Entries are keyed
+by sha256(model, sys_prompt, user_prompt, temperature) and stored in a local
+SQLite file, so re-running a pipeline stage after a crash or a parameter tweak
+costs nothing for prompts that have not changed.
+
+- TTL eviction: entries older than ttl_days are ignored and purged
+- Size eviction: least recently used entries beyond max_entries are purged
+- Hit/miss counters per process (printed at exit by CLI scripts)
+
+Modes (set by --no-cache / --refresh-cache on pipeline CLIs, or LLM_CACHE_MODE):
+    use      - read and write the cache (default)
+    refresh  - ignore cached entries but write fresh responses (also used by
+               CLI redo flags such as --regenerate / --rescore)
+    off      - bypass the cache entirely
+
+Configuration (shared/config/config.yaml):
+    llm:
+      cache:
+        enabled: true
+        path: './data/llm_cache.sqlite'
+        ttl_days: 30
+        max_entries: 200000
+
+Usage in a CLI script:
+    from shared.utils.llm_cache import add_llm_cache_args, apply_llm_cache_args
+
+    add_llm_cache_args(parser)
+    args = parser.parse_args()
+    apply_llm_cache_args(args)                                  # or, with a redo flag:
+    apply_llm_cache_args(args, refresh_flags=['regenerate'])
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+
+CACHE_MODES = ('use', 'refresh', 'off')
+
+# Temperatures gai() sends per backend; part of the cache key
+BACKEND_TEMPERATURES = {'azure': 0.7}
+
+# How many writes between eviction passes
+EVICT_EVERY = 500
+
+
+def make_cache_key(model: str, sys_prompt: str, user_prompt: str, temperature: Optional[float]) -> str:
+    """Content address for an LLM request."""
+    payload = json.dumps([model, sys_prompt, user_prompt, temperature], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def get_cache_mode() -> str:
+    """Current cache mode from LLM_CACHE_MODE (inherited by subprocesses)."""
+    mode = os.getenv('LLM_CACHE_MODE', 'use').strip().lower()
+    return mode if mode in CACHE_MODES else 'use'
+
+
+def set_cache_mode(mode: str) -> None:
+    """Set the cache mode for this process and any subprocess it launches."""
+    if mode not in CACHE_MODES:
+        raise ValueError(f"Invalid cache mode: {mode}. Must be one of {CACHE_MODES}")
+    os.environ['LLM_CACHE_MODE'] = mode
+
+
+class LLMResponseCache:
+    """Thread-safe SQLite-backed response cache with TTL and LRU size eviction."""
+
+    def __init__(self, path: str, ttl_days: float = 30, max_entries: int = 200000):
+        self.path = str(path)
+        self.ttl_seconds = float(ttl_days) * 86400 if ttl_days else None
+        self.max_entries = int(max_entries) if max_entries else None
+
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        ''')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS ix_llm_cache_last_access ON llm_cache (last_access)')
+        self._conn.commit()
+
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    @classmethod
+    def from_settings(cls, settings: Optional[Dict[str, Any]]) -> 'LLMResponseCache':
+        """Build a cache from the `llm.cache` section of config.yaml."""
+        settings = settings or {}
+        return cls(
+            path=settings.get('path', './data/llm_cache.sqlite'),
+            ttl_days=settings.get('ttl_days', 30),
+            max_entries=settings.get('max_entries', 200000),
+        )
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return (hit, response) for a cache key."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT response, created_at FROM llm_cache WHERE key = ?', (key,)
+            ).fetchone()
+
+            if row is None or (self.ttl_seconds and now - row[1] > self.ttl_seconds):
+                self.misses += 1
+                return False, None
+
+            self._conn.execute('UPDATE llm_cache SET last_access = ? WHERE key = ?', (now, key))
+            self._conn.commit()
+            self.hits += 1
+
+        return True, json.loads(row[0])
+
+    def put(self, key: str, response: Any, model: Optional[str] = None) -> None:
+        """Store a response. Responses that are not JSON-serializable are skipped."""
+        try:
+            payload = json.dumps(response, ensure_ascii=False)
+        except (TypeError, ValueError):
+            return
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO llm_cache (key, model, response, created_at, last_access) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (key, model, payload, now, now)
+            )
+            self._conn.commit()
+            self.stores += 1
+            self._writes += 1
+
+            if self._writes >= EVICT_EVERY:
+                self._writes = 0
+                self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        """Purge expired entries, then least recently used ones beyond max_entries."""
+        if self.ttl_seconds:
+            self._conn.execute('DELETE FROM llm_cache WHERE created_at < ?', (now - self.ttl_seconds,))
+        if self.max_entries:
+            self._conn.execute('''
+                DELETE FROM llm_cache WHERE key IN (
+                    SELECT key FROM llm_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?
+                )
+            ''', (self.max_entries,))
+        self._conn.commit()
+
+    def evict(self) -> None:
+        """Run an eviction pass now."""
+        with self._lock:
+            self._evict(time.time())
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process plus the current entry count."""
+        with self._lock:
+            entries = self._conn.execute('SELECT COUNT(*) FROM llm_cache').fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'stores': self.stores,
+            'hit_rate': (self.hits / lookups) if lookups else 0.0,
+            'entries': entries,
+        }
+
+
+def add_llm_cache_args(parser) -> None:
+    """Add --no-cache / --refresh-cache to a pipeline CLI parser."""
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument('--no-cache', action='store_true',
+                       help='Bypass the LLM response cache (no reads or writes)')
+    group.add_argument('--refresh-cache', action='store_true',
+                       help='Ignore cached LLM responses but store fresh ones '
+                            '(implied by redo flags such as --regenerate / --rescore)')
+
+
+def apply_llm_cache_args(args, refresh_flags: Sequence[str] = ()) -> None:
+    """
+    Apply parsed --no-cache / --refresh-cache flags and report cache stats at exit.
+
+    Args:
+        args: Parsed arguments
+        refresh_flags: Names of the CLI's own "redo" flags (e.g. 'regenerate',
+            'rescore'); when one is set the cache runs in refresh mode, so the
+            redo asks the LLM again instead of returning the cached answers
+    """
+    if getattr(args, 'no_cache', False):
+        set_cache_mode('off')
+    elif getattr(args, 'refresh_cache', False) or any(getattr(args, flag, False) for flag in refresh_flags):
+        set_cache_mode('refresh')
+
+    atexit.register(print_llm_cache_stats)
+
+
+def print_llm_cache_stats() -> None:
+    """Print hit/miss counters if this process used the cache."""
+    # Imported lazily: utils owns the process-wide cache instance
+    from shared.utils.utils import get_llm_cache
+
+    cache = get_llm_cache(create=False)
+    if cache is None or (cache.hits + cache.misses) == 0:
+        return
+
+    stats = cache.stats()
+    print(f"[LLM CACHE] {stats['hits']} hits, {stats['misses']} misses "
+          f"({stats['hit_rate']:.0%} hit rate), {stats['entries']:,} entries")
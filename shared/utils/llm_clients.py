@@ -0,0 +1,175 @@
+"""
+Process-wide registry of reusable LLM backend clients.
+
+gai() used to build a new AzureOpenAI client (and fetch AWS Secrets Manager
+credentials) on every call, and the proxy path opened a fresh connection per
+request. The registry instead:
+- Builds each backend client once per process (per configuration variant)
+- Caches resolved secrets with an expiry, so credential rotation is still
+  picked up without paying a Secrets Manager round trip per call
+- Sends proxy calls through one requests.Session with keep-alive and a
+  connection pool sized for the LLM engine's worker count
+- Records per-backend latency histograms
+
+Usage:
+    from shared.utils.utils import get_client_registry
+
+    registry = get_client_registry()
+    client = registry.get_client('azure:secrets', build_azure_client)
+    print(registry.latency_snapshot())
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+
+# Upper bounds (seconds) of the latency histogram buckets; last bucket is +inf
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+
+class LatencyHistogram:
+    """Thread-safe fixed-bucket latency histogram."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._counts[bisect.bisect_left(self.buckets, seconds)] += 1
+            self._sum += seconds
+            self._count += 1
+
+    def _quantile(self, q: float) -> Optional[float]:
+        """Upper bucket bound containing quantile q (None if empty or in +inf bucket)."""
+        if self._count == 0:
+            return None
+        target = q * self._count
+        running = 0
+        for bound, count in zip(self.buckets, self._counts):
+            running += count
+            if running >= target:
+                return bound
+        return None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Count, mean, approximate p50/p95 and per-bucket counts."""
+        with self._lock:
+            labels = [f"<={b}s" for b in self.buckets] + [f">{self.buckets[-1]}s"]
+            return {
+                'count': self._count,
+                'mean_seconds': (self._sum / self._count) if self._count else None,
+                'p50_seconds': self._quantile(0.50),
+                'p95_seconds': self._quantile(0.95),
+                'buckets': dict(zip(labels, self._counts)),
+            }
+
+
+class LLMClientRegistry:
+    """Caches backend clients, secrets and the proxy HTTP session for one process."""
+
+    def __init__(
+        self,
+        secret_loader: Callable[[str], Dict[str, Any]],
+        secret_ttl_seconds: float = 3600,
+        pool_size: int = 16
+    ):
+        """
+        Args:
+            secret_loader: Fetches a secret dict by name (e.g. get_db_secret)
+            secret_ttl_seconds: How long a resolved secret is reused
+            pool_size: Max pooled keep-alive connections for the proxy session
+        """
+        self._secret_loader = secret_loader
+        self.secret_ttl_seconds = secret_ttl_seconds
+        self.pool_size = pool_size
+
+        self._lock = threading.RLock()  # Client builders may resolve secrets
+        self._secrets: Dict[str, tuple] = {}
+        self._clients: Dict[str, tuple] = {}
+        self._session = None
+        self._histograms: Dict[str, LatencyHistogram] = {}
+
+    def get_secret(self, name: str) -> Dict[str, Any]:
+        """Return a secret, reloading it once it is older than the TTL."""
+        now = time.time()
+        with self._lock:
+            cached = self._secrets.get(name)
+            if cached and now - cached[1] < self.secret_ttl_seconds:
+                return cached[0]
+
+        value = self._secret_loader(name)
+        with self._lock:
+            self._secrets[name] = (value, now)
+        return value
+
+    def get_client(self, key: str, builder: Callable[[], Any], ttl_seconds: Optional[float] = None) -> Any:
+        """
+        Return the cached client for `key`, building it on first use.
+
+        Clients built from secrets should pass ttl_seconds so they are rebuilt
+        when the underlying credentials may have rotated.
+        """
+        now = time.time()
+        with self._lock:
+            cached = self._clients.get(key)
+            if cached and (ttl_seconds is None or now - cached[1] < ttl_seconds):
+                return cached[0]
+
+            client = builder()
+            self._clients[key] = (client, now)
+            return client
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Drop one cached client (or all clients and secrets), e.g. after an auth error."""
+        with self._lock:
+            if key is None:
+                self._clients.clear()
+                self._secrets.clear()
+            else:
+                self._clients.pop(key, None)
+
+    def http_session(self):
+        """Shared requests.Session with keep-alive and a connection pool."""
+        with self._lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self._session = session
+            return self._session
+
+    @contextmanager
+    def track_latency(self, backend: str):
+        """Time a backend call into that backend's latency histogram."""
+        with self._lock:
+            histogram = self._histograms.setdefault(backend, LatencyHistogram())
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            histogram.observe(time.perf_counter() - start)
+
+    def latency_snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Per-backend latency histograms."""
+        with self._lock:
+            histograms = dict(self._histograms)
+        return {backend: h.snapshot() for backend, h in histograms.items()}
+
+    def close(self) -> None:
+        """Close the proxy session and drop cached clients."""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+        self.invalidate()
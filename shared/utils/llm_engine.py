@@ -0,0 +1,314 @@
+"""
+Concurrent LLM execution engine behind shared.utils.utils.gai().
+
+Replaces the old process-wide @rate_limit(min_interval=10.0) throttle with:
+- A token-bucket limiter per backend (proxy / azure / openai), configured by
+  requests-per-minute and tokens-per-minute
+- A process-wide cap on in-flight calls
+- Retry with jittered exponential backoff on 429, 5xx and connection errors
+  (honouring Retry-After when the backend sends it)
+- A batch API (LLMEngine.map / gai_many) that runs prompts on a bounded
+  worker pool and returns results in input order
+
+Configuration (shared/config/config.yaml):
+    llm:
+      max_workers: 8
+      max_retries: 5
+      backoff_base: 2.0
+      backoff_max: 60.0
+      expected_completion_tokens: 1000
+      backends:
+        proxy:  {rpm: 60,  tpm: 150000}
+        azure:  {rpm: 60,  tpm: 150000}
+        openai: {rpm: 500, tpm: 200000}
+
+Usage:
+    from shared.utils.utils import gai, gai_many
+
+    result = gai(sys_prompt, user_prompt)
+    results = gai_many([(sys_prompt, p) for p in prompts], source="azure")
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+
+DEFAULT_BACKEND_LIMITS = {
+    'proxy': {'rpm': 60, 'tpm': 150000},
+    'azure': {'rpm': 60, 'tpm': 150000},
+    'openai': {'rpm': 500, 'tpm': 200000},
+}
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+# Exception class names treated as transient (connection/timeouts), matched by
+# name so neither requests nor openai has to be importable here
+RETRYABLE_EXCEPTION_NAMES = {
+    'ConnectionError', 'Timeout', 'ReadTimeout', 'ConnectTimeout',
+    'APIConnectionError', 'APITimeoutError', 'RateLimitError', 'InternalServerError',
+}
+
+
+def estimate_tokens(text: Optional[str]) -> int:
+    """Rough token estimate (~4 characters per token) for rate limiting."""
+    if not text:
+        return 0
+    return max(1, len(str(text)) // 4)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at rate_per_minute.
+
+    acquire() blocks until the requested amount is available. Requests larger
+    than the bucket capacity are clamped so they can never deadlock.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate_per_second = float(rate_per_minute) / 60.0
+        self.capacity = float(capacity if capacity is not None else rate_per_minute)
+        self._tokens = self.capacity
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate_per_second)
+        self._last_refill = now
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """Take `amount` tokens, sleeping as needed. Returns seconds waited."""
+        amount = min(float(amount), self.capacity)
+        waited = 0.0
+
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return waited
+                shortfall = amount - self._tokens
+                sleep_for = shortfall / self.rate_per_second if self.rate_per_second > 0 else 1.0
+
+            time.sleep(sleep_for)
+            waited += sleep_for
+
+
+class BackendLimiter:
+    """Requests-per-minute and tokens-per-minute buckets for one backend."""
+
+    def __init__(self, rpm: float, tpm: float):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+
+    def acquire(self, tokens: int) -> float:
+        """Reserve one request and `tokens` tokens. Returns seconds waited."""
+        return self.requests.acquire(1) + self.tokens.acquire(tokens)
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    """Extract an HTTP status code from an openai/requests exception, if any."""
+    status = getattr(exc, 'status_code', None)
+    if status is None:
+        response = getattr(exc, 'response', None)
+        status = getattr(response, 'status_code', None)
+    return status if isinstance(status, int) else None
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    """Seconds from a Retry-After header on the exception's response, if any."""
+    response = getattr(exc, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+    try:
+        value = headers.get('retry-after') or headers.get('Retry-After')
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _exception_chain(exc: BaseException):
+    """Yield exc and its __cause__/__context__ chain (gai wraps backend errors)."""
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        yield exc
+        exc = exc.__cause__ or exc.__context__
+
+
+def is_retryable(exc: BaseException) -> Tuple[bool, Optional[float]]:
+    """
+    Decide whether an LLM call failure is transient.
+
+    Returns:
+        (retryable, retry_after_seconds)
+    """
+    for err in _exception_chain(exc):
+        status = _status_code(err)
+        if status is not None:
+            return status in RETRYABLE_STATUS_CODES, _retry_after(err)
+        if type(err).__name__ in RETRYABLE_EXCEPTION_NAMES:
+            return True, _retry_after(err)
+    return False, None
+
+
+class LLMEngine:
+    """
+    Process-wide LLM execution layer: per-backend limits, retries, batching.
+
+    The call function passed to call()/map() performs exactly one backend
+    request; the engine wraps it with rate limiting and retries.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 8,
+        backend_limits: Optional[Dict[str, Dict[str, float]]] = None,
+        max_retries: int = 5,
+        backoff_base: float = 2.0,
+        backoff_max: float = 60.0,
+        expected_completion_tokens: int = 1000
+    ):
+        self.max_workers = max(1, int(max_workers))
+        self.max_retries = max(0, int(max_retries))
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.expected_completion_tokens = expected_completion_tokens
+
+        limits = {**DEFAULT_BACKEND_LIMITS, **(backend_limits or {})}
+        self._limiters = {
+            name: BackendLimiter(cfg.get('rpm', 60), cfg.get('tpm', 150000))
+            for name, cfg in limits.items()
+        }
+        self._in_flight = threading.BoundedSemaphore(self.max_workers)
+        self._stats_lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    @classmethod
+    def from_settings(cls, settings: Optional[Dict[str, Any]]) -> 'LLMEngine':
+        """Build an engine from the `llm` section of config.yaml."""
+        settings = settings or {}
+        return cls(
+            max_workers=settings.get('max_workers', 8),
+            backend_limits=settings.get('backends'),
+            max_retries=settings.get('max_retries', 5),
+            backoff_base=settings.get('backoff_base', 2.0),
+            backoff_max=settings.get('backoff_max', 60.0),
+            expected_completion_tokens=settings.get('expected_completion_tokens', 1000),
+        )
+
+    def _limiter(self, source: str) -> BackendLimiter:
+        if source not in self._limiters:
+            limits = DEFAULT_BACKEND_LIMITS['proxy']
+            self._limiters[source] = BackendLimiter(limits['rpm'], limits['tpm'])
+        return self._limiters[source]
+
+    def _record(self, source: str, **increments: float) -> None:
+        with self._stats_lock:
+            stats = self._stats.setdefault(source, {
+                'calls': 0, 'retries': 0, 'failures': 0, 'wait_seconds': 0.0, 'call_seconds': 0.0
+            })
+            for key, value in increments.items():
+                stats[key] += value
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-backend counters: calls, retries, failures, limiter wait and call time."""
+        with self._stats_lock:
+            return {source: dict(values) for source, values in self._stats.items()}
+
+    def _backoff(self, attempt: int, retry_after: Optional[float]) -> float:
+        """Full-jitter exponential backoff, never shorter than Retry-After."""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base ** (attempt + 1)))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_max))
+        return delay
+
+    def call(
+        self,
+        fn: Callable[..., Any],
+        sys_prompt: str,
+        user_prompt: str,
+        source: str = 'proxy',
+        **kwargs
+    ) -> Any:
+        """
+        Run one LLM request through the backend limiter with retries.
+
+        Args:
+            fn: Function performing a single request: fn(sys_prompt, user_prompt, source=..., **kwargs)
+            sys_prompt: System prompt
+            user_prompt: User prompt
+            source: Backend name used to pick the limiter
+            **kwargs: Passed through to fn
+
+        Raises:
+            The last exception from fn once retries are exhausted or the error is not transient
+        """
+        tokens = estimate_tokens(sys_prompt) + estimate_tokens(user_prompt) + self.expected_completion_tokens
+        limiter = self._limiter(source)
+
+        for attempt in range(self.max_retries + 1):
+            waited = limiter.acquire(tokens)
+            with self._in_flight:
+                start = time.time()
+                try:
+                    result = fn(sys_prompt, user_prompt, source=source, **kwargs)
+                    self._record(source, calls=1, wait_seconds=waited, call_seconds=time.time() - start)
+                    return result
+                except Exception as e:
+                    self._record(source, calls=1, wait_seconds=waited, call_seconds=time.time() - start)
+                    retryable, retry_after = is_retryable(e)
+                    if not retryable or attempt >= self.max_retries:
+                        self._record(source, failures=1)
+                        raise
+                    last_error = e
+
+            delay = self._backoff(attempt, retry_after)
+            self._record(source, retries=1)
+            print(f"  [LLM] Transient {source} error ({last_error}); retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+            time.sleep(delay)
+
+    def map(
+        self,
+        fn: Callable[..., Any],
+        prompts: Sequence[Tuple[str, str]],
+        source: str = 'proxy',
+        max_workers: Optional[int] = None,
+        return_exceptions: bool = False,
+        **kwargs
+    ) -> List[Any]:
+        """
+        Run many (sys_prompt, user_prompt) pairs concurrently.
+
+        Args:
+            fn: Single-request function (see call())
+            prompts: Sequence of (sys_prompt, user_prompt) tuples
+            source: Backend name
+            max_workers: Worker threads (default: engine max_workers)
+            return_exceptions: If True, failed prompts yield their exception
+                instead of raising the first failure
+            **kwargs: Passed through to fn
+
+        Returns:
+            Results in the same order as prompts
+        """
+        if not prompts:
+            return []
+
+        workers = min(max_workers or self.max_workers, len(prompts))
+
+        def run_one(pair):
+            sys_prompt, user_prompt = pair
+            try:
+                return self.call(fn, sys_prompt, user_prompt, source=source, **kwargs)
+            except Exception as e:
+                if return_exceptions:
+                    return e
+                raise
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(run_one, prompts))
@@ -13,6 +13,10 @@ from botocore.exceptions import ClientError
 # import pandas as pd
 from functools import wraps
 
+from shared.utils.llm_engine import LLMEngine
+from shared.utils.llm_clients import LLMClientRegistry
+from shared.utils.llm_cache import BACKEND_TEMPERATURES, LLMResponseCache, get_cache_mode, make_cache_key
+
 class Config:
     def __init__(self, **entries):
         # Normalize any path fields
@@ -116,9 +120,8 @@ def initialize_client(use_env_vars=False):
             api_version=api_version,
         )
     else:
-        # AWS Secrets Manager mode (default)
-        secret_string = get_secret()
-        credentials = json.loads(secret_string)
+        # AWS Secrets Manager mode (default), resolved through the registry's secret cache
+        credentials = get_client_registry().get_secret(cfg.aws['secret_name'])
 
         client = AzureOpenAI(
             azure_endpoint=credentials["endpoint"],
@@ -212,11 +215,65 @@ def fetch_gai_response(sys_prompt,prompt,model):
     raw = response.choices[0].message.content
 
 
-@rate_limit(min_interval=10.0)
+_llm_engine = None
+_llm_cache = None
+_client_registry = None
+
+def get_llm_engine():
+    """Get or create the process-wide LLM execution engine (lazy initialization)."""
+    global _llm_engine
+    if _llm_engine is None:
+        _llm_engine = LLMEngine.from_settings(getattr(cfg, 'llm', None))
+    return _llm_engine
+
+def get_client_registry():
+    """
+    Get or create the process-wide LLM client registry (lazy initialization).
+
+    Backend clients are built once, secrets are cached for
+    llm.clients.secret_ttl_seconds, and proxy calls share one pooled session.
+    """
+    global _client_registry
+    if _client_registry is None:
+        settings = getattr(cfg, 'llm', None) or {}
+        client_settings = settings.get('clients') or {}
+        _client_registry = LLMClientRegistry(
+            secret_loader=get_db_secret,
+            secret_ttl_seconds=client_settings.get('secret_ttl_seconds', 3600),
+            pool_size=client_settings.get('pool_size', 2 * settings.get('max_workers', 8))
+        )
+    return _client_registry
+
+def get_llm_cache(create=True):
+    """
+    Get the process-wide LLM response cache.
+
+    Returns None when the cache is disabled (llm.cache.enabled: false or
+    LLM_CACHE_MODE=off), or when create=False and it was never opened.
+    """
+    global _llm_cache
+    settings = (getattr(cfg, 'llm', None) or {}).get('cache') or {}
+    if get_cache_mode() == 'off' or not settings.get('enabled', True):
+        return None
+    if _llm_cache is None and create:
+        _llm_cache = LLMResponseCache.from_settings(settings)
+    return _llm_cache
+
+def _cache_key(sys_prompt, user_prompt, model, source):
+    return make_cache_key(model, sys_prompt, user_prompt, BACKEND_TEMPERATURES.get(source))
+
 def gai(sys_prompt, user_prompt, model="gpt-4o-mini", source="proxy", use_proxy=None, azure_use_env=False):
     """
     Unified LLM call supporting multiple backends.
 
+    Calls go through the shared LLMEngine (shared/utils/llm_engine.py): a
+    per-backend requests/tokens-per-minute limiter plus retry with jittered
+    backoff on 429/5xx. Safe to call from many threads at once.
+
+    Responses are served from / stored in the persistent LLM response cache
+    (shared/utils/llm_cache.py) unless LLM_CACHE_MODE is "off" ("refresh"
+    skips lookups but still stores).
+
     Args:
         sys_prompt: System prompt for the LLM
         user_prompt: User prompt for the LLM
@@ -235,29 +292,103 @@ def gai(sys_prompt, user_prompt, model="gpt-4o-mini", source="proxy", use_proxy=
 
     Raises:
         ValueError: If required configuration is missing
-        requests.RequestException: If FastAPI proxy call fails
+        RuntimeError: If the backend call fails after retries
     """
-    import requests
-
     # Handle backward compatibility with use_proxy parameter
     if use_proxy is not None:
         source = "proxy" if use_proxy else "openai"
 
+    cache = get_llm_cache()
+    key = _cache_key(sys_prompt, user_prompt, model, source) if cache else None
+    if cache and get_cache_mode() == 'use':
+        hit, cached = cache.get(key)
+        if hit:
+            return cached
+
+    result = get_llm_engine().call(
+        _gai_request, sys_prompt, user_prompt,
+        source=source, model=model, azure_use_env=azure_use_env
+    )
+
+    if cache:
+        cache.put(key, result, model=model)
+    return result
+
+
+def gai_many(prompts, model="gpt-4o-mini", source="proxy", azure_use_env=False,
+             max_workers=None, return_exceptions=False):
+    """
+    Run many LLM calls concurrently through the shared LLMEngine.
+
+    Args:
+        prompts: List of (sys_prompt, user_prompt) tuples
+        model: Model to use (default: gpt-4o-mini)
+        source: Backend source - "proxy", "azure", or "openai"
+        azure_use_env: If True with source="azure", use env vars instead of AWS Secrets Manager
+        max_workers: Concurrent calls (default: llm.max_workers from config.yaml)
+        return_exceptions: If True, a failed prompt yields its exception in the
+            results list instead of raising
+
+    Returns:
+        List of results (same as gai()), in the same order as prompts
+    """
+    prompts = list(prompts)
+    results = [None] * len(prompts)
+    pending = list(range(len(prompts)))
+
+    cache = get_llm_cache()
+    keys = [_cache_key(sp, up, model, source) for sp, up in prompts] if cache else None
+    if cache and get_cache_mode() == 'use':
+        pending = []
+        for i, key in enumerate(keys):
+            hit, cached = cache.get(key)
+            if hit:
+                results[i] = cached
+            else:
+                pending.append(i)
+
+    fresh = get_llm_engine().map(
+        _gai_request, [prompts[i] for i in pending],
+        source=source, max_workers=max_workers, return_exceptions=return_exceptions,
+        model=model, azure_use_env=azure_use_env
+    )
+
+    for i, result in zip(pending, fresh):
+        results[i] = result
+        if cache and not isinstance(result, Exception):
+            cache.put(keys[i], result, model=model)
+
+    return results
+
+
+def _gai_request(sys_prompt, user_prompt, model="gpt-4o-mini", source="proxy", azure_use_env=False):
+    """
+    Perform a single LLM request against one backend (no limiting or retries).
+
+    Use gai()/gai_many() instead; they wrap this with the LLMEngine.
+    """
+    import requests
+
     # AZURE OpenAI (System 2 default)
     if source == "azure":
         print(f"  [AZURE] Calling Azure OpenAI (credentials from {'env vars' if azure_use_env else 'AWS Secrets Manager'})")
 
         try:
-            # Initialize Azure client
-            client = initialize_client(use_env_vars=azure_use_env)
+            # Reuse the process-wide Azure client (rebuilt when cached secrets expire)
+            registry = get_client_registry()
+            client = registry.get_client(
+                f"azure:{'env' if azure_use_env else 'secrets'}",
+                lambda: initialize_client(use_env_vars=azure_use_env),
+                ttl_seconds=None if azure_use_env else registry.secret_ttl_seconds
+            )
 
             # Get deployment name
             if azure_use_env:
                 deployment = os.getenv('AZURE_OPENAI_DEPLOYMENT', model)
             else:
-                # Try to get deployment name from AWS Secrets Manager
+                # Try to get deployment name from AWS Secrets Manager (cached)
                 try:
-                    secret_dict = get_db_secret('azure-open-ai-credentials')
+                    secret_dict = registry.get_secret('azure-open-ai-credentials')
                     deployment = (
                         secret_dict.get('deployment_name') or
                         secret_dict.get('GPT_4_1_DEPLOYMENT_NAME') or
@@ -268,15 +399,16 @@ def gai(sys_prompt, user_prompt, model="gpt-4o-mini", source="proxy", use_proxy=
                     deployment = model
 
             # Make Azure OpenAI call
-            completion = client.chat.completions.create(
-                model=deployment,
-                messages=[
-                    {"role": "system", "content": sys_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.7,
-                max_tokens=4000
-            )
+            with registry.track_latency('azure'):
+                completion = client.chat.completions.create(
+                    model=deployment,
+                    messages=[
+                        {"role": "system", "content": sys_prompt},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    temperature=0.7,
+                    max_tokens=4000
+                )
 
             content = completion.choices[0].message.content
 
@@ -315,15 +447,17 @@ def gai(sys_prompt, user_prompt, model="gpt-4o-mini", source="proxy", use_proxy=
             if not api_key:
                 raise ValueError("OPENAI_PROJ_API not found in environment")
 
-            client = OpenAI(api_key=api_key)
+            registry = get_client_registry()
+            client = registry.get_client('openai', lambda: OpenAI(api_key=api_key))
 
-            completion = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": sys_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-            )
+            with registry.track_latency('openai'):
+                completion = client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": sys_prompt},
+                        {"role": "user", "content": user_prompt},
+                    ],
+                )
             content = completion.choices[0].message.content
 
             if isinstance(content, (dict, list)):
@@ -364,7 +498,10 @@ def gai(sys_prompt, user_prompt, model="gpt-4o-mini", source="proxy", use_proxy=
         }
 
         try:
-            response = requests.post(fastapi_url, json=payload, timeout=120)
+            # Pooled keep-alive session shared by all proxy calls in this process
+            registry = get_client_registry()
+            with registry.track_latency('proxy'):
+                response = registry.http_session().post(fastapi_url, json=payload, timeout=120)
             response.raise_for_status()
 
             data = response.json()
@@ -0,0 +1,85 @@
+"""
+Binary float32 transport for embeddings between Postgres and numpy.
+
+Reading vectors as float[] (or as pgvector text) gives psycopg2 one Python
+float object per element; tens of thousands of 384-d vectors means millions
+of objects that are immediately copied back into numpy. These helpers move
+vectors as raw bytes instead and decode a whole result set with one
+np.frombuffer call into a contiguous matrix.
+
+Two wire formats, both big-endian float32 (Postgres network byte order):
+- pgvector binary: SELECT vector_send(embedding_vector) -> 2-byte dim,
+  2 unused bytes, then dim float32s
+- float32 blobs: bytea columns written by encode_float32 (e.g.
+  event_clusters.centroid_embedding); same layout as float4send() per element
+
+Usage:
+    rows = session.execute(text('SELECT id, vector_send(embedding_vector) FROM canonical_events ...'))
+    ids, blobs = zip(*rows)
+    matrix = decode_pgvector(blobs)          # (n, 384) float32, C-contiguous
+
+    row['centroid_embedding'] = encode_float32(centroid)
+"""
+
+from typing import Sequence
+
+import numpy as np
+
+
+FLOAT32_BE = np.dtype('>f4')
+
+# vector_send() header: int16 dim + int16 unused
+PGVECTOR_HEADER_BYTES = 4
+
+
+def encode_float32(vector) -> bytes:
+    """Encode a vector as a big-endian float32 blob."""
+    return np.asarray(vector, dtype=FLOAT32_BE).tobytes()
+
+
+def decode_float32(blobs: Sequence[bytes], dim: int = None) -> np.ndarray:
+    """
+    Decode equal-length float32 blobs into one (n, dim) native float32 matrix.
+
+    Args:
+        blobs: Blobs written by encode_float32 (bytes or memoryview)
+        dim: Vector length (inferred from the first blob if omitted)
+
+    Returns:
+        C-contiguous float32 array of shape (len(blobs), dim)
+    """
+    if len(blobs) == 0:
+        return np.zeros((0, dim or 0), dtype=np.float32)
+
+    if dim is None:
+        dim = len(blobs[0]) // FLOAT32_BE.itemsize
+
+    buffer = b''.join(blobs)
+    if len(buffer) != len(blobs) * dim * FLOAT32_BE.itemsize:
+        raise ValueError(f"Blobs are not all {dim}-d float32 vectors")
+
+    return np.frombuffer(buffer, dtype=FLOAT32_BE).reshape(len(blobs), dim).astype(np.float32)
+
+
+def decode_pgvector(blobs: Sequence[bytes]) -> np.ndarray:
+    """
+    Decode vector_send() output into one (n, dim) native float32 matrix.
+
+    Args:
+        blobs: Results of vector_send(vector_column), all of the same dimension
+
+    Returns:
+        C-contiguous float32 array of shape (len(blobs), dim)
+    """
+    if len(blobs) == 0:
+        return np.zeros((0, 0), dtype=np.float32)
+
+    dim = int(np.frombuffer(bytes(blobs[0][:2]), dtype='>i2')[0])
+    record = np.dtype([('dim', '>i2'), ('unused', '>i2'), ('values', FLOAT32_BE, (dim,))])
+
+    buffer = b''.join(blobs)
+    if len(buffer) != len(blobs) * record.itemsize:
+        raise ValueError(f"pgvector blobs are not all {dim}-d")
+
+    records = np.frombuffer(buffer, dtype=record)
+    return np.ascontiguousarray(records['values'], dtype=np.float32)